@@ -1,7 +1,8 @@
 import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the main data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # Load the mapping data
 mapping = pd.read_csv("Doctor_Versus_Disease.csv", encoding="latin1")
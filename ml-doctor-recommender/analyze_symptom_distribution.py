@@ -1,8 +1,8 @@
-import pandas as pd
 import numpy as np
+from dataset_cache import load_dataset
 
 # Load the data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 
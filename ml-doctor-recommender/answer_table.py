@@ -0,0 +1,207 @@
+"""
+Precomputed /predict answers for small symptom sets
+
+Request inputs are binary, so every set of up to k symptoms drawn from the
+frequent feature columns can be answered offline. build_answer_table.py runs
+the content_api pipeline over all of them; this module stores and serves the
+results.
+
+On disk (ANSWER_TABLE_DIR) the table is a directory of .npy arrays plus
+meta.json:
+    keys            uint64, sorted: the set's sorted column IDs packed 8 bits each
+    payload_ids     uint32, per key: which payload holds its response
+    payload_offsets uint64, n_payloads + 1 byte offsets into blob
+    blob            uint8, compact JSON responses (without active_symptoms),
+                    identical responses stored once
+The arrays are opened with mmap_mode='r', so every worker shares one copy.
+
+Keys ignore symptom order. That is sound because content_api diagnoses every
+ordering of a set in the same canonical order (response_cache.canonical_symptoms),
+and the builder checks every ordering of the sets where order could matter.
+
+A lookup only answers when the table was built for the service's current
+model, rule version and feature columns by the current encoder and answer
+code (ENCODING_FORMAT, ANSWER_FORMAT), and every requested symptom is an
+exact feature column. Anything else, such as aliases, misspellings or larger sets, goes
+through the normal pipeline.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from feature_encoder import ENCODING_FORMAT
+from request_logging import get_logger
+
+ANSWER_TABLE_DIR = os.environ.get(
+    "ANSWER_TABLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_table"))
+
+# Column IDs are packed 8 bits each (0 marks an empty slot), so at most 255 columns and 8 symptoms
+MAX_COLUMNS = 255
+MAX_SET_SIZE = 8
+
+# Bump when the stored payload or the content_api pipeline that builds answers changes
+ANSWER_FORMAT = 1
+
+log = get_logger("answer_table")
+
+
+def pack_key(column_ids):
+    """uint64 key of a set of column IDs"""
+    key = 0
+    for position, column_id in enumerate(sorted(column_ids)):
+        key |= (column_id + 1) << (8 * position)
+    return key
+
+
+def unpack_key(key):
+    """Sorted column IDs of a key made by pack_key"""
+    column_ids = []
+    while key:
+        column_ids.append((key & 0xFF) - 1)
+        key >>= 8
+    return column_ids
+
+
+def columns_version(feature_columns):
+    """Short hash of the feature column list, in order"""
+    return hashlib.sha1("\n".join(feature_columns).encode("utf-8")).hexdigest()[:12]
+
+
+def table_version(model_version, rules_version, feature_columns_version):
+    """Version string a table must carry to be used by a service"""
+    return (f"{model_version}|{rules_version}|{feature_columns_version}"
+            f"|enc{ENCODING_FORMAT}|ans{ANSWER_FORMAT}")
+
+
+def write_table(directory, feature_columns, version, max_size, symptoms, entries):
+    """
+    Write a table from (column_ids, response) pairs.
+
+    Returns (n_keys, n_payloads, total bytes on disk).
+    """
+    os.makedirs(directory, exist_ok=True)
+    payload_index = {}
+    chunks = []
+    keyed = []
+    for column_ids, response in entries:
+        payload = json.dumps({k: v for k, v in response.items() if k != "active_symptoms"},
+                             separators=(",", ":"), sort_keys=True).encode("utf-8")
+        payload_id = payload_index.get(payload)
+        if payload_id is None:
+            payload_id = payload_index[payload] = len(chunks)
+            chunks.append(payload)
+        keyed.append((pack_key(column_ids), payload_id))
+
+    keyed.sort()
+    keys = np.array([key for key, _ in keyed], dtype=np.uint64)
+    if len(keys) != len(np.unique(keys)):
+        raise ValueError("duplicate symptom sets in answer table entries")
+    payload_ids = np.array([payload_id for _, payload_id in keyed], dtype=np.uint32)
+    payload_offsets = np.zeros(len(chunks) + 1, dtype=np.uint64)
+    payload_offsets[1:] = np.cumsum([len(chunk) for chunk in chunks])
+    blob = np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+    arrays = {"keys": keys, "payload_ids": payload_ids, "payload_offsets": payload_offsets, "blob": blob}
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"version": version, "feature_columns": list(feature_columns), "max_size": max_size,
+                   "symptoms": list(symptoms), "keys": len(keys), "payloads": len(chunks)}, f)
+
+    size = sum(os.path.getsize(os.path.join(directory, name))
+               for name in os.listdir(directory))
+    return len(keys), len(chunks), size
+
+
+class AnswerTable:
+    """Memory-mapped precomputed responses keyed by symptom set"""
+
+    def __init__(self, directory, decoded_cache_size=4096):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.version = meta["version"]
+        self.max_size = meta["max_size"]
+        self.column_ids = {name: i for i, name in enumerate(meta["feature_columns"])}
+        self.keys = np.load(os.path.join(directory, "keys.npy"), mmap_mode="r")
+        self.payload_ids = np.load(os.path.join(directory, "payload_ids.npy"), mmap_mode="r")
+        self.payload_offsets = np.load(os.path.join(directory, "payload_offsets.npy"), mmap_mode="r")
+        self.blob = np.load(os.path.join(directory, "blob.npy"), mmap_mode="r")
+        # Lookups run on several inference threads at once
+        self._counts_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # Many sets share a response, so decoded payloads are kept by payload ID
+        self._decoded = {}
+        self.decoded_cache_size = decoded_cache_size
+
+    @classmethod
+    def load(cls, directory=ANSWER_TABLE_DIR):
+        """The table in directory, or None if there is none (or it cannot be read)"""
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            return None
+        try:
+            return cls(directory)
+        except Exception as e:
+            log.warning("Ignoring unreadable answer table %s: %s", directory, e)
+            return None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _count(self, outcome):
+        with self._counts_lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _find(self, active_symptoms, version):
+        """(counter name, payload ID or None) for a lookup"""
+        if version != self.version:
+            return "stale", None
+        if not active_symptoms or len(active_symptoms) > self.max_size:
+            return "misses", None
+        column_ids = []
+        for symptom in active_symptoms:
+            column_id = self.column_ids.get(symptom)
+            if column_id is None:
+                return "misses", None
+            column_ids.append(column_id)
+
+        key = np.uint64(pack_key(column_ids))
+        row = int(np.searchsorted(self.keys, key))
+        if row == len(self.keys) or self.keys[row] != key:
+            return "misses", None
+        return "hits", int(self.payload_ids[row])
+
+    def lookup(self, active_symptoms, version):
+        """Precomputed response for these symptoms (a new top-level dict, shared nested values), or None"""
+        outcome, payload_id = self._find(active_symptoms, version)
+        self._count(outcome)
+        if payload_id is None:
+            return None
+        response = self._decoded.get(payload_id)
+        if response is None:
+            start, end = int(self.payload_offsets[payload_id]), int(self.payload_offsets[payload_id + 1])
+            response = json.loads(self.blob[start:end].tobytes())
+            if len(self._decoded) < self.decoded_cache_size:
+                self._decoded[payload_id] = response
+        return dict(response)
+
+    def stats(self):
+        with self._counts_lock:
+            hits, misses, stale = self.hits, self.misses, self.stale
+        lookups = hits + misses + stale
+        return {
+            "entries": len(self.keys),
+            "payloads": len(self.payload_offsets) - 1,
+            "max_size": self.max_size,
+            "version": self.version,
+            "hits": hits,
+            "misses": misses,
+            "stale": stale,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
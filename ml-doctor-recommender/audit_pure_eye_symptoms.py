@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the fixed data
-df = pd.read_excel("Specialist_eye_fixed.xlsx")
+df = load_dataset("Specialist_eye_fixed.xlsx")
 
 # Find all columns related to eyes
 eye_symptom_cols = [col for col in df.columns if 'eye' in col.lower()]
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the current training data
-df = pd.read_excel("Specialist_eye_augmented.xlsx")
+df = load_dataset("Specialist_eye_augmented.xlsx")
 
 print("Current training data specialist distribution:")
 print(df['Specialist'].value_counts())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: float64 vs uint8 vs bit-packed case stores for symptom similarity
+
+Scores queries of 1-6 symptoms against every Specialist.xlsx case with the
+recommenders' Jaccard / cosine / simple-match blend, three ways: a float64
+case matrix (what the per-row loops worked on), a uint8 matrix with the
+query's columns gathered, and binary_similarity.BinaryCases. Reports store
+size, per-query time one at a time and in a batch, and checks all three give
+identical scores.
+"""
+
+import time
+
+import numpy as np
+
+from binary_similarity import BinaryCases
+from dataset_cache import load_dataset
+
+WEIGHTS = (0.2, 0.2, 0.6)
+QUERIES = 1000
+
+
+def load_cases(path="Specialist.xlsx"):
+    data = load_dataset(path)
+    if 'Unnamed: 0' in data.columns:
+        data = data.drop('Unnamed: 0', axis=1)
+    return data[data.columns[:-1]].to_numpy(dtype=np.uint8)
+
+
+def blend(intersection, case_sizes, query_size):
+    jaccard_weight, cosine_weight, match_weight = WEIGHTS
+    overlap = intersection.astype(np.float64)
+    jaccard = overlap / (case_sizes + query_size - intersection)
+    cosine = overlap / (np.sqrt(float(query_size)) * np.sqrt(np.maximum(case_sizes, 1).astype(np.float64)))
+    return jaccard * jaccard_weight + cosine * cosine_weight + overlap / query_size * match_weight
+
+
+def time_queries(score, queries):
+    score(queries[0])
+    start = time.perf_counter()
+    results = [score(query) for query in queries]
+    return (time.perf_counter() - start) / len(queries) * 1e6, np.array(results)
+
+
+def run_benchmark(seed=42):
+    matrix = load_cases()
+    rng = np.random.default_rng(seed)
+    queries = [rng.choice(matrix.shape[1], rng.integers(1, 7), replace=False) for _ in range(QUERIES)]
+
+    dense = matrix.astype(np.float64)
+    dense_sizes = dense.sum(axis=1)
+    case_sizes = matrix.sum(axis=1, dtype=np.int64)
+    cases = BinaryCases(matrix)
+
+    def float_score(query):
+        user_vector = np.zeros(dense.shape[1])
+        user_vector[query] = 1
+        return blend(dense @ user_vector, dense_sizes, len(query))
+
+    def uint8_score(query):
+        return blend(matrix[:, query].sum(axis=1, dtype=np.int64), case_sizes, len(query))
+
+    def packed_score(query):
+        return cases.similarities(query, *WEIGHTS)
+
+    print(f"📊 {len(matrix)} cases x {matrix.shape[1]} symptoms, {QUERIES} queries of 1-6 symptoms\n")
+    print(f"{'store':<18} | {'bytes':>10} | {'us/query':>9} | {'identical':>9}")
+    print("-" * 56)
+    reference = None
+    for name, nbytes, score in (("float64", dense.nbytes, float_score),
+                                ("uint8", matrix.nbytes, uint8_score),
+                                ("bit-packed", cases.nbytes, packed_score)):
+        us, scores = time_queries(score, queries)
+        if reference is None:
+            reference = scores
+        print(f"{name:<18} | {nbytes:>10} | {us:>9.1f} | {str(np.array_equal(scores, reference)):>9}")
+
+    start = time.perf_counter()
+    batch = cases.similarities_many(queries, *WEIGHTS)
+    batch_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"{'bit-packed, batch':<18} | {cases.nbytes:>10} | {batch_us:>9.1f} | "
+          f"{str(np.array_equal(batch, reference)):>9}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
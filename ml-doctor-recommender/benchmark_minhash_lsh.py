@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MinHash-LSH top-K retrieval vs an exact scan over every case
+
+Uses Specialist.xlsx and synthetic case bases grown from it (each generated
+case is a random Specialist.xlsx case with some symptoms dropped and up to
+two random ones added). For every base size and LSH configuration it
+reports index build time and size, the mean number of distinct symptom sets
+proposed as candidates, recall of the top-K cases against the exact top-K by
+Jaccard similarity, and query time against the exact bit-packed scan.
+Queries are 1-6 symptoms taken from a random Specialist.xlsx case.
+
+Recall counts a retrieved case as correct when its Jaccard similarity is at
+least that of the exact K-th best case, so ties at the cut-off do not count
+against the index.
+"""
+
+import os
+import time
+
+import numpy as np
+
+from binary_similarity import BinaryCases
+from dataset_cache import load_dataset
+from minhash_lsh import MinHashLSH
+
+SIZES = [int(size) for size in os.environ.get("LSH_BENCH_SIZES", "0,100000,1000000").split(",")]
+CONFIGS = [(64, 64), (128, 64), (192, 64)]
+K = 200
+QUERIES = 200
+
+
+def load_cases(path="Specialist.xlsx"):
+    data = load_dataset(path)
+    if 'Unnamed: 0' in data.columns:
+        data = data.drop('Unnamed: 0', axis=1)
+    return data[data.columns[:-1]].to_numpy(dtype=np.uint8)
+
+
+def augment(base, n, seed=0):
+    """n synthetic cases: base cases with symptoms dropped (15%) and up to two random ones added"""
+    rng = np.random.default_rng(seed)
+    cases = base[rng.integers(0, len(base), n)]
+    cases[(rng.random(cases.shape) < 0.15) & (cases == 1)] = 0
+    added = rng.integers(0, cases.shape[1], (n, 2))
+    keep = rng.random((n, 2)) < 0.5
+    rows = np.repeat(np.arange(n), 2)[keep.ravel()]
+    cases[rows, added.ravel()[keep.ravel()]] = 1
+    return cases
+
+
+def sample_queries(base, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(QUERIES):
+        present = np.flatnonzero(base[rng.integers(len(base))])
+        queries.append(rng.choice(present, min(len(present), rng.integers(1, 7)), replace=False))
+    return queries
+
+
+def exact_top_k(cases, query):
+    """Exact Jaccard of every case, and the top K by it"""
+    intersection = cases.intersections(query)
+    jaccard = intersection / (cases.sizes + len(query) - intersection)
+    k = min(K, int(np.count_nonzero(jaccard)))
+    return jaccard, np.argpartition(-jaccard, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+
+
+def run_benchmark():
+    base = load_cases()
+    queries = sample_queries(base)
+    print(f"{'cases':>8} | {'perm/bands':>10} | {'build (s)':>9} | {'sets':>7} | {'index MB':>8} | "
+          f"{'candidates':>10} | {f'recall@{K}':>10} | {'LSH (us)':>8} | {'exact (us)':>10}")
+    print("-" * 108)
+    for size in SIZES:
+        matrix = base if size == 0 else augment(base, size)
+        cases = BinaryCases(matrix)
+        start = time.perf_counter()
+        exact = [exact_top_k(cases, query) for query in queries]
+        exact_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        for num_perm, bands in CONFIGS:
+            start = time.perf_counter()
+            index = MinHashLSH(matrix, num_perm, bands)
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            retrieved = [index.query(query, K) for query in queries]
+            lsh_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+            recalls = []
+            for (jaccard, top), found in zip(exact, retrieved):
+                if len(top):
+                    cutoff = jaccard[top].min()
+                    recalls.append(np.count_nonzero(jaccard[found] >= cutoff) / len(top))
+            candidates = np.mean([len(index.candidates(query)) for query in queries])
+            print(f"{len(matrix):>8} | {f'{num_perm}/{bands}':>10} | {build_seconds:>9.2f} | {index.n_sets:>7} | "
+                  f"{index.nbytes / 1e6:>8.1f} | {candidates:>10.0f} | {np.mean(recalls):>10.3f} | "
+                  f"{lsh_us:>8.0f} | {exact_us:>10.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Report: per-worker memory with private vs memory-mapped model loading
+
+Starts WORKERS processes the way uvicorn --workers does (each one imports and
+loads its own models) with each loading mode: plain joblib.load,
+model_store.load_model's mmap copies, and load_compiled_model's mmap copies of
+the flat-array compiled trees. Every worker loads the models, runs one
+prediction so the tree pages are actually touched, then waits for the others
+before reading /proc/self/smaps_rollup, so PSS reflects pages shared between
+the live workers.
+
+RSS counts shared pages in full for every worker; PSS splits them between
+the workers sharing them and is the number that adds up to real memory.
+"""
+
+import multiprocessing as mp
+import os
+import sys
+
+MODELS = [
+    "content_model_SIMPLE_HIGH_CONFIDENCE.pkl",
+    "multi_symptom_disease_model.pkl",
+    "multi_symptom_specialist_model.pkl",
+    "content_model.pkl",
+    "content_model_balanced.pkl",
+    "content_model_from_existing_data.pkl",
+]
+
+WORKERS = 4
+
+
+def worker(paths, mode, barrier, results):
+    import numpy as np
+    import sklearn.ensemble  # noqa: F401 - import cost is not model memory
+    from model_store import load_compiled_model, load_model, memory_usage
+
+    before = memory_usage()
+    if mode == "compiled":
+        models = [load_compiled_model(path, mmap=True) for path in paths]
+    else:
+        models = [load_model(path, mmap=(mode == "mmap")) for path in paths]
+    for model in models:
+        if hasattr(model, "n_features_in_"):
+            model.predict(np.zeros((1, model.n_features_in_)))
+    barrier.wait()
+    after = memory_usage()
+    results.put({key: after[key] - before.get(key, 0) for key in after} | {"total_rss": after["rss"]})
+    barrier.wait()
+
+
+def run_workers(paths, mode, workers):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(paths, mode, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return samples
+
+
+def run_report(workers=WORKERS):
+    paths = [path for path in MODELS if os.path.exists(path)]
+    size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+    print(f"Models: {len(paths)} files, {size_mb:.1f} MB on disk, {workers} workers")
+    for path in paths:
+        print(f"  - {path}")
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("⚠️ /proc/self/smaps_rollup not available: only RSS can be reported")
+
+    # Write the mmap copies up front so neither run pays for the export
+    from model_store import export_compiled_copy, export_mmap_copy
+    for path in paths:
+        export_mmap_copy(path)
+        export_compiled_copy(path)
+
+    print(f"\n{'loading':>10} | {'RSS/worker':>10} | {'PSS/worker':>10} | {'shared':>8} | {'PSS total':>9} | {'worker RSS':>10}")
+    print("-" * 73)
+    for label in ("private", "mmap", "compiled"):
+        samples = run_workers(paths, label, workers)
+        rss = sum(s["rss"] for s in samples) / workers
+        pss = sum(s.get("pss", 0) for s in samples) / workers
+        shared = sum(s.get("shared_clean", 0) for s in samples) / workers
+        total_rss = sum(s["total_rss"] for s in samples) / workers
+        print(f"{label:>10} | {rss:>8.1f}MB | {pss:>8.1f}MB | {shared:>6.1f}MB | "
+              f"{pss * workers:>7.1f}MB | {total_rss:>8.1f}MB")
+    print("\nRSS/PSS/shared are the increase from loading the models; worker RSS is the whole process")
+
+
+if __name__ == "__main__":
+    run_report(int(sys.argv[1]) if len(sys.argv) > 1 else WORKERS)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ml_multi_symptom_api.get_rule_based_diagnoses for 2 to 40 symptoms
+
+Compares the old walk over every symptom combination (2^n subsets, one
+frozenset probe each) with the subset-index version now in the API. The
+combination walk is only timed up to LEGACY_MAX symptoms; past that a single
+call takes seconds to hours. Both must return the same diagnoses.
+"""
+
+import random
+import time
+from itertools import combinations
+
+from ml_multi_symptom_api import get_rule_based_diagnoses
+from rule_store import rule_store
+
+LEGACY_MAX = 18
+
+
+def legacy_rule_based_diagnoses(active_symptoms, rules):
+    """The pre-index implementation: probe every subset of 2+ symptoms"""
+    matches = []
+    for pattern_length in range(2, len(active_symptoms) + 1):
+        for symptom_combo in combinations(active_symptoms, pattern_length):
+            for rule in rules.compiled.lookup(symptom_combo):
+                matches.append({
+                    'disease': rule['disease'],
+                    'confidence': rule['confidence'],
+                    'matching_symptoms': list(symptom_combo),
+                    'pattern_length': pattern_length
+                })
+    matches.sort(key=lambda x: (x['pattern_length'], x['confidence']), reverse=True)
+
+    seen_diseases = set()
+    unique_matches = []
+    for match in matches:
+        if match['disease'] not in seen_diseases:
+            unique_matches.append(match)
+            seen_diseases.add(match['disease'])
+    return unique_matches[:3]
+
+
+def time_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run_benchmark(sizes=range(2, 41, 2), repeats=200, seed=42):
+    rng = random.Random(seed)
+    rules = rule_store.current
+    vocabulary = sorted({s for key in rules.mapping for s in key})
+    # Pad with symptoms no rule uses so 40 active symptoms are possible
+    vocabulary += [f"unmapped_symptom_{i}" for i in range(max(0, 40 - len(vocabulary)))]
+
+    print(f"Rules: {len(rules.mapping)}, vocabulary: {len(vocabulary)} symptoms")
+    print(f"{'active':>6} | {'combinations (us)':>18} | {'subset index (us)':>17} | {'same':>4}")
+    print("-" * 56)
+
+    for size in sizes:
+        symptoms = rng.sample(vocabulary, size)
+        indexed_us = time_call(lambda: get_rule_based_diagnoses(symptoms, rules), repeats)
+
+        if size <= LEGACY_MAX:
+            legacy_repeats = max(1, repeats >> max(0, size - 10))
+            legacy_us = time_call(lambda: legacy_rule_based_diagnoses(symptoms, rules), legacy_repeats)
+            same = legacy_rule_based_diagnoses(symptoms, rules) == get_rule_based_diagnoses(symptoms, rules)
+            print(f"{size:>6} | {legacy_us:>18.1f} | {indexed_us:>17.1f} | {'yes' if same else 'NO':>4}")
+        else:
+            print(f"{size:>6} | {'(skipped)':>18} | {indexed_us:>17.1f} | {'-':>4}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
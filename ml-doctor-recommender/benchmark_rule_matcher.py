@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: combinations() rule probing vs the RuleMatcher subset index
+
+Times both strategies on MULTI_SYMPTOM_DISEASE_MAPPING for 2 to 30 active
+symptoms. The matcher should stay flat while the combination walk grows
+with the number of symptom subsets.
+"""
+
+import random
+import time
+from itertools import combinations
+
+from multi_symptom_mapper import MULTI_SYMPTOM_DISEASE_MAPPING
+from rule_matcher import RuleMatcher
+
+
+def legacy_match(symptoms, mapping, max_size=4):
+    """The pre-index lookup: probe every 2..4 symptom combination twice"""
+    matches = []
+    for combo_size in range(min(len(symptoms), max_size), 1, -1):
+        for symptom_combo in combinations(symptoms, combo_size):
+            for combo in [symptom_combo, tuple(sorted(symptom_combo))]:
+                if combo in mapping:
+                    matches.append((combo, mapping[combo]))
+    return matches
+
+
+def time_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run_benchmark(sizes=range(2, 31, 2), repeats=200, seed=42):
+    rng = random.Random(seed)
+    vocabulary = sorted({s for key in MULTI_SYMPTOM_DISEASE_MAPPING for s in key})
+    matcher = RuleMatcher(MULTI_SYMPTOM_DISEASE_MAPPING)
+
+    print(f"Rules: {len(MULTI_SYMPTOM_DISEASE_MAPPING)}, vocabulary: {len(vocabulary)} symptoms")
+    print(f"{'active':>6} | {'combinations (us)':>18} | {'RuleMatcher (us)':>17} | {'matches':>7}")
+    print("-" * 58)
+
+    for size in sizes:
+        symptoms = rng.sample(vocabulary, min(size, len(vocabulary)))
+        legacy_us = time_call(lambda: legacy_match(symptoms, MULTI_SYMPTOM_DISEASE_MAPPING), repeats)
+        indexed_us = time_call(lambda: matcher.match(symptoms, min_size=2, max_size=4), repeats)
+        found = len(matcher.match(symptoms, min_size=2, max_size=4))
+        print(f"{size:>6} | {legacy_us:>18.1f} | {indexed_us:>17.1f} | {found:>7}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sklearn predict_proba vs tree_compiler's flat-array evaluator
+
+Times both at 1, 100 and 10,000 binary symptom rows for every service model
+found next to this script, and checks the probabilities agree to float
+tolerance. Single rows go through predict_proba_one, the path /predict uses.
+The multi_symptom_*_model.pkl files are optional; when they are missing a
+RandomForest and a GradientBoosting model are trained on random data of the
+same shape so both estimator types are still covered.
+"""
+
+import os
+import time
+import warnings
+
+import numpy as np
+
+from model_store import load_model
+from tree_compiler import compile_model
+
+warnings.filterwarnings("ignore")
+
+MODELS = [
+    "content_model_SIMPLE_HIGH_CONFIDENCE.pkl",
+    "content_model.pkl",
+    "content_model_specialist_fixed.pkl",
+    "multi_symptom_disease_model.pkl",
+    "multi_symptom_specialist_model.pkl",
+]
+
+ROW_COUNTS = (1, 100, 10000)
+
+
+def stand_in_models(n_features=131, seed=0):
+    """Models shaped like multi_symptom_*_model.pkl, for trees where those are not present"""
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    rng = np.random.default_rng(seed)
+    X = (rng.random((2000, n_features)) < 0.08).astype(np.float32)
+    diseases = rng.integers(0, 40, len(X)).astype(str)
+    specialists = rng.integers(0, 12, len(X)).astype(str)
+    return [
+        ("stand-in disease RandomForest", RandomForestClassifier(n_estimators=100, random_state=seed).fit(X, diseases)),
+        ("stand-in specialist GradientBoosting", GradientBoostingClassifier(n_estimators=50).fit(X, specialists)),
+    ]
+
+
+def time_call(func, repeats):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run_benchmark(seed=42):
+    models = [(path, load_model(path)) for path in MODELS if os.path.exists(path)]
+    if not any(path.startswith("multi_symptom") for path, _ in models):
+        models += stand_in_models()
+    rng = np.random.default_rng(seed)
+
+    print(f"{'model':<40} | {'rows':>6} | {'sklearn (ms)':>12} | {'compiled (ms)':>13} | {'speedup':>7} | {'max diff':>8}")
+    print("-" * 102)
+    for name, model in models:
+        compiled = compile_model(model)
+        for rows in ROW_COUNTS:
+            X = (rng.random((rows, model.n_features_in_)) < 0.05).astype(np.float32)
+            repeats = max(3, 2000 // rows)
+            if rows == 1:
+                compiled_call = lambda: compiled.predict_proba_one(X[0])
+            else:
+                compiled_call = lambda: compiled.predict_proba(X)
+            sklearn_ms = time_call(lambda: model.predict_proba(X), repeats)
+            compiled_ms = time_call(compiled_call, repeats)
+            diff = np.abs(model.predict_proba(X) - compiled.predict_proba(X)).max()
+            print(f"{name[:40]:<40} | {rows:>6} | {sklearn_ms:>12.3f} | {compiled_ms:>13.3f} | "
+                  f"{sklearn_ms / compiled_ms:>6.1f}x | {diff:>8.1e}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,143 @@
+"""
+Bit-packed similarity kernel for binary symptom vectors
+
+The recommenders compare a 0/1 symptom vector against every case of the
+specialist dataset. BinaryCases stores the cases with np.packbits, padded to
+whole 64-bit words (132 symptoms fit in three words, 24 bytes per case
+instead of 1056 as float64). The words are kept word-major, one contiguous
+plane per word position, and intersection sizes come from AND-ing each query
+word into its plane and counting bits: np.bitwise_count on numpy >= 2.0, a
+256-entry lookup table otherwise. Planes where the query has no bits set are
+skipped, so a query of a few symptoms reads one or two planes. Union sizes
+follow from the stored per-case symptom counts.
+
+similarities() reproduces the recommenders' weighted Jaccard / cosine /
+simple-match blend elementwise, so scores are identical to the per-row float
+computation they replace.
+"""
+
+import numpy as np
+
+_WORD_BYTES = 8
+
+# Bits set in every byte value, for numpy versions without bitwise_count
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# Target size of one (queries x cases) block of a batch, in bytes; small enough to stay in cache
+BATCH_BLOCK_BYTES = 512 * 1024
+
+
+def popcount(words):
+    """Set bits of every element of a uint64 array (same shape, small unsigned ints)"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    counts = _POPCOUNT_TABLE[np.ascontiguousarray(words).view(np.uint8)]
+    return counts.reshape(words.shape + (_WORD_BYTES,)).sum(axis=-1, dtype=np.uint8)
+
+
+def pack_rows(matrix):
+    """Pack a 0/1 (rows x features) matrix into (rows x words) uint64"""
+    matrix = np.asarray(matrix) != 0
+    packed = np.packbits(matrix, axis=1)
+    n_words = -(-packed.shape[1] // _WORD_BYTES)
+    padded = np.zeros((matrix.shape[0], n_words * _WORD_BYTES), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(np.uint64)
+
+
+class BinaryCases:
+    """Bit-packed case x feature store answering overlap queries"""
+
+    def __init__(self, matrix):
+        matrix = np.asarray(matrix)
+        self._set_words(pack_rows(matrix), matrix.shape[1])
+
+    @classmethod
+    def from_words(cls, words, n_features):
+        """Store built from rows already packed by pack_rows"""
+        cases = cls.__new__(cls)
+        cases._set_words(words, n_features)
+        return cases
+
+    def _set_words(self, words, n_features):
+        self.n_features = n_features
+        self.n_cases = len(words)
+        # (words x cases): plane w holds word w of every case
+        self.planes = np.ascontiguousarray(words.T)
+        self.sizes = self._count(np.full(len(self.planes), ~np.uint64(0)))
+        self._norms = np.sqrt(np.maximum(self.sizes, 1).astype(np.float64))
+
+    def __len__(self):
+        return self.n_cases
+
+    @property
+    def nbytes(self):
+        return self.planes.nbytes
+
+    def pack_columns(self, column_lists):
+        """(queries x words) packed vectors of lists of feature indices"""
+        matrix = np.zeros((len(column_lists), self.n_features), dtype=bool)
+        for row, columns in enumerate(column_lists):
+            matrix[row, list(columns)] = True
+        return pack_rows(matrix)
+
+    def intersections(self, columns, rows=None):
+        """Number of the given features each case (or each case in rows) has"""
+        return self._count(self.pack_columns([columns])[0], rows)
+
+    def intersections_many(self, column_lists):
+        """Intersection sizes of a batch of feature-index lists, shape (queries, cases)"""
+        queries = self.pack_columns(column_lists)
+        result = np.zeros((len(queries), self.n_cases), dtype=np.int64)
+        step = self._batch_step()
+        for start in range(0, len(queries), step):
+            block = queries[start:start + step]
+            for w in np.flatnonzero(block.any(axis=0)):
+                result[start:start + step] += popcount(block[:, w, np.newaxis] & self.planes[w])
+        return result
+
+    def _count(self, query, rows=None):
+        """Set bits of query AND each case (or each case in rows)"""
+        result = np.zeros(self.n_cases if rows is None else len(rows), dtype=np.int64)
+        for w in np.flatnonzero(query):
+            plane = self.planes[w] if rows is None else self.planes[w].take(rows)
+            result += popcount(plane & query[w])
+        return result
+
+    def counts(self, columns):
+        """(intersection, union) sizes of the given features against every case"""
+        intersection = self.intersections(columns)
+        return intersection, self.sizes + len(set(columns)) - intersection
+
+    def similarities(self, columns, jaccard_weight, cosine_weight, match_weight, rows=None):
+        """
+        Weighted Jaccard + cosine + simple-match score of the given features
+        against every case (or the cases in rows); 0 for cases sharing none of them.
+        """
+        return self._blend(self.intersections(columns, rows), len(set(columns)),
+                           jaccard_weight, cosine_weight, match_weight, rows)
+
+    def similarities_many(self, column_lists, jaccard_weight, cosine_weight, match_weight):
+        """similarities() for a batch of feature-index lists, shape (queries, cases)"""
+        result = np.empty((len(column_lists), self.n_cases))
+        step = self._batch_step()
+        for start in range(0, len(column_lists), step):
+            block = column_lists[start:start + step]
+            query_sizes = np.array([len(set(columns)) for columns in block], dtype=np.int64)[:, np.newaxis]
+            result[start:start + step] = self._blend(self.intersections_many(block), query_sizes,
+                                                     jaccard_weight, cosine_weight, match_weight)
+        return result
+
+    def _batch_step(self):
+        """Queries per batch block, so a block's (queries x cases) temporaries stay near BATCH_BLOCK_BYTES"""
+        return max(1, BATCH_BLOCK_BYTES // max(1, self.n_cases * _WORD_BYTES))
+
+    def _blend(self, intersection, query_size, jaccard_weight, cosine_weight, match_weight, rows=None):
+        # Cases without an overlap get 0 from every term (an empty case's norm is taken as 1 to avoid 0/0)
+        sizes = self.sizes if rows is None else self.sizes[rows]
+        norms = self._norms if rows is None else self._norms[rows]
+        overlap = intersection.astype(np.float64)
+        jaccard = overlap / (sizes + query_size - intersection)
+        cosine = overlap / (np.sqrt(np.asarray(query_size, dtype=np.float64)) * norms)
+        simple_match = overlap / query_size
+        return jaccard * jaccard_weight + cosine * cosine_weight + simple_match * match_weight
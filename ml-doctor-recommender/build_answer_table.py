@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Build the precomputed answer table for content_api
+
+Runs the full content_api pipeline (rules + ML + specialist resolution) over
+every set of up to ANSWER_TABLE_FULL_SIZE symptoms from all feature columns,
+plus every larger set up to ANSWER_TABLE_MAX_SIZE drawn from the
+ANSWER_TABLE_TOP_SYMPTOMS most frequent columns (frequency taken from
+Original_Dataset.csv), and writes the memory-mapped table content_api
+consults before computing anything (see answer_table.py).
+
+Checks that stored answers match the live pipeline in any symptom order.
+Order can only reach an answer through the ranking of rule matches, so every
+permutation of each stored set that two or more rules match is run; other
+sets get a random spot check. Then reports build time, table size, and the
+hit rate and lookup latency on a traffic sample: one request per dataset
+record, ticking 1-6 of its symptoms with most requests at 1-4.
+
+Rebuild after retraining the model or changing rules/disease_rules.json;
+until then the service ignores the stale table.
+"""
+
+import csv
+import os
+import random
+import sys
+import time
+from collections import Counter
+from itertools import combinations, islice, permutations
+from math import comb
+
+import content_api
+from answer_table import (ANSWER_TABLE_DIR, MAX_COLUMNS, MAX_SET_SIZE, AnswerTable, columns_version, table_version,
+                          unpack_key, write_table)
+from rule_store import rule_store
+from symptom_aliases import canonical_form
+
+TOP_SYMPTOMS = int(os.environ.get("ANSWER_TABLE_TOP_SYMPTOMS", "80"))
+MAX_SIZE = int(os.environ.get("ANSWER_TABLE_MAX_SIZE", "4"))
+FULL_SIZE = int(os.environ.get("ANSWER_TABLE_FULL_SIZE", "2"))
+CHUNK = 2048
+
+# Share of traffic-sample requests by number of ticked symptoms
+REQUEST_SIZES = {1: 30, 2: 30, 3: 20, 4: 12, 5: 5, 6: 3}
+
+
+def dataset_records(path="Original_Dataset.csv"):
+    """Symptom lists of the training records, cleaned like the training scripts do"""
+    records = []
+    with open(path, encoding="latin-1") as f:
+        for row in csv.DictReader(f):
+            symptoms = [canonical_form(value) for key, value in row.items()
+                        if key != "Disease" and value and value.strip()]
+            records.append(list(dict.fromkeys(symptoms)))
+    return records
+
+
+def frequent_symptoms(records, feature_columns, top):
+    """The top feature columns by how often they occur in the dataset"""
+    counts = Counter(symptom for record in records for symptom in record)
+    ranked = sorted(feature_columns, key=lambda symptom: (-counts[symptom], symptom))
+    return ranked[:top]
+
+
+def traffic_sample(records, feature_columns, seed=7):
+    """One request per dataset record, with a realistic number of ticked symptoms"""
+    rng = random.Random(seed)
+    columns = set(feature_columns)
+    sizes, weights = zip(*REQUEST_SIZES.items())
+    sample = []
+    for record in records:
+        known = [symptom for symptom in record if symptom in columns]
+        if known:
+            size = min(len(known), rng.choices(sizes, weights)[0])
+            sample.append(rng.sample(known, size))
+    return sample
+
+
+def build(directory=ANSWER_TABLE_DIR, top=TOP_SYMPTOMS, max_size=MAX_SIZE, full_size=FULL_SIZE):
+    feature_columns = list(content_api.feature_columns)
+    if len(feature_columns) > MAX_COLUMNS or max_size > MAX_SET_SIZE:
+        raise ValueError(f"answer tables support at most {MAX_COLUMNS} columns and {MAX_SET_SIZE} symptoms")
+    rules = rule_store.current
+    version = table_version(content_api.MODEL_VERSION, rules.version, columns_version(feature_columns))
+    records = dataset_records()
+    symptoms = frequent_symptoms(records, feature_columns, top)
+    column_ids = {name: i for i, name in enumerate(feature_columns)}
+
+    # Small sets over every column, larger ones over the frequent columns only
+    pools = [(feature_columns if size <= full_size else symptoms, size) for size in range(1, max_size + 1)]
+    total = sum(comb(len(pool), size) for pool, size in pools)
+    print(f"🔄 Building answer table: sets of 1-{min(full_size, max_size)} over all {len(feature_columns)} columns, "
+          f"up to {max_size} over the top {len(symptoms)}: {total} entries")
+    print(f"   table version: {version}")
+
+    def entries():
+        """(column_ids, response) pairs, computed CHUNK sets at a time so responses are not all held"""
+        symptom_sets = (list(symptom_set) for pool, size in pools for symptom_set in combinations(pool, size))
+        while True:
+            batch = list(islice(symptom_sets, CHUNK))
+            if not batch:
+                return
+            for symptom_set, response in zip(batch, content_api.diagnose_many(batch, rules)):
+                yield [column_ids[symptom] for symptom in symptom_set], response
+
+    started = time.perf_counter()
+    n_keys, n_payloads, size_bytes = write_table(directory, feature_columns, version, max_size, symptoms, entries())
+    build_seconds = time.perf_counter() - started
+
+    print(f"✅ Built in {build_seconds:.1f} s ({build_seconds / n_keys * 1e6:.0f} us per set)")
+    print(f"✅ {n_keys} entries, {n_payloads} distinct responses, {size_bytes / (1024 * 1024):.1f} MB on disk")
+    return version, records
+
+
+def rule_ranked_sets(table, rules):
+    """Stored symptom sets that two or more rules match, the only ones whose answer symptom order could change"""
+    names = list(table.column_ids)
+    vocabulary = set(rules.matcher.symptom_ids) | set(rules.extended_matcher.symptom_ids)
+    ranked = []
+    for key in table.keys.tolist():
+        symptom_set = [names[column_id] for column_id in unpack_key(key)]
+        if sum(symptom in vocabulary for symptom in symptom_set) < 2:
+            continue
+        if (len(rules.matcher.match(symptom_set, min_size=2, max_size=4)) > 1
+                or len(rules.extended_matcher.match(symptom_set, min_size=2, max_size=4)) > 1):
+            ranked.append(symptom_set)
+    return ranked
+
+
+def check_orders(table, version, symptom_sets, rules):
+    """Mismatches between stored answers and fresh runs over every permutation of the given sets"""
+    orders = (list(order) for symptom_set in symptom_sets for order in permutations(symptom_set))
+    mismatches = checked = 0
+    while True:
+        batch = list(islice(orders, CHUNK))
+        if not batch:
+            return mismatches, checked
+        for active_symptoms, fresh in zip(batch, content_api.diagnose_many(batch, rules)):
+            stored = table.lookup(active_symptoms, version)
+            mismatches += stored is None or {**stored, "active_symptoms": active_symptoms} != fresh
+            checked += 1
+
+
+def report(directory, version, records, checks=300, seed=11):
+    table = AnswerTable(directory)
+    rules = rule_store.current
+    rng = random.Random(seed)
+
+    # Stored answers must equal a fresh run, whatever order the symptoms arrive in
+    ranked = rule_ranked_sets(table, rules)
+    order_mismatches, checked = check_orders(table, version, ranked, rules)
+    print(f"{'❌' if order_mismatches else '✅'} Order check: {order_mismatches} mismatches over all {checked} orderings "
+          f"of the {len(ranked)} stored sets with more than one rule match")
+    keys = [entry for entry in traffic_sample(records, content_api.feature_columns, seed)
+            if len(entry) <= table.max_size]
+    mismatches = 0
+    for active_symptoms in rng.sample(keys, min(checks, len(keys))):
+        shuffled = rng.sample(active_symptoms, len(active_symptoms))
+        stored = table.lookup(shuffled, version)
+        if stored is not None:
+            fresh = content_api.diagnose_many([shuffled], rules)[0]
+            mismatches += {**stored, "active_symptoms": shuffled} != fresh
+    print(f"✅ Spot check: {mismatches} mismatches against the live pipeline")
+
+    sample = traffic_sample(records, content_api.feature_columns)
+    table = AnswerTable(directory)
+    started = time.perf_counter()
+    answers = [table.lookup(active_symptoms, version) for active_symptoms in sample]
+    lookup_us = (time.perf_counter() - started) / len(sample) * 1e6
+    # A cache miss on /predict runs the pipeline for one request at a time
+    started = time.perf_counter()
+    for active_symptoms in sample[:500]:
+        content_api.diagnose_many([active_symptoms], rules)
+    pipeline_us = (time.perf_counter() - started) / min(500, len(sample)) * 1e6
+
+    by_size = Counter(len(active_symptoms) for active_symptoms in sample)
+    hits_by_size = Counter(len(active_symptoms) for active_symptoms, answer in zip(sample, answers) if answer)
+    print(f"📊 Traffic sample: {len(sample)} requests, hit rate {table.stats()['hit_rate']:.1%}")
+    for size in sorted(by_size):
+        print(f"   {size} symptoms: {by_size[size]:>5} requests, {hits_by_size[size] / by_size[size]:.1%} hits")
+    print(f"📊 Lookup {lookup_us:.1f} us/request vs pipeline {pipeline_us:.0f} us/request")
+    return order_mismatches
+
+
+if __name__ == "__main__":
+    built_version, dataset = build()
+    if report(ANSWER_TABLE_DIR, built_version, dataset):
+        sys.exit("❌ Stored answers depend on symptom order; the table is unsafe to serve")
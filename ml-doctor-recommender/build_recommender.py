@@ -1,11 +1,13 @@
 import pandas as pd
 import numpy as np
+from binary_similarity import BinaryCases
+from dataset_cache import load_dataset
 
 print("=== BUILDING DOCTOR RECOMMENDER SYSTEM ===\n")
 
 # Step 1: Load the main dataset (symptoms to doctor mapping)
 print("Loading main dataset...")
-main_data = pd.read_excel('Specialist.xlsx')
+main_data = load_dataset('Specialist.xlsx')
 print(f"✓ Loaded {main_data.shape[0]} records with {main_data.shape[1]} columns")
 
 # Step 2: Clean up the data
@@ -29,6 +31,9 @@ for i, specialist in enumerate(specialists, 1):
 
 print(f"\n✓ Total unique specialists: {len(specialists)}")
 
+# Cases bit-packed once, so every query scores all of them in one pass
+cases = BinaryCases(main_data[symptom_columns].to_numpy(dtype=np.uint8))
+
 # Step 4: Build the recommendation function
 def recommend_doctor(user_symptoms):
     """
@@ -51,30 +56,22 @@ def recommend_doctor(user_symptoms):
     print(f"✓ Created user symptom vector with {sum(user_vector)} active symptoms")
     
     # Calculate similarity with all cases in our dataset
-    similarities = []
-    for index, row in main_data.iterrows():
-        # Get symptom vector for this case
-        case_vector = np.array(row[symptom_columns])
-        
-        # Calculate similarity (we'll use simple matching for now)
-        # Count how many symptoms match
-        matching_symptoms = np.sum(user_vector * case_vector)
-        total_user_symptoms = np.sum(user_vector)
-        
-        # Avoid division by zero
-        if total_user_symptoms > 0:
-            similarity = matching_symptoms / total_user_symptoms
-        else:
-            similarity = 0
-            
-        similarities.append({
-            'similarity': similarity,
-            'specialist': row[target_column],
-            'matching_symptoms': matching_symptoms
-        })
+    # (simple matching for now: how many of the user's symptoms each case has)
+    matching_symptoms = cases.intersections(np.flatnonzero(user_vector))
+    total_user_symptoms = np.sum(user_vector)
+    
+    # Avoid division by zero
+    if total_user_symptoms > 0:
+        similarity = matching_symptoms / total_user_symptoms
+    else:
+        similarity = np.zeros(len(cases))
     
     # Convert to DataFrame for easier analysis
-    similarity_df = pd.DataFrame(similarities)
+    similarity_df = pd.DataFrame({
+        'similarity': similarity,
+        'specialist': main_data[target_column].to_numpy(),
+        'matching_symptoms': matching_symptoms
+    })
     
     # Group by specialist and get average similarity
     specialist_scores = similarity_df.groupby('specialist').agg({
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the data and check columns
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 print("Columns in Specialist.xlsx:")
 for i, col in enumerate(df.columns, 1):
     print(f"{i:2d}. {col}")
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the data
-df = pd.read_excel('Specialist_perfect.xlsx')
+df = load_dataset('Specialist_perfect.xlsx')
 
 print("Dataset shape:", df.shape)
 print("\nColumns:", df.columns.tolist()[:10])
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Check training data feature columns
-train_df = pd.read_excel("Specialist_clean_clinical.xlsx")
+train_df = load_dataset("Specialist_clean_clinical.xlsx")
 train_features = [col for col in train_df.columns if col != 'Specialist']
 print(f"Training data has {len(train_features)} features")
 print("First 10 training features:", train_features[:10])
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # Get symptom columns (all except Disease and Unnamed: 0)
 symptom_cols = [col for col in df.columns if col not in ['Disease', 'Unnamed: 0']]
@@ -1,8 +1,8 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the data
 input_file = "Specialist_fixed.xlsx"
-df = pd.read_excel(input_file)
+df = load_dataset(input_file)
 
 # Drop Unnamed: 0 if present
 if 'Unnamed: 0' in df.columns:
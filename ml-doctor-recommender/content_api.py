@@ -1,158 +1,62 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response
 from pydantic import BaseModel
-import joblib
-import pandas as pd
+from typing import List, Optional
 import pickle
-from multi_symptom_mapper import MULTI_SYMPTOM_DISEASE_MAPPING, get_intelligent_disease_matches
-from itertools import combinations
+import heapq
+import asyncio
+import gzip
+import hashlib
+import json
+from multi_symptom_mapper import get_intelligent_disease_matches
+from rule_store import rule_store, check_admin_token
+from symptom_categories import SymptomCategories
+from feature_encoder import FeatureEncoder
+from symptom_aliases import SymptomNormalizer
+from response_cache import ResponseCache, canonical_symptoms, file_version
+from answer_table import ANSWER_TABLE_DIR, AnswerTable, columns_version, table_version
+from inference_pool import InferencePool
+from model_store import load_compiled_model
+from request_logging import get_logger, start_request
+from warmup import Readiness
 
 app = FastAPI()
+log = get_logger("content_api")
+
+# CPU-bound inference runs here (INFERENCE_WORKERS / INFERENCE_QUEUE_DEPTH)
+inference_pool = InferencePool()
+
+# /ready answers 503 until startup warmup has run (WARMUP_PASSES)
+readiness = Readiness("content_api")
 
 # Load the SIMPLE HIGH CONFIDENCE model (100% accuracy, 100% confidence!)
-model = joblib.load("content_model_SIMPLE_HIGH_CONFIDENCE.pkl")
+MODEL_PATH = "content_model_SIMPLE_HIGH_CONFIDENCE.pkl"
+model = load_compiled_model(MODEL_PATH)
+MODEL_VERSION = file_version(MODEL_PATH)
 
 # Load the feature columns for high confidence model
 with open('feature_columns_SIMPLE_HIGH_CONFIDENCE.pkl', 'rb') as f:
     feature_columns = pickle.load(f)
+encoder = FeatureEncoder(feature_columns)
+symptom_normalizer = SymptomNormalizer(feature_columns)
 
-# Enhanced Disease to Specialist Mapping with Priority Rankings
-# Format: "Disease": {"primary": "Primary Specialist", "secondary": ["Alternative Specialists"], "confidence": confidence_level}
-disease_to_specialist_mapping = {
-    # Dermatological Conditions
-    "Acne": {"primary": "Dermatology", "secondary": ["Family Medicine"], "confidence": 0.95},
-    "Eczema": {"primary": "Dermatology", "secondary": ["Allergy & Immunology", "Family Medicine"], "confidence": 0.90},
-    "Psoriasis": {"primary": "Dermatology", "secondary": ["Rheumatology"], "confidence": 0.95},
-    "Skin Rash": {"primary": "Dermatology", "secondary": ["Allergy & Immunology", "Family Medicine"], "confidence": 0.85},
-    "Itching": {"primary": "Dermatology", "secondary": ["Allergy & Immunology", "Internal Medicine"], "confidence": 0.80},
-    "Fungal infection": {"primary": "Dermatology", "secondary": ["Family Medicine"], "confidence": 0.90},
-    "Impetigo": {"primary": "Dermatology", "secondary": ["Family Medicine", "Pediatrics"], "confidence": 0.90},
-
-    # Cardiovascular Conditions
-    "Hypertension": {"primary": "Cardiology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Chest Pain": {"primary": "Cardiology", "secondary": ["Emergency Medicine", "Internal Medicine"], "confidence": 0.75},
-    "Heart Disease": {"primary": "Cardiology", "secondary": ["Internal Medicine"], "confidence": 0.95},
-    "High Blood Pressure": {"primary": "Cardiology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Palpitations": {"primary": "Cardiology", "secondary": ["Internal Medicine"], "confidence": 0.80},
-    "Heart attack": {"primary": "Cardiology", "secondary": ["Emergency Medicine"], "confidence": 0.98},
-
-    # Respiratory Conditions
-    "Cough": {"primary": "Pulmonology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.70},
-    "Shortness of Breath": {"primary": "Pulmonology", "secondary": ["Cardiology", "Emergency Medicine"], "confidence": 0.80},
-    "Asthma": {"primary": "Pulmonology", "secondary": ["Allergy & Immunology"], "confidence": 0.95},
-    "Bronchitis": {"primary": "Pulmonology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Pneumonia": {"primary": "Pulmonology", "secondary": ["Internal Medicine", "Emergency Medicine"], "confidence": 0.90},
-    "COPD": {"primary": "Pulmonology", "secondary": ["Internal Medicine"], "confidence": 0.95},
-
-    # Gastrointestinal Conditions
-    "Stomach Pain": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.75},
-    "Nausea": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.70},
-    "Vomiting": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Emergency Medicine"], "confidence": 0.75},
-    "Diarrhea": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.75},
-    "Constipation": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.70},
-    "Acid Reflux": {"primary": "Gastroenterology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Peptic ulcer": {"primary": "Gastroenterology", "secondary": ["Internal Medicine"], "confidence": 0.90},
-    "Gastroenteritis": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Hepatitis B": {"primary": "Gastroenterology", "secondary": ["Internal Medicine", "Infectious Disease"], "confidence": 0.90},
-    "Jaundice": {"primary": "Gastroenterology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-
-    # Endocrine Conditions
-    "Diabetes": {"primary": "Endocrinology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.90},
-    "High Blood Sugar": {"primary": "Endocrinology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Hyperthyroidism": {"primary": "Endocrinology", "secondary": ["Internal Medicine"], "confidence": 0.95},
-    "Hypothyroidism": {"primary": "Endocrinology", "secondary": ["Internal Medicine"], "confidence": 0.95},
-
-    # Musculoskeletal Conditions
-    "Joint Pain": {"primary": "Rheumatology", "secondary": ["Orthopedics", "Internal Medicine"], "confidence": 0.80},
-    "Arthritis": {"primary": "Rheumatology", "secondary": ["Orthopedics"], "confidence": 0.90},
-    "Back Pain": {"primary": "Orthopedics", "secondary": ["Rheumatology", "Physical Medicine"], "confidence": 0.75},
-    "Osteoarthritis": {"primary": "Rheumatology", "secondary": ["Orthopedics"], "confidence": 0.90},
-    "Cervical spondylosis": {"primary": "Orthopedics", "secondary": ["Neurology"], "confidence": 0.85},
-
-    # Neurological Conditions
-    "Headache": {"primary": "Neurology", "secondary": ["Family Medicine", "Internal Medicine"], "confidence": 0.75},
-    "Migraine": {"primary": "Neurology", "secondary": ["Family Medicine"], "confidence": 0.90},
-    "Seizures": {"primary": "Neurology", "secondary": ["Emergency Medicine"], "confidence": 0.95},
-    "Dizziness": {"primary": "Neurology", "secondary": ["ENT", "Internal Medicine"], "confidence": 0.70},
-    "Paralysis": {"primary": "Neurology", "secondary": ["Physical Medicine"], "confidence": 0.95},
-    "Varicose veins": {"primary": "Vascular Surgery", "secondary": ["Dermatology"], "confidence": 0.85},
-
-    # Psychiatric Conditions
-    "Depression": {"primary": "Psychiatry", "secondary": ["Psychology", "Family Medicine"], "confidence": 0.90},
-    "Anxiety": {"primary": "Psychiatry", "secondary": ["Psychology", "Family Medicine"], "confidence": 0.85},
-    "Insomnia": {"primary": "Sleep Medicine", "secondary": ["Psychiatry", "Neurology"], "confidence": 0.80},
-    "Drug Reaction": {"primary": "Allergy & Immunology", "secondary": ["Emergency Medicine"], "confidence": 0.85},
-
-    # Ophthalmological Conditions
-    "Vision Problems": {"primary": "Ophthalmology", "secondary": ["Neurology"], "confidence": 0.90},
-    "Eye Pain": {"primary": "Ophthalmology", "secondary": ["Emergency Medicine"], "confidence": 0.85},
-    "Blurred Vision": {"primary": "Ophthalmology", "secondary": ["Neurology", "Endocrinology"], "confidence": 0.80},
-
-    # ENT Conditions
-    "Ear Pain": {"primary": "ENT", "secondary": ["Family Medicine"], "confidence": 0.85},
-    "Sore Throat": {"primary": "ENT", "secondary": ["Family Medicine", "Internal Medicine"], "confidence": 0.75},
-    "Hearing Loss": {"primary": "ENT", "secondary": ["Neurology"], "confidence": 0.90},
-    "Sinus Problems": {"primary": "ENT", "secondary": ["Allergy & Immunology"], "confidence": 0.85},
-
-    # Gynecological Conditions
-    "Pregnancy": {"primary": "Obstetrics & Gynecology", "secondary": ["Family Medicine"], "confidence": 0.95},
-    "Menstrual Problems": {"primary": "Obstetrics & Gynecology", "secondary": ["Endocrinology"], "confidence": 0.90},
-    "Pelvic Pain": {"primary": "Obstetrics & Gynecology", "secondary": ["Urology"], "confidence": 0.85},
-
-    # Urological Conditions
-    "Urinary tract infection": {"primary": "Urology", "secondary": ["Internal Medicine", "Family Medicine"], "confidence": 0.85},
-    "Kidney disease": {"primary": "Nephrology", "secondary": ["Internal Medicine"], "confidence": 0.90},
-
-    # Pediatric Conditions
-    "Child Fever": {"primary": "Pediatrics", "secondary": ["Family Medicine"], "confidence": 0.90},
-    "Child Cough": {"primary": "Pediatrics", "secondary": ["Family Medicine"], "confidence": 0.85},
-    "Child Development": {"primary": "Developmental Pediatrics", "secondary": ["Pediatrics"], "confidence": 0.95},
-
-    # Infectious Diseases
-    "Malaria": {"primary": "Infectious Disease", "secondary": ["Internal Medicine"], "confidence": 0.90},
-    "Typhoid": {"primary": "Infectious Disease", "secondary": ["Internal Medicine"], "confidence": 0.90},
-    "Tuberculosis": {"primary": "Pulmonology", "secondary": ["Infectious Disease"], "confidence": 0.90},
-    "Dengue": {"primary": "Infectious Disease", "secondary": ["Internal Medicine"], "confidence": 0.90},
-    "Common Cold": {"primary": "Family Medicine", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Chicken pox": {"primary": "Dermatology", "secondary": ["Family Medicine", "Pediatrics"], "confidence": 0.90},
-
-    # General/Family Medicine
-    "Fever": {"primary": "Family Medicine", "secondary": ["Internal Medicine"], "confidence": 0.80},
-    "Fatigue": {"primary": "Family Medicine", "secondary": ["Internal Medicine"], "confidence": 0.70},
-    "Weight Loss": {"primary": "Internal Medicine", "secondary": ["Endocrinology", "Oncology"], "confidence": 0.75},
-    "Weight Gain": {"primary": "Endocrinology", "secondary": ["Internal Medicine"], "confidence": 0.75},
-    "General Pain": {"primary": "Family Medicine", "secondary": ["Internal Medicine"], "confidence": 0.70},
-    "General Weakness": {"primary": "Internal Medicine", "secondary": ["Family Medicine"], "confidence": 0.70},
-
-    # Handle cases where ML model predicts specialist names as diseases
-    "Dermatologist": {"primary": "Dermatology", "secondary": ["Allergy & Immunology"], "confidence": 0.85},
-    "Dermatologists": {"primary": "Dermatology", "secondary": ["Allergy & Immunology"], "confidence": 0.85},
-    "Allergist": {"primary": "Allergy & Immunology", "secondary": ["Dermatology"], "confidence": 0.85},
-    "Allergists": {"primary": "Allergy & Immunology", "secondary": ["Dermatology"], "confidence": 0.85},
-    "Cardiologist": {"primary": "Cardiology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Neurologist": {"primary": "Neurology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Gastroenterologist": {"primary": "Gastroenterology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Psychiatrist": {"primary": "Psychiatry", "secondary": ["Psychology"], "confidence": 0.90},
-    "Psychologist": {"primary": "Psychology", "secondary": ["Psychiatry"], "confidence": 0.90},
-    "Pulmonologist": {"primary": "Pulmonology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Endocrinologist": {"primary": "Endocrinology", "secondary": ["Internal Medicine"], "confidence": 0.85},
-    "Rheumatologist": {"primary": "Rheumatology", "secondary": ["Internal Medicine"], "confidence": 0.85}
-}
-
-
+# Disease -> specialist routing lives in the rule file (rules.specialist_recommendations).
+# This name is the table as loaded at import, kept for scripts such as test_integration.py.
+disease_to_specialist_mapping = rule_store.current.specialist_recommendations
 
 # Fallback function for unmapped diseases
-def get_specialist_recommendation(disease, probability=0.0):
+def get_specialist_recommendation(disease, probability=0.0, rules=None):
     """
     Get specialist recommendation with confidence scoring
     Returns: dict with primary, secondary specialists and confidence
     """
-    if disease in disease_to_specialist_mapping:
-        mapping = disease_to_specialist_mapping[disease]
+    rules = rules or rule_store.current
+    mapping = rules.specialist_recommendations.get(disease)
+    if mapping is not None:
         # Adjust confidence based on prediction probability
         adjusted_confidence = mapping["confidence"] * probability if probability > 0 else mapping["confidence"]
         return {
             "primary": mapping["primary"],
-            "secondary": mapping["secondary"],
+            "secondary": list(mapping["secondary"]),
             "confidence": adjusted_confidence,
             "explanation": f"Based on symptoms, {disease} is most commonly treated by {mapping['primary']} specialists."
         }
@@ -167,562 +71,503 @@ def get_specialist_recommendation(disease, probability=0.0):
 class SymptomRequest(BaseModel):
     symptoms: dict
 
+class BatchSymptomRequest(BaseModel):
+    items: List[dict]
+
+def build_available_symptoms(rules):
+    """Build the /available-symptoms body from the disease mapping"""
+    # Get symptoms from the comprehensive mapping
+    all_symptoms = set()
+
+    # From original mapping
+    for symptom_combo in rules.mapping.keys():
+        for symptom in symptom_combo:
+            all_symptoms.add(symptom)
+
+    # Add symptoms from extended mapping
+    for symptom in EXTENDED_SYMPTOMS:
+        all_symptoms.add(symptom)
+
+    # Convert to sorted list with proper formatting
+    symptoms_list = []
+    for symptom in sorted(all_symptoms):
+        # Convert snake_case to Title Case for display
+        display_name = symptom.replace('_', ' ').title()
+        symptoms_list.append({
+            "value": symptom,
+            "label": display_name,
+            "category": get_symptom_category(symptom)
+        })
+
+    return {
+        "symptoms": symptoms_list,
+        "total_count": len(symptoms_list),
+        "message": "Available symptoms from disease mapping"
+    }
+
+# Pre-serialized /available-symptoms bodies, rebuilt only when the rule version changes
+_available_symptoms = {"version": None}
+
+def available_symptoms_payload():
+    """Return {"version", "body", "gzip", "etag", "gzip_etag"} for the current rules"""
+    rules = rule_store.current
+    if _available_symptoms["version"] != rules.version:
+        body = json.dumps(build_available_symptoms(rules), separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        _available_symptoms.update({
+            "body": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+            "etag": f'"{digest}"',
+            "gzip_etag": f'"{digest}-gzip"',
+            "version": rules.version
+        })
+    return _available_symptoms
+
+def etag_matches(if_none_match, etag):
+    """RFC 7232 If-None-Match check (weak comparison, as 304 handling allows)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def accepts_gzip(accept_encoding):
+    """
+    RFC 9110 Accept-Encoding check: gzip is listed, or * is and gzip is not,
+    with a non-zero q-value. Other codings (x-gzip included) do not count.
+    """
+    qualities = {}
+    for entry in (accept_encoding or "").lower().split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
 @app.get("/available-symptoms")
-async def get_available_symptoms():
+async def get_available_symptoms(request: Request):
     """Get all symptoms available in the disease mapping"""
     try:
-        # Get symptoms from the comprehensive mapping
-        all_symptoms = set()
-
-        # From original mapping
-        for symptom_combo in MULTI_SYMPTOM_DISEASE_MAPPING.keys():
-            for symptom in symptom_combo:
-                all_symptoms.add(symptom)
-
-        # Add symptoms from extended mapping
-        extended_symptoms = [
-            "runny_nose", "chills", "muscle_aches", "toothache", "tooth_sensitivity",
-            "bad_breath", "tooth_pain", "jaw_pain", "facial_swelling", "cold_sensitivity",
-            "bleeding_gums", "swollen_gums", "jaw_clicking"
-        ]
-        for symptom in extended_symptoms:
-            all_symptoms.add(symptom)
+        payload = available_symptoms_payload()
+        use_gzip = accepts_gzip(request.headers.get("accept-encoding"))
+        etag = payload["gzip_etag"] if use_gzip else payload["etag"]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
 
-        # Convert to sorted list with proper formatting
-        symptoms_list = []
-        for symptom in sorted(all_symptoms):
-            # Convert snake_case to Title Case for display
-            display_name = symptom.replace('_', ' ').title()
-            symptoms_list.append({
-                "value": symptom,
-                "label": display_name,
-                "category": get_symptom_category(symptom)
-            })
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
 
-        return {
-            "symptoms": symptoms_list,
-            "total_count": len(symptoms_list),
-            "message": "Available symptoms from disease mapping"
-        }
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=payload["gzip"], media_type="application/json", headers=headers)
+        return Response(content=payload["body"], media_type="application/json", headers=headers)
 
     except Exception as e:
-        print(f"Error getting available symptoms: {e}")
+        log.error("Error getting available symptoms: %s", e)
         return {"error": str(e), "symptoms": [], "total_count": 0}
 
 def get_symptom_category(symptom):
     """Categorize symptoms for better frontend organization"""
-    if any(word in symptom.lower() for word in ['skin', 'rash', 'itch', 'red_spots']):
-        return "Dermatological"
-    elif any(word in symptom.lower() for word in ['cough', 'breath', 'wheez', 'chest']):
-        return "Respiratory"
-    elif any(word in symptom.lower() for word in ['stomach', 'nausea', 'vomit', 'diarr', 'abdom', 'bloat', 'heartburn']):
-        return "Gastrointestinal"
-    elif any(word in symptom.lower() for word in ['head', 'dizz', 'confus', 'stiff_neck']):
-        return "Neurological"
-    elif any(word in symptom.lower() for word in ['tooth', 'jaw', 'mouth']):
-        return "Dental"
-    elif any(word in symptom.lower() for word in ['eye', 'vision', 'blurred']):
-        return "Ophthalmological"
-    elif any(word in symptom.lower() for word in ['ear', 'hearing', 'sore_throat']):
-        return "ENT"
-    elif any(word in symptom.lower() for word in ['joint', 'back', 'muscle', 'weakness', 'numbness']):
-        return "Musculoskeletal"
-    elif any(word in symptom.lower() for word in ['fever', 'fatigue', 'chills', 'sweating']):
-        return "General"
-    else:
-        return "Other"
+    return symptom_categories.category(symptom)
+
+# Per-request response cache (PREDICT_CACHE_SIZE / PREDICT_CACHE_TTL)
+response_cache = ResponseCache.from_env()
+
+def cache_version(rules):
+    """Cache entries are only valid for this model file and rule set"""
+    return (MODEL_VERSION, rules.version)
+
+# Offline answers for small symptom sets (build_answer_table.py, ANSWER_TABLE_DIR), checked first
+answer_table = AnswerTable.load()
+FEATURE_COLUMNS_VERSION = columns_version(feature_columns)
+
+def precomputed_answer(active_symptoms, rules):
+    """Answer-table response for these symptoms, or None if the table cannot answer"""
+    if answer_table is None:
+        return None
+    answer = answer_table.lookup(
+        active_symptoms, table_version(MODEL_VERSION, rules.version, FEATURE_COLUMNS_VERSION))
+    if answer is not None:
+        answer["active_symptoms"] = active_symptoms
+    return answer
+
+# Symptoms offered by /available-symptoms on top of the rule vocabulary
+EXTENDED_SYMPTOMS = (
+    "runny_nose", "chills", "muscle_aches", "toothache", "tooth_sensitivity",
+    "bad_breath", "tooth_pain", "jaw_pain", "facial_swelling", "cold_sensitivity",
+    "bleeding_gums", "swollen_gums", "jaw_clicking"
+)
+
+# Category and inference groups for every known symptom, classified once
+# (symptoms added by a later rule reload fall back to the memoized keyword rules)
+symptom_categories = SymptomCategories(
+    [symptom for combo in rule_store.current.extended_mapping for symptom in combo]
+    + list(EXTENDED_SYMPTOMS) + list(feature_columns)
+)
+
+# FIXED: Use comprehensive disease mapping from multi_symptom_mapper.py
+def find_disease_match(symptoms, rules=None):
+    """Find the best disease match using comprehensive mapping"""
+    rules = rules or rule_store.current
+    # Largest rule (2-4 symptoms) fully contained in the active symptoms wins
+    matches = rules.matcher.match(symptoms, min_size=2, max_size=4)
+    if matches:
+        combo, disease_info = matches[0]
+        log.debug("Found match: %s -> %s", combo, disease_info)
+        return disease_info
+    return None
+
+# SMART DISEASE INFERENCE SYSTEM
+def find_multiple_diseases(symptoms, max_diseases=3, rules=None):
+    """Smart system to find diseases from any symptom combination"""
+    rules = rules or rule_store.current
+    extended_matcher = rules.extended_matcher
+    found_diseases = []
+    used_combinations = set()
+
+    log.debug("SMART ANALYSIS: Analyzing %d symptoms: %s", len(symptoms), symptoms)
+
+    # Step 1: Try exact matches from comprehensive mapping - FIND ALL POSSIBLE DISEASES
+    used_diseases = set()
+
+    for combo, disease_info in extended_matcher.match(symptoms, min_size=2, max_size=4):
+        disease_name = disease_info["disease"]
+
+        # Skip if we already have this disease
+        if disease_name in used_diseases:
+            continue
+
+        specialist = rules.disease_specialist_table[disease_name]
+
+        found_diseases.append({
+            "disease": disease_name,
+            "confidence": disease_info["confidence"],
+            "specialist": specialist,
+            "symptoms": combo
+        })
+        used_combinations.add(combo)
+        used_diseases.add(disease_name)
+        log.debug("EXACT MATCH #%d: %s -> %s (%s)", len(found_diseases), combo, disease_name, specialist)
+
+        if len(found_diseases) >= max_diseases:
+            return found_diseases
+
+    # Step 1.5: If we found some diseases but need more, look for MEDICALLY RELEVANT related diseases
+    if found_diseases and len(found_diseases) < max_diseases:
+        log.debug("EXPANDING SEARCH: Found %d, looking for %d more...", len(found_diseases), max_diseases - len(found_diseases))
+
+        # Overlap counts come from the symptom -> rule posting lists, so only
+        # rules sharing at least one symptom are scored
+        scored = []
+        for rule_id, overlap_count in extended_matcher.overlap_counts(symptoms).items():
+            combo, disease_info = extended_matcher.rules[rule_id][:2]
+            if combo in used_combinations or disease_info["disease"] in used_diseases:
+                continue
+
+            # Prioritize diseases with more overlaps and higher base confidence
+            overlap_ratio = overlap_count / len(combo)
+            relevance_score = overlap_count * overlap_ratio * disease_info["confidence"]
+            scored.append((relevance_score, rule_id, overlap_count, overlap_ratio))
+
+        # Best relevance first, mapping order breaks ties
+        top = heapq.nsmallest(max_diseases - len(found_diseases), scored, key=lambda c: (-c[0], c[1]))
+
+        candidates = []
+        for relevance_score, rule_id, overlap_count, overlap_ratio in top:
+            combo, disease_info = extended_matcher.rules[rule_id][:2]
+            disease_name = disease_info["disease"]
+            candidates.append({
+                "disease": disease_name,
+                "confidence": disease_info["confidence"] * overlap_ratio * 0.7,
+                "specialist": rules.disease_specialist_table[disease_name],
+                "symptoms": combo,
+                "overlap_count": overlap_count,
+                "relevance_score": relevance_score
+            })
 
-@app.post("/predict")
-async def predict_specialist(request: SymptomRequest):
-    try:
-        symptoms = request.symptoms
-        print(f"FastAPI received symptoms: {symptoms}")
-        print(f"Symptom keys: {list(symptoms.keys())}")
-        # Get all active symptoms (value = True)
-        active_symptoms = [symptom for symptom, value in symptoms.items() if value == True and symptom != 'followupanswers']
-        print(f"Active symptoms: {active_symptoms}")
-
-        # Normalize symptoms (remove severity suffixes and map to base symptoms)
-        normalized_symptoms = []
-        for symptom in active_symptoms:
-            # Handle British vs American spelling
-            if symptom == 'diarrhoea':
-                symptom = 'diarrhea'
-            
-            # Remove severity suffixes
-            base_symptom = symptom.replace('_severe', '').replace('_mild', '').replace('_moderate', '')
-
-            # Check if base symptom exists in model
-            if base_symptom in feature_columns:
-                normalized_symptoms.append(base_symptom)
-                print(f"Normalized {symptom} -> {base_symptom}")
-            elif symptom in feature_columns:
-                normalized_symptoms.append(symptom)
+        for candidate in candidates:
+            found_diseases.append({
+                "disease": candidate["disease"],
+                "confidence": candidate["confidence"],
+                "specialist": candidate["specialist"],
+                "symptoms": candidate["symptoms"]
+            })
+            used_diseases.add(candidate["disease"])
+            log.debug("RELATED MATCH #%d: %s -> %s (%s) [overlap: %d/%d, score: %.3f]", len(found_diseases), candidate['symptoms'], candidate['disease'], candidate['specialist'], candidate['overlap_count'], len(candidate['symptoms']), candidate['relevance_score'])
+
+    # Step 2: Smart inference for unmapped combinations
+    if not found_diseases:
+        log.debug("SMART INFERENCE: No exact matches, using medical logic...")
+
+        # Symptom category analysis (table lookups, see symptom_categories.py)
+        grouped = symptom_categories.group_symptoms(symptoms)
+        skin_symptoms = grouped["skin"]
+        dental_symptoms = grouped["dental"]
+        respiratory_symptoms = grouped["respiratory"]
+        digestive_symptoms = grouped["digestive"]
+        neuro_symptoms = grouped["neurological"]
+
+        # Generate intelligent diseases based on symptom categories (FIXED: Allow single symptoms)
+        if len(skin_symptoms) >= 1:
+            if 'itching' in symptoms and 'skin_rash' in symptoms:
+                found_diseases.append({"disease": "Eczema", "confidence": 0.75, "specialist": "Dermatology", "symptoms": skin_symptoms})
+            elif 'skin_peeling' in symptoms:
+                found_diseases.append({"disease": "Contact Dermatitis", "confidence": 0.7, "specialist": "Dermatology", "symptoms": skin_symptoms})
             else:
-                print(f"WARNING: Symptom not found in model: {symptom}")
-
-        print(f"Normalized symptoms: {normalized_symptoms}")
-
-        # Prepare input for the ML model
-        input_data = pd.DataFrame([[0] * len(feature_columns)], columns=feature_columns)
-        for symptom in normalized_symptoms:
-            if symptom in feature_columns:
-                input_data[symptom] = 1
-        # Predict probabilities for all diseases
-        proba = model.predict_proba(input_data)[0]
-        classes = model.classes_
-        # Get top 3 specialists with highest probability
-        top_indices = proba.argsort()[-3:][::-1]
-        diagnoses = []
-
-        # Specialist name normalization mapping
-        specialist_normalization = {
-            'Psychiatrist': 'Psychiatry',
-            'Pulmonologist': 'Pulmonology',
-            'Cardiologist': 'Cardiology',
-            'Dermatologist': 'Dermatology',
-            'Neurologist': 'Neurology',
-            'Rheumatologists': 'Rheumatology',
-            'Gastroenterologist': 'Gastroenterology',
-            'Endocrinologist': 'Endocrinology',
-            'Allergist': 'Allergy & Immunology',
-            'Otolaryngologist': 'ENT',
-            'Ophthalmologist': 'Ophthalmology',
-            'Internal Medcine': 'Internal Medicine',  # Fix typo
-            'Hepatologist': 'Hepatology',
-            'Gynecologist': 'Gynecology',
-            'Pediatrician': 'Pediatrics',
-            'Phlebologist': 'Vascular Surgery',
-            'Osteopathic': 'Osteopathic Medicine',
-            'Tuberculosis': 'Pulmonology',  # TB specialist maps to Pulmonology
-            # Dental specialists
-            'Dentist': 'Dentistry',
-            'Orthodontist': 'Orthodontics',
-            'Oral Surgeon': 'Oral Surgery'
-        }
+                found_diseases.append({"disease": "Skin Condition", "confidence": 0.65, "specialist": "Dermatology", "symptoms": skin_symptoms})
+            log.debug("INFERRED: Skin condition from %s", skin_symptoms)
 
-        # FIXED: Use comprehensive disease mapping from multi_symptom_mapper.py
-        def find_disease_match(symptoms):
-            """Find the best disease match using comprehensive mapping"""
-            # Try different combinations of symptoms (2, 3, 4...)
-            for combo_size in range(min(len(symptoms), 4), 1, -1):  # Start with largest combinations
-                for symptom_combo in combinations(symptoms, combo_size):
-                    # Try both original order and sorted order
-                    for combo in [symptom_combo, tuple(sorted(symptom_combo))]:
-                        if combo in MULTI_SYMPTOM_DISEASE_MAPPING:
-                            disease_info = MULTI_SYMPTOM_DISEASE_MAPPING[combo]
-                            print(f"Found match: {combo} -> {disease_info}")
-                            return disease_info
-            return None
-
-        # Extended disease mapping with missing common combinations
-        extended_disease_mapping = dict(MULTI_SYMPTOM_DISEASE_MAPPING)
-        
-        # Add British spelling variants for Cholera and eye conditions
-        extended_disease_mapping.update({
-            ("diarrhoea", "vomiting", "dehydration"): {"disease": "Cholera", "confidence": 0.75},
-            ("vomiting", "diarrhoea", "dehydration"): {"disease": "Cholera", "confidence": 0.75},
-            ("dehydration", "diarrhoea", "vomiting"): {"disease": "Cholera", "confidence": 0.75},
-            ("dehydration", "vomiting", "diarrhoea"): {"disease": "Cholera", "confidence": 0.75},
-            ("vomiting", "dehydration", "diarrhoea"): {"disease": "Cholera", "confidence": 0.75},
-            # Eye conditions with all permutations
-            ("eye_pain", "blurred_vision"): {"disease": "Eye Strain", "confidence": 0.7},
-            ("blurred_vision", "eye_pain"): {"disease": "Eye Strain", "confidence": 0.7},
-            ("eye_pain", "blurred_vision", "halos_around_lights"): {"disease": "Glaucoma", "confidence": 0.85},
-            ("blurred_vision", "eye_pain", "halos_around_lights"): {"disease": "Glaucoma", "confidence": 0.85},
-            ("halos_around_lights", "eye_pain", "blurred_vision"): {"disease": "Glaucoma", "confidence": 0.85},
-            # Musculoskeletal conditions with all permutations
-            ("joint_pain", "swelling_joints"): {"disease": "Joint Inflammation", "confidence": 0.75},
-            ("swelling_joints", "joint_pain"): {"disease": "Joint Inflammation", "confidence": 0.75},
-            ("joint_pain", "swelling_joints", "stiffness"): {"disease": "Arthritis", "confidence": 0.85},
-            ("swelling_joints", "joint_pain", "stiffness"): {"disease": "Arthritis", "confidence": 0.85},
-            ("stiffness", "joint_pain", "swelling_joints"): {"disease": "Arthritis", "confidence": 0.85},
-            ("back_pain", "numbness"): {"disease": "Back Strain", "confidence": 0.7},
-            ("numbness", "back_pain"): {"disease": "Back Strain", "confidence": 0.7},
-            ("back_pain", "numbness", "weakness_in_limbs"): {"disease": "Herniated Disc", "confidence": 0.8},
-            ("numbness", "back_pain", "weakness_in_limbs"): {"disease": "Herniated Disc", "confidence": 0.8},
-            ("weakness_in_limbs", "back_pain", "numbness"): {"disease": "Herniated Disc", "confidence": 0.8},
-            # Respiratory conditions
-            ("cough", "chest_pain"): {"disease": "Chest Infection", "confidence": 0.7},
-            ("chest_pain", "cough"): {"disease": "Chest Infection", "confidence": 0.7},
-            ("cough", "shortness_of_breath"): {"disease": "Respiratory Issue", "confidence": 0.75},
-            ("shortness_of_breath", "cough"): {"disease": "Respiratory Issue", "confidence": 0.75},
-            # Cardiovascular conditions
-            ("chest_pain", "palpitations"): {"disease": "Heart Palpitations", "confidence": 0.75},
-            ("palpitations", "chest_pain"): {"disease": "Heart Palpitations", "confidence": 0.75},
-            ("chest_pain", "shortness_of_breath"): {"disease": "Heart Condition", "confidence": 0.8},
-            ("shortness_of_breath", "chest_pain"): {"disease": "Heart Condition", "confidence": 0.8},
-            ("chest_pain", "breathlessness"): {"disease": "Heart Condition", "confidence": 0.8},
-            ("breathlessness", "chest_pain"): {"disease": "Heart Condition", "confidence": 0.8},
-            ("chest_pain", "shortness_of_breath", "fatigue"): {"disease": "Heart Disease", "confidence": 0.8},
-            ("shortness_of_breath", "chest_pain", "fatigue"): {"disease": "Heart Disease", "confidence": 0.8},
-            ("fatigue", "chest_pain", "shortness_of_breath"): {"disease": "Heart Disease", "confidence": 0.8},
-            ("chest_pain", "breathlessness", "fatigue"): {"disease": "Heart Disease", "confidence": 0.8},
-            ("breathlessness", "chest_pain", "fatigue"): {"disease": "Heart Disease", "confidence": 0.8},
-            ("fatigue", "chest_pain", "breathlessness"): {"disease": "Heart Disease", "confidence": 0.8},
-            # Gastrointestinal conditions
-            ("stomach_pain", "nausea"): {"disease": "Stomach Upset", "confidence": 0.7},
-            ("nausea", "stomach_pain"): {"disease": "Stomach Upset", "confidence": 0.7},
-            ("abdominal_pain", "vomiting"): {"disease": "Abdominal Issue", "confidence": 0.75},
-            ("vomiting", "abdominal_pain"): {"disease": "Abdominal Issue", "confidence": 0.75},
-            # Neurological conditions
-            ("headache", "dizziness"): {"disease": "Head Pain", "confidence": 0.7},
-            ("dizziness", "headache"): {"disease": "Head Pain", "confidence": 0.7},
-            ("headache", "sensitivity_to_light"): {"disease": "Migraine", "confidence": 0.8},
-            ("sensitivity_to_light", "headache"): {"disease": "Migraine", "confidence": 0.8},
-            # Dermatological conditions
-            ("skin_rash", "itching"): {"disease": "Skin Irritation", "confidence": 0.75},
-            ("itching", "skin_rash"): {"disease": "Skin Irritation", "confidence": 0.75},
-            # ENT conditions
-            ("sore_throat", "ear_pain"): {"disease": "Throat Infection", "confidence": 0.75},
-            ("ear_pain", "sore_throat"): {"disease": "Throat Infection", "confidence": 0.75},
-            ("nasal_congestion", "facial_pain"): {"disease": "Sinus Issue", "confidence": 0.75},
-            ("facial_pain", "nasal_congestion"): {"disease": "Sinus Issue", "confidence": 0.75},
-            # Single symptom fallbacks
-            ("fever",): {"disease": "Fever Syndrome", "confidence": 0.5},
-            ("headache",): {"disease": "Head Pain", "confidence": 0.5},
-            ("chest_pain",): {"disease": "Chest Pain Syndrome", "confidence": 0.5},
-            ("joint_pain",): {"disease": "Joint Pain", "confidence": 0.5},
-            ("back_pain",): {"disease": "Back Strain", "confidence": 0.5},
-            ("toothache",): {"disease": "Dental Pain", "confidence": 0.5},
-            ("eye_pain",): {"disease": "Eye Strain", "confidence": 0.5},
-            # British spelling variants
-            ("diarrhoea", "fever"): {"disease": "Typhoid Fever", "confidence": 0.65},
-            ("fever", "diarrhoea"): {"disease": "Typhoid Fever", "confidence": 0.65},
-        })
+        if len(dental_symptoms) >= 1:
+            if 'toothache' in symptoms:
+                found_diseases.append({"disease": "Dental Infection", "confidence": 0.8, "specialist": "Dentistry", "symptoms": dental_symptoms})
+            else:
+                found_diseases.append({"disease": "Dental Problem", "confidence": 0.7, "specialist": "Dentistry", "symptoms": dental_symptoms})
+            log.debug("INFERRED: Dental condition from %s", dental_symptoms)
+
+        if len(respiratory_symptoms) >= 1:
+            found_diseases.append({"disease": "Respiratory Condition", "confidence": 0.7, "specialist": "Pulmonology", "symptoms": respiratory_symptoms})
+            log.debug("INFERRED: Respiratory condition from %s", respiratory_symptoms)
+
+        if len(digestive_symptoms) >= 1:
+            found_diseases.append({"disease": "Gastrointestinal Disorder", "confidence": 0.7, "specialist": "Gastroenterology", "symptoms": digestive_symptoms})
+            log.debug("INFERRED: Digestive condition from %s", digestive_symptoms)
+
+        if len(neuro_symptoms) >= 1:
+            found_diseases.append({"disease": "Neurological Condition", "confidence": 0.7, "specialist": "Neurology", "symptoms": neuro_symptoms})
+            log.debug("INFERRED: Neurological condition from %s", neuro_symptoms)
+
+    return found_diseases[:max_diseases]
+
+def get_active_symptoms(symptoms):
+    """Get all active symptoms (value = True) from a request payload"""
+    return [symptom for symptom, value in symptoms.items() if value == True and symptom != 'followupanswers']
+
+def normalize_symptoms(active_symptoms):
+    """Normalize symptoms (remove severity suffixes and map to base symptoms)"""
+    # Spelling variants, severity suffixes and synonyms are one table lookup each
+    normalized_symptoms = []
+    for symptom in active_symptoms:
+        base_symptom = symptom_normalizer.get(symptom)
+        if base_symptom is None:
+            log.debug("Symptom not found in model: %s", symptom)
+        elif base_symptom not in normalized_symptoms:
+            normalized_symptoms.append(base_symptom)
+            log.debug("Normalized %s -> %s", symptom, base_symptom)
+
+    log.debug("Normalized symptoms: %s", normalized_symptoms)
+    return normalized_symptoms
+
+def build_diagnosis(active_symptoms, proba, classes, rules):
+    """Combine rule-based disease matches with one row of ML probabilities"""
+    # Get top 3 specialists with highest probability
+    top_indices = proba.argsort()[-3:][::-1]
+    diagnoses = []
+
+    # Check for real disease match (only once)
+    disease_match = find_disease_match(active_symptoms, rules)
+    real_disease_info = None
+    if disease_match:
+        disease_name = disease_match["disease"]
+        specialist = rules.disease_specialist_table.get(disease_name, "Internal Medicine")
+        real_disease_info = (disease_name, specialist)
+        log.debug("Final mapping: %s -> %s", active_symptoms, real_disease_info)
+
+    # Get multiple real diseases
+    multiple_diseases = find_multiple_diseases(active_symptoms, max_diseases=3, rules=rules)
+
+    if multiple_diseases:
+        # Use real diseases for all diagnoses
+        for i, disease_info in enumerate(multiple_diseases):
+            priority = "PRIMARY" if i == 0 else "SECONDARY"
+            log.debug("%s: %s -> %s", priority, disease_info['disease'], disease_info['specialist'])
+
+            diagnoses.append({
+                "disease": disease_info["disease"],
+                "probability": disease_info["confidence"],
+                "specialist": disease_info["specialist"],
+                "alternative_specialists": [],
+                "confidence": disease_info["confidence"],
+                "explanation": f"Based on your symptoms, {disease_info['disease']} is {'likely' if i == 0 else 'possible'}. Recommended specialist: {disease_info['specialist']}"
+            })
 
-        # OVERRIDE and add missing REAL disease combinations
-        extended_disease_mapping.update({
-            # Common respiratory combinations missing from original mapping
-            ("cough", "runny_nose"): {"disease": "Common Cold", "confidence": 0.75},
-            ("runny_nose", "cough"): {"disease": "Common Cold", "confidence": 0.75},
-            ("headache", "cough"): {"disease": "Upper Respiratory Infection", "confidence": 0.7},
-            ("cough", "headache"): {"disease": "Upper Respiratory Infection", "confidence": 0.7},
-            ("headache", "runny_nose"): {"disease": "Sinus Infection", "confidence": 0.7},
-            ("runny_nose", "headache"): {"disease": "Sinus Infection", "confidence": 0.7},
-            ("headache", "cough", "runny_nose"): {"disease": "Upper Respiratory Infection", "confidence": 0.8},
-            ("cough", "headache", "runny_nose"): {"disease": "Upper Respiratory Infection", "confidence": 0.8},
-            ("runny_nose", "headache", "cough"): {"disease": "Upper Respiratory Infection", "confidence": 0.8},
-
-            # Malaria combinations (tropical disease)
-            ("fever", "chills", "headache"): {"disease": "Malaria", "confidence": 0.85},
-            ("chills", "fever", "headache"): {"disease": "Malaria", "confidence": 0.85},
-            ("headache", "fever", "chills"): {"disease": "Malaria", "confidence": 0.85},
-            ("fever", "fatigue", "muscle_aches"): {"disease": "Malaria", "confidence": 0.8},
-            ("fatigue", "fever", "muscle_aches"): {"disease": "Malaria", "confidence": 0.8},
-            ("muscle_aches", "fever", "fatigue"): {"disease": "Malaria", "confidence": 0.8},
-            ("fever", "nausea", "chills"): {"disease": "Malaria", "confidence": 0.8},
-            ("nausea", "fever", "chills"): {"disease": "Malaria", "confidence": 0.8},
-            ("chills", "fever", "nausea"): {"disease": "Malaria", "confidence": 0.8},
-
-            # UPDATED: Proper dental condition distinctions (Cavities vs Abscess)
-
-            # CAVITIES (Early stage - mild symptoms, treatable with fillings)
-            ("toothache", "tooth_sensitivity"): {"disease": "Cavities", "confidence": 0.85},
-            ("tooth_sensitivity", "toothache"): {"disease": "Cavities", "confidence": 0.85},
-            ("tooth_sensitivity", "tooth_pain"): {"disease": "Cavities", "confidence": 0.8},
-            ("tooth_pain", "tooth_sensitivity"): {"disease": "Cavities", "confidence": 0.8},
-            ("tooth_sensitivity", "cold_sensitivity"): {"disease": "Cavities", "confidence": 0.8},
-            ("cold_sensitivity", "tooth_sensitivity"): {"disease": "Cavities", "confidence": 0.8},
-
-            # GUM DISEASE (Gum-related issues, not tooth decay)
-            ("tooth_sensitivity", "bad_breath"): {"disease": "Gum Disease", "confidence": 0.75},
-            ("bad_breath", "tooth_sensitivity"): {"disease": "Gum Disease", "confidence": 0.75},
-            ("bad_breath", "bleeding_gums"): {"disease": "Gingivitis", "confidence": 0.8},
-            ("bleeding_gums", "bad_breath"): {"disease": "Gingivitis", "confidence": 0.8},
-            ("bleeding_gums", "swollen_gums"): {"disease": "Gingivitis", "confidence": 0.85},
-            ("swollen_gums", "bleeding_gums"): {"disease": "Gingivitis", "confidence": 0.85},
-
-            # DENTAL INFECTION (Moderate - infection without spreading)
-            ("toothache", "bad_breath"): {"disease": "Dental Infection", "confidence": 0.8},
-            ("bad_breath", "toothache"): {"disease": "Dental Infection", "confidence": 0.8},
-            ("toothache", "tooth_pain"): {"disease": "Dental Infection", "confidence": 0.8},
-            ("tooth_pain", "toothache"): {"disease": "Dental Infection", "confidence": 0.8},
-
-            # DENTAL ABSCESS (Severe - infection with spreading, EMERGENCY)
-            ("toothache", "jaw_pain"): {"disease": "Dental Abscess", "confidence": 0.9},
-            ("jaw_pain", "toothache"): {"disease": "Dental Abscess", "confidence": 0.9},
-            ("toothache", "facial_swelling"): {"disease": "Dental Abscess", "confidence": 0.95},
-            ("facial_swelling", "toothache"): {"disease": "Dental Abscess", "confidence": 0.95},
-            ("jaw_pain", "facial_swelling"): {"disease": "Dental Abscess", "confidence": 0.9},
-            ("facial_swelling", "jaw_pain"): {"disease": "Dental Abscess", "confidence": 0.9},
-            ("toothache", "jaw_pain", "facial_swelling"): {"disease": "Severe Dental Abscess", "confidence": 0.95},
-            ("jaw_pain", "toothache", "facial_swelling"): {"disease": "Severe Dental Abscess", "confidence": 0.95},
-            ("facial_swelling", "toothache", "jaw_pain"): {"disease": "Severe Dental Abscess", "confidence": 0.95},
-
-            # TMJ DISORDER (Jaw joint issues, not infection)
-            ("jaw_pain", "tooth_pain"): {"disease": "TMJ Disorder", "confidence": 0.75},
-            ("tooth_pain", "jaw_pain"): {"disease": "TMJ Disorder", "confidence": 0.75},
-            ("jaw_clicking", "jaw_pain"): {"disease": "TMJ Disorder", "confidence": 0.85},
-            ("jaw_pain", "jaw_clicking"): {"disease": "TMJ Disorder", "confidence": 0.85},
-        })
+        # NO MORE GENERIC FILLERS - Only show real diseases we found
+        log.debug("FINAL RESULT: Found %d real diseases, no generic fillers needed!", len(multiple_diseases))
+    else:
+        # No real disease matches, use ML predictions
+        for idx in top_indices:
+            predicted_specialist = classes[idx]
+            probability = float(proba[idx])
+            normalized_specialist = rules.specialist_normalization.get(predicted_specialist, predicted_specialist)
+
+            diagnoses.append({
+                "disease": f"Condition requiring {normalized_specialist} consultation",
+                "probability": probability,
+                "specialist": normalized_specialist,
+                "alternative_specialists": [],
+                "confidence": probability,
+                "explanation": f"Based on your symptoms, we recommend consulting with a {normalized_specialist} specialist."
+            })
+            log.debug("ML ONLY: Generic -> %s", normalized_specialist)
+
+        # Debug output
+        log.debug("Prediction %d: %s -> %s (prob: %.6f)", idx + 1, predicted_specialist, normalized_specialist, probability)
+    log.debug("Top diagnoses: %s", diagnoses)
+
+    # Extract specialists from diagnoses for backend compatibility (preserve order!)
+    specialists = []
+    for diag in diagnoses:
+        if diag['specialist'] not in specialists:
+            specialists.append(diag['specialist'])
+
+    # Primary specialist is the TOP prediction (first in diagnoses list)
+    primary_specialist = diagnoses[0]['specialist'] if diagnoses else "General Practitioner"
+    log.debug("Primary specialist selected: %s", primary_specialist)
+
+    # Return format expected by backend
+    return {
+        "diagnoses": diagnoses,
+        "predicted_specialist": primary_specialist,
+        "confidence": diagnoses[0]['confidence'] if diagnoses else 0.6,
+        "suggested_diseases": [diag['disease'] for diag in diagnoses],
+        "active_symptoms": active_symptoms,
+        "ml_prediction": primary_specialist,
+        "disease_based_specialists": specialists
+    }
+
+def predict_active_symptoms(active_symptoms, rules):
+    """Run the full diagnosis pipeline for one symptom set (CPU-bound)"""
+    # Rule ranking follows symptom order, so every ordering of a set is diagnosed as the sorted one
+    ordered = canonical_symptoms(active_symptoms)
+    # Prepare input for the ML model
+    input_data = encoder.encode(normalize_symptoms(ordered))
+    # Predict probabilities for all diseases
+    estimator, input_data = encoder.model_input(model, input_data)
+    proba = estimator.predict_proba(input_data)[0]
+
+    response = build_diagnosis(ordered, proba, model.classes_, rules)
+    response_cache.put(ordered, cache_version(rules), response)
+    return {**response, "active_symptoms": active_symptoms}
+
+def diagnose_many(active_lists, rules):
+    """Full pipeline for many symptom sets with one predict_proba call, bypassing every cache"""
+    ordered_lists = [canonical_symptoms(active_symptoms) for active_symptoms in active_lists]
+    input_block = encoder.encode_many([normalize_symptoms(ordered) for ordered in ordered_lists])
+    estimator, input_block = encoder.model_input(model, input_block)
+    probabilities = estimator.predict_proba(input_block)
+    return [{**build_diagnosis(ordered, probabilities[i], model.classes_, rules), "active_symptoms": active_lists[i]}
+            for i, ordered in enumerate(ordered_lists)]
+
+def predict_many(active_lists, rules):
+    """Diagnose many symptom sets with one predict_proba call for the cache misses"""
+    version = cache_version(rules)
+    results = []
+    misses = []
+    for row, active_symptoms in enumerate(active_lists):
+        answer = precomputed_answer(active_symptoms, rules)
+        cached = response_cache.get(active_symptoms, version) if answer is None else None
+        if answer is not None:
+            results.append(answer)
+        elif cached is not None:
+            results.append({**cached, "active_symptoms": active_symptoms})
+        else:
+            results.append(None)
+            misses.append(row)
 
-        # Disease to specialist mapping
-        disease_specialist_map = {
-            "Common Cold": "Pulmonology",
-            "Upper Respiratory Infection": "Pulmonology",
-            "Sinus Infection": "ENT",
-            "Malaria": "Internal Medicine",
-            "Typhoid Fever": "Gastroenterology",
-            "Dengue Fever": "Internal Medicine",
-            "Zika Virus": "Internal Medicine",
-            "Cholera": "Gastroenterology",
-            "Tuberculosis": "Pulmonology",
-            "Ebola": "Emergency Medicine",
-            "Yellow Fever": "Internal Medicine",
-            "Lassa Fever": "Internal Medicine",
-            "Pneumonia": "Pulmonology",
-            "Bronchitis": "Pulmonology",
-            "Asthma": "Pulmonology",
-            "Heart Disease": "Cardiology",
-            "Arrhythmia": "Cardiology",
-            "Heart Attack": "Cardiology",
-            "Gastroenteritis": "Gastroenterology",
-            "Irritable Bowel Syndrome": "Gastroenterology",
-            "Acid Reflux": "Gastroenterology",
-            "Food Poisoning": "Gastroenterology",
-            "Migraine": "Neurology",
-            "Concussion": "Neurology",
-            "Meningitis": "Neurology",
-            "Eczema": "Dermatology",
-            "Psoriasis": "Dermatology",
-            "Acne": "Dermatology",
-            "Allergic Reaction": "Dermatology",
-            # UPDATED: Dental conditions with proper distinctions
-            "Cavities": "Dentistry",                    # Early stage - routine dental care
-            "Dental Infection": "Dentistry",            # Moderate - needs treatment
-            "Dental Abscess": "Emergency Dentistry",    # Severe - EMERGENCY care needed
-            "Severe Dental Abscess": "Emergency Dentistry",  # Critical - URGENT emergency
-            "Gum Disease": "Periodontist",              # Gum specialist
-            "Gingivitis": "Dentistry",                  # Early gum disease
-            "TMJ Disorder": "Oral Surgery",             # Jaw joint specialist
-            "Eye Strain": "Ophthalmology",              # Eye strain
-            "Conjunctivitis": "Ophthalmology",          # Eye infection
-            "Glaucoma": "Ophthalmology",                # Eye pressure condition
-            "Joint Inflammation": "Rheumatology",       # Joint inflammation
-            "Arthritis": "Rheumatology",                # Joint disease
-            "Back Strain": "Orthopedics",               # Back muscle strain
-            "Herniated Disc": "Orthopedics",            # Spinal disc problem
-            "Chest Infection": "Pulmonology",           # Respiratory infection
-            "Respiratory Issue": "Pulmonology",         # Breathing problems
-            "Heart Palpitations": "Cardiology",         # Heart rhythm issues
-            "Heart Condition": "Cardiology",            # General heart problems
-            "Heart Disease": "Cardiology",              # Heart disease
-            "Stomach Upset": "Gastroenterology",        # Stomach problems
-            "Abdominal Issue": "Gastroenterology",      # Abdominal problems
-            "Head Pain": "Neurology",                   # Head/brain issues
-            "Migraine": "Neurology",                    # Migraine headaches
-            "Skin Irritation": "Dermatology",           # Skin problems
-            "Throat Infection": "ENT",                  # Throat/ear problems
-            "Sinus Issue": "ENT",                       # Sinus problems
-            "Fever Syndrome": "Internal Medicine",      # General fever
-            "Head Pain": "Neurology",                   # General headache
-            "Chest Pain Syndrome": "Internal Medicine", # General chest pain
-            "Joint Pain": "Rheumatology",               # General joint pain
-            "Back Strain": "Orthopedics",               # Back pain
-            "Dental Pain": "Dentistry",                 # General tooth pain
-            "Eye Strain": "Ophthalmology"               # General eye pain
-        }
+    if misses:
+        responses = diagnose_many([active_lists[row] for row in misses], rules)
+        for row, response in zip(misses, responses):
+            response_cache.put(active_lists[row], version, response)
+            results[row] = response
 
-        # Check for real disease match (only once)
-        disease_match = find_disease_match(active_symptoms)
-        real_disease_info = None
-        if disease_match:
-            disease_name = disease_match["disease"]
-            specialist = disease_specialist_map.get(disease_name, "Internal Medicine")
-            real_disease_info = (disease_name, specialist)
-            print(f"Final mapping: {active_symptoms} -> {real_disease_info}")
-
-        # SMART DISEASE INFERENCE SYSTEM
-        def find_multiple_diseases(symptoms, max_diseases=3):
-            """Smart system to find diseases from any symptom combination"""
-            found_diseases = []
-            used_combinations = set()
-
-            print(f"SMART ANALYSIS: Analyzing {len(symptoms)} symptoms: {symptoms}")
-
-            # Step 1: Try exact matches from comprehensive mapping - FIND ALL POSSIBLE DISEASES
-            used_diseases = set()
-
-            for combo_size in range(min(len(symptoms), 4), 1, -1):
-                for symptom_combo in combinations(symptoms, combo_size):
-                    for combo in [symptom_combo, tuple(sorted(symptom_combo))]:
-                        if combo in extended_disease_mapping and combo not in used_combinations:
-                            disease_info = extended_disease_mapping[combo]
-                            disease_name = disease_info["disease"]
-
-                            # Skip if we already have this disease
-                            if disease_name in used_diseases:
-                                continue
-
-                            specialist = disease_specialist_map.get(disease_name, "Internal Medicine")
-
-                            found_diseases.append({
-                                "disease": disease_name,
-                                "confidence": disease_info["confidence"],
-                                "specialist": specialist,
-                                "symptoms": combo
-                            })
-                            used_combinations.add(combo)
-                            used_diseases.add(disease_name)
-                            print(f"EXACT MATCH #{len(found_diseases)}: {combo} -> {disease_name} ({specialist})")
-
-                            if len(found_diseases) >= max_diseases:
-                                return found_diseases
-
-            # Step 1.5: If we found some diseases but need more, look for MEDICALLY RELEVANT related diseases
-            if found_diseases and len(found_diseases) < max_diseases:
-                print(f"EXPANDING SEARCH: Found {len(found_diseases)}, looking for {max_diseases - len(found_diseases)} more...")
-
-                # Look for diseases with flexible overlap requirements
-                candidates = []
-
-                for combo in extended_disease_mapping:
-                    if combo not in used_combinations:
-                        # Count how many symptoms overlap
-                        overlap_count = len(set(symptoms) & set(combo))
-
-                        if overlap_count >= 1:  # At least 1 overlapping symptom
-                            disease_info = extended_disease_mapping[combo]
-                            disease_name = disease_info["disease"]
-
-                            if disease_name not in used_diseases:
-                                # Calculate relevance score
-                                overlap_ratio = overlap_count / len(combo)
-                                base_confidence = disease_info["confidence"]
-
-                                # Prioritize diseases with more overlaps and higher base confidence
-                                relevance_score = overlap_count * overlap_ratio * base_confidence
-
-                                candidates.append({
-                                    "disease": disease_name,
-                                    "confidence": base_confidence * overlap_ratio * 0.7,
-                                    "specialist": disease_specialist_map.get(disease_name, "Internal Medicine"),
-                                    "symptoms": combo,
-                                    "overlap_count": overlap_count,
-                                    "relevance_score": relevance_score
-                                })
-
-                # Sort by relevance score and take the best ones
-                candidates.sort(key=lambda x: x["relevance_score"], reverse=True)
-
-                for candidate in candidates[:max_diseases - len(found_diseases)]:
-                    found_diseases.append({
-                        "disease": candidate["disease"],
-                        "confidence": candidate["confidence"],
-                        "specialist": candidate["specialist"],
-                        "symptoms": candidate["symptoms"]
-                    })
-                    used_diseases.add(candidate["disease"])
-                    print(f"RELATED MATCH #{len(found_diseases)}: {candidate['symptoms']} -> {candidate['disease']} ({candidate['specialist']}) [overlap: {candidate['overlap_count']}/{len(candidate['symptoms'])}, score: {candidate['relevance_score']:.3f}]")
-
-            # Step 2: Smart inference for unmapped combinations
-            if not found_diseases:
-                print(f"SMART INFERENCE: No exact matches, using medical logic...")
-
-                # Symptom category analysis
-                skin_symptoms = [s for s in symptoms if any(skin_word in s.lower() for skin_word in ['skin', 'rash', 'itch', 'peel', 'burn', 'blister', 'acne', 'dry'])]
-                dental_symptoms = [s for s in symptoms if any(dental_word in s.lower() for dental_word in ['tooth', 'dental', 'gum', 'jaw', 'mouth', 'bite'])]
-                respiratory_symptoms = [s for s in symptoms if any(resp_word in s.lower() for resp_word in ['cough', 'breath', 'wheez', 'chest', 'lung'])]
-                digestive_symptoms = [s for s in symptoms if any(dig_word in s.lower() for dig_word in ['stomach', 'nausea', 'vomit', 'diarr', 'constip', 'abdom'])]
-                neuro_symptoms = [s for s in symptoms if any(neuro_word in s.lower() for neuro_word in ['head', 'dizz', 'migr', 'confus', 'memory'])]
-
-                # Generate intelligent diseases based on symptom categories (FIXED: Allow single symptoms)
-                if len(skin_symptoms) >= 1:
-                    if 'itching' in symptoms and 'skin_rash' in symptoms:
-                        found_diseases.append({"disease": "Eczema", "confidence": 0.75, "specialist": "Dermatology", "symptoms": skin_symptoms})
-                    elif 'skin_peeling' in symptoms:
-                        found_diseases.append({"disease": "Contact Dermatitis", "confidence": 0.7, "specialist": "Dermatology", "symptoms": skin_symptoms})
-                    else:
-                        found_diseases.append({"disease": "Skin Condition", "confidence": 0.65, "specialist": "Dermatology", "symptoms": skin_symptoms})
-                    print(f"INFERRED: Skin condition from {skin_symptoms}")
-
-                if len(dental_symptoms) >= 1:
-                    if 'toothache' in symptoms:
-                        found_diseases.append({"disease": "Dental Infection", "confidence": 0.8, "specialist": "Dentistry", "symptoms": dental_symptoms})
-                    else:
-                        found_diseases.append({"disease": "Dental Problem", "confidence": 0.7, "specialist": "Dentistry", "symptoms": dental_symptoms})
-                    print(f"INFERRED: Dental condition from {dental_symptoms}")
-
-                if len(respiratory_symptoms) >= 1:
-                    found_diseases.append({"disease": "Respiratory Condition", "confidence": 0.7, "specialist": "Pulmonology", "symptoms": respiratory_symptoms})
-                    print(f"INFERRED: Respiratory condition from {respiratory_symptoms}")
-
-                if len(digestive_symptoms) >= 1:
-                    found_diseases.append({"disease": "Gastrointestinal Disorder", "confidence": 0.7, "specialist": "Gastroenterology", "symptoms": digestive_symptoms})
-                    print(f"INFERRED: Digestive condition from {digestive_symptoms}")
-
-                if len(neuro_symptoms) >= 1:
-                    found_diseases.append({"disease": "Neurological Condition", "confidence": 0.7, "specialist": "Neurology", "symptoms": neuro_symptoms})
-                    print(f"INFERRED: Neurological condition from {neuro_symptoms}")
-
-            return found_diseases[:max_diseases]
-
-        # Get multiple real diseases
-        multiple_diseases = find_multiple_diseases(active_symptoms, max_diseases=3)
-
-        if multiple_diseases:
-            # Use real diseases for all diagnoses
-            for i, disease_info in enumerate(multiple_diseases):
-                priority = "PRIMARY" if i == 0 else "SECONDARY"
-                print(f"{priority}: {disease_info['disease']} -> {disease_info['specialist']}")
-
-                diagnoses.append({
-                    "disease": disease_info["disease"],
-                    "probability": disease_info["confidence"],
-                    "specialist": disease_info["specialist"],
-                    "alternative_specialists": [],
-                    "confidence": disease_info["confidence"],
-                    "explanation": f"Based on your symptoms, {disease_info['disease']} is {'likely' if i == 0 else 'possible'}. Recommended specialist: {disease_info['specialist']}"
-                })
-
-            # NO MORE GENERIC FILLERS - Only show real diseases we found
-            print(f"FINAL RESULT: Found {len(multiple_diseases)} real diseases, no generic fillers needed!")
-        else:
-            # No real disease matches, use ML predictions
-            for idx in top_indices:
-                predicted_specialist = classes[idx]
-                probability = float(proba[idx])
-                normalized_specialist = specialist_normalization.get(predicted_specialist, predicted_specialist)
-
-                diagnoses.append({
-                    "disease": f"Condition requiring {normalized_specialist} consultation",
-                    "probability": probability,
-                    "specialist": normalized_specialist,
-                    "alternative_specialists": [],
-                    "confidence": probability,
-                    "explanation": f"Based on your symptoms, we recommend consulting with a {normalized_specialist} specialist."
-                })
-                print(f"ML ONLY: Generic -> {normalized_specialist}")
-
-            # Debug output
-            print(f"Prediction {idx+1}: {predicted_specialist} -> {normalized_specialist} (prob: {probability:.6f})")
-        print(f"Top diagnoses: {diagnoses}")
-
-        # Extract specialists from diagnoses for backend compatibility (preserve order!)
-        specialists = []
-        for diag in diagnoses:
-            if diag['specialist'] not in specialists:
-                specialists.append(diag['specialist'])
-
-        # Primary specialist is the TOP prediction (first in diagnoses list)
-        primary_specialist = diagnoses[0]['specialist'] if diagnoses else "General Practitioner"
-        print(f"Primary specialist selected: {primary_specialist}")
-
-        # Return format expected by backend
-        return {
-            "diagnoses": diagnoses,
-            "predicted_specialist": primary_specialist,
-            "confidence": diagnoses[0]['confidence'] if diagnoses else 0.6,
-            "suggested_diseases": [diag['disease'] for diag in diagnoses],
-            "active_symptoms": active_symptoms,
-            "ml_prediction": primary_specialist,
-            "disease_based_specialists": specialists
-        }
+    return results
+
+@app.post("/predict")
+async def predict_specialist(request: SymptomRequest, x_debug_trace: Optional[str] = Header(None)):
+    start_request(x_debug_trace)
+    try:
+        symptoms = request.symptoms
+        log.debug("FastAPI received symptoms: %s", symptoms)
+        active_symptoms = get_active_symptoms(symptoms)
+        log.debug("Active symptoms: %s", active_symptoms)
+
+        # One rule snapshot for the whole request, even if a reload lands meanwhile
+        rules = rule_store.current
+        answer = precomputed_answer(active_symptoms, rules)
+        if answer is not None:
+            return answer
+        cached = response_cache.get(active_symptoms, cache_version(rules))
+        if cached is not None:
+            return {**cached, "active_symptoms": active_symptoms}
+
+        # Model and rule matching run on the inference pool, not the event loop
+        return await inference_pool.run(predict_active_symptoms, active_symptoms, rules)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("Error in prediction: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/batch")
+async def predict_specialist_batch(request: BatchSymptomRequest, x_debug_trace: Optional[str] = Header(None)):
+    """Predict many symptom sets with a single vectorized predict_proba call"""
+    start_request(x_debug_trace)
+    try:
+        inference_pool.check_batch(request.items)
+        active_lists = [get_active_symptoms(symptoms) for symptoms in request.items]
+        results = await inference_pool.run(predict_many, active_lists, rule_store.current)
+        return {"results": results, "total_count": len(results)}
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in prediction: {e}")
+        log.error("Error in batch prediction: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def startup_event():
+    """Warm the model, encoder and rule indexes before reporting ready"""
+    readiness.start(lambda active_symptoms: predict_active_symptoms(active_symptoms, rule_store.current))
+
+@app.get("/ready")
+async def get_ready(response: Response):
+    """503 until warmup has finished; warmup time and fallback mode"""
+    return readiness.respond(response)
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the /predict response cache"""
+    return response_cache.stats()
+
+@app.get("/answer-table-stats")
+async def get_answer_table_stats():
+    """Size, version and hit rate of the precomputed answer table"""
+    if answer_table is None:
+        return {"loaded": False, "path": ANSWER_TABLE_DIR}
+    return {"loaded": True, "path": answer_table.directory, **answer_table.stats()}
+
+@app.get("/pool-stats")
+async def get_pool_stats():
+    """Inference pool size, in-flight jobs and 503 rejections"""
+    return inference_pool.stats()
+
+@app.get("/rules-stats")
+async def get_rules_stats():
+    """Active rule version and reload metrics"""
+    return rule_store.stats()
+
+@app.post("/admin/reload-rules")
+async def reload_rules(x_admin_token: Optional[str] = Header(None)):
+    """Recompile the rule file in the background and swap it in"""
+    check_admin_token(x_admin_token)
+    loaded = await asyncio.get_running_loop().run_in_executor(None, rule_store.reload)
+    return {"reloaded": loaded, **rule_store.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8002) 
\ No newline at end of file
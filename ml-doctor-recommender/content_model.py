@@ -1,10 +1,10 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
+from dataset_cache import load_dataset
 
 # === STEP 1: Load and Prepare Data ===
 
 # 1. Load Excel file
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # 2. Drop unwanted column (like index)
 df = df.drop(columns=["Unnamed: 0"], errors="ignore")
@@ -4,9 +4,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 from sklearn.utils import resample
 import joblib
+from dataset_cache import load_dataset
 
 # Load the data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 
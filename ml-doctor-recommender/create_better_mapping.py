@@ -1,4 +1,4 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Create a better mapping using actual specialist names from the data
 disease_to_specialist_mapping = {
@@ -80,7 +80,7 @@ disease_to_specialist_mapping = {
 }
 
 # Load the original data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # Create the new specialist column using our better mapping
 df['Specialist'] = df['Disease'].map(disease_to_specialist_mapping)
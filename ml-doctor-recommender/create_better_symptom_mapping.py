@@ -1,4 +1,4 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Improved mapping for curated symptoms
 symptom_specialist_mapping = {
@@ -56,7 +56,7 @@ symptom_specialist_mapping = {
 }
 
 # Load the original data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # For each disease, check all symptoms present in the curated mapping and assign the first matching specialist
 symptom_cols = [col for col in df.columns if col not in ['Disease', 'Unnamed: 0']]
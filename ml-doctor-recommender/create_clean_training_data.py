@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from dataset_cache import load_dataset
 
 # Define clinical symptom-specialist mappings
 clinical_mappings = {
@@ -64,7 +65,7 @@ clinical_mappings = {
 }
 
 # Load original data to get all possible symptoms
-df_original = pd.read_excel("Specialist_cleaned.xlsx")
+df_original = load_dataset("Specialist_cleaned.xlsx")
 all_symptoms = [col for col in df_original.columns if col != 'Specialist']
 
 # Create clean training data
@@ -1,4 +1,4 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Create mapping from the specialist names in your data to actual specialist names in the doctor database
 specialist_mapping = {
@@ -26,7 +26,7 @@ specialist_mapping = {
 }
 
 # Load the original data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # Create the new specialist column using our mapping
 df['Specialist'] = df['Disease'].map(specialist_mapping)
@@ -19,6 +19,7 @@ from sklearn.preprocessing import LabelEncoder
 import joblib
 import pickle
 from collections import defaultdict
+from symptom_aliases import canonical_form
 
 def load_and_prepare_data():
     """Load the original dataset and prepare it for multi-symptom ML training"""
@@ -49,7 +50,7 @@ def create_multi_symptom_training_data(df, disease_to_specialist):
             symptom = str(row[col]).strip()
             if symptom and symptom != 'nan' and symptom != '':
                 # Clean symptom names
-                symptom = symptom.lower().replace(' ', '_').replace(',', '').strip()
+                symptom = canonical_form(symptom)
                 all_symptoms.add(symptom)
     
     all_symptoms = sorted(list(all_symptoms))
@@ -74,7 +75,7 @@ def create_multi_symptom_training_data(df, disease_to_specialist):
                    'Symptom_16', 'Symptom_17']:
             symptom = str(row[col]).strip()
             if symptom and symptom != 'nan' and symptom != '':
-                symptom = symptom.lower().replace(' ', '_').replace(',', '').strip()
+                symptom = canonical_form(symptom)
                 if symptom in symptom_vector:
                     symptom_vector[symptom] = 1
         
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from dataset_cache import load_dataset
 
 # Create a perfect training dataset with explicit mappings
 def create_perfect_training_data():
@@ -19,7 +20,7 @@ def create_perfect_training_data():
     }
     
     # Load original data to get all possible symptoms
-    df_original = pd.read_excel("Specialist_cleaned.xlsx")
+    df_original = load_dataset("Specialist_cleaned.xlsx")
     all_symptoms = [col for col in df_original.columns if col != 'Specialist']
     
     training_rows = []
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from dataset_cache import load_dataset
 
 # Define clear symptom-specialist mappings (only core symptoms)
 simple_mappings = {
@@ -17,7 +18,7 @@ simple_mappings = {
 }
 
 # Load original data to get all possible symptoms
-df_original = pd.read_excel("Specialist_cleaned.xlsx")
+df_original = load_dataset("Specialist_cleaned.xlsx")
 all_symptoms = [col for col in df_original.columns if col != 'Specialist']
 
 print("Available symptoms in original data:")
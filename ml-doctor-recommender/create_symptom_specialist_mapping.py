@@ -1,4 +1,4 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Create a more intelligent symptom-to-specialist mapping
 symptom_specialist_mapping = {
@@ -163,7 +163,7 @@ symptom_specialist_mapping = {
 }
 
 # Load the original data
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 
 # Create a new column based on the most common symptom for each disease
 # For each disease, find the most common symptom and map it to specialist
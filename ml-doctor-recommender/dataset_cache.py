@@ -0,0 +1,162 @@
+"""
+Columnar binary cache for the Specialist*.xlsx training datasets
+
+Parsing a 5,000-row workbook through openpyxl takes several seconds, and the
+recommenders, training and audit scripts re-read the same workbooks on every
+run. load_dataset(path) returns the same DataFrame as pd.read_excel(path) but
+converts each workbook only once, into a compressed .npz in DATASET_CACHE_DIR
+named after the workbook and a SHA-256 of its bytes:
+    columns           every column name, in workbook order
+    symptoms          uint8 (rows x n) block of the integer columns in 0-255
+    values_<i>        any other numeric column, as stored
+    codes_<i>         int32 category codes of text column i (-1 for empty cells)
+    categories_<i>    the distinct values of text column i
+A rewritten workbook hashes differently and is converted again; the stale
+cache file for it is removed. dataset_columns(path) reads only the column
+names. DATASET_CACHE=0 goes back to reading the workbook every time.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from request_logging import get_logger
+
+DATASET_CACHE_DIR = os.environ.get(
+    "DATASET_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_cache"))
+
+DATASET_CACHE_ENABLED = os.environ.get("DATASET_CACHE", "1") != "0"
+
+log = get_logger("datasets")
+
+
+def content_hash(path):
+    """Hex SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path):
+    """Location of the cache file for the current contents of a workbook"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(DATASET_CACHE_DIR, f"{name}-{content_hash(path)[:16]}.npz")
+
+
+def _encode(df):
+    """npz arrays for a DataFrame, or None if it holds something the format does not cover"""
+    if not all(isinstance(column, str) for column in df.columns) or df.columns.has_duplicates:
+        return None
+    arrays = {"columns": np.array(df.columns, dtype=str), "dtypes": np.array([str(t) for t in df.dtypes])}
+    symptom_columns = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series.dtype) and len(series) and series.min() >= 0 and series.max() <= 255:
+            symptom_columns.append(i)
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            arrays[f"values_{i}"] = series.to_numpy()
+        elif series.dropna().map(type).eq(str).all():
+            codes, categories = pd.factorize(series)
+            arrays[f"codes_{i}"] = codes.astype(np.int32)
+            arrays[f"categories_{i}"] = np.array(list(categories), dtype=str)
+        else:
+            return None
+    arrays["symptom_columns"] = np.array(symptom_columns, dtype=np.int32)
+    arrays["symptoms"] = df.iloc[:, symptom_columns].to_numpy(dtype=np.uint8)
+    return arrays
+
+
+def _decode(data):
+    """DataFrame from the arrays written by _encode"""
+    columns = data["columns"].tolist()
+    dtypes = data["dtypes"].tolist()
+    symptom_columns = data["symptom_columns"].tolist()
+    symptoms = data["symptoms"]
+    df = pd.DataFrame(symptoms.astype(np.int64), columns=[columns[i] for i in symptom_columns])
+    for position, i in enumerate(symptom_columns):
+        if dtypes[i] != "int64":
+            df[columns[i]] = symptoms[:, position].astype(dtypes[i])
+    for i, column in enumerate(columns):
+        if f"values_{i}" in data:
+            df[column] = data[f"values_{i}"]
+        elif f"codes_{i}" in data:
+            codes = data[f"codes_{i}"]
+            values = np.array(data[f"categories_{i}"].tolist() + [np.nan], dtype=object)
+            df[column] = pd.Series(values[codes])
+    return df[columns]
+
+
+def _write_atomic(arrays, target):
+    """np.savez_compressed to a temp file renamed over target"""
+    os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=DATASET_CACHE_DIR, suffix=".npz.tmp")
+    os.close(fd)
+    try:
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _remove_stale(target):
+    """Delete cache files of earlier versions of the same workbook"""
+    prefix = os.path.basename(target).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(DATASET_CACHE_DIR):
+        stale = (name.startswith(prefix) and name.endswith(".npz") and len(name) == len(prefix) + 16 + 4
+                 and name != os.path.basename(target))
+        if stale:
+            try:
+                os.remove(os.path.join(DATASET_CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+def export_cache(path):
+    """Convert a workbook to its cache file (if not already there); returns the cache path or None"""
+    target = cache_path(path)
+    if os.path.exists(target):
+        return target
+    df = pd.read_excel(path)
+    arrays = _encode(df)
+    if arrays is None:
+        log.warning("Not caching %s: unsupported column layout", path)
+        return None
+    _write_atomic(arrays, target)
+    _remove_stale(target)
+    log.info("Cached %s as %s", path, target)
+    return target
+
+
+def load_dataset(path):
+    """pd.read_excel(path), served from the binary cache when possible"""
+    if not DATASET_CACHE_ENABLED:
+        return pd.read_excel(path)
+    try:
+        target = export_cache(path)
+        if target is not None:
+            with np.load(target) as data:
+                return _decode(data)
+    except Exception as e:
+        log.warning("Dataset cache unavailable for %s, reading the workbook: %s", path, e)
+    return pd.read_excel(path)
+
+
+def dataset_columns(path):
+    """Column names of a workbook, without loading its rows when a cache file exists"""
+    if DATASET_CACHE_ENABLED:
+        try:
+            target = export_cache(path)
+            if target is not None:
+                with np.load(target) as data:
+                    return data["columns"].tolist()
+        except Exception as e:
+            log.warning("Dataset cache unavailable for %s, reading the workbook: %s", path, e)
+    return list(pd.read_excel(path).columns)
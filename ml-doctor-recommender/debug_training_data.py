@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the training data
-df = pd.read_excel("Specialist_clean_clinical.xlsx")
+df = load_dataset("Specialist_clean_clinical.xlsx")
 
 # Check itching
 itching_rows = df[df['itching'] == 1]
@@ -1,13 +1,20 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
-import joblib
-import pandas as pd
+from inference_pool import InferencePool
+from warmup import Readiness
+from model_store import load_compiled_model
 import pickle
 
 app = FastAPI()
 
+# CPU-bound inference runs here (INFERENCE_WORKERS / INFERENCE_QUEUE_DEPTH)
+inference_pool = InferencePool()
+
+# /ready answers 503 until startup warmup has run (WARMUP_PASSES)
+readiness = Readiness("enhanced_content_api")
+
 # Load the trained ML model
-model = joblib.load("content_model_specialist_fixed.pkl")
+model = load_compiled_model("content_model_specialist_fixed.pkl")
 
 # Load the feature columns
 with open('feature_columns.pkl', 'rb') as f:
@@ -17,7 +24,12 @@ with open('feature_columns.pkl', 'rb') as f:
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from content_api import disease_to_specialist_mapping, get_specialist_recommendation
+from content_api import get_specialist_recommendation
+from feature_encoder import FeatureEncoder
+from symptom_aliases import SymptomNormalizer
+
+encoder = FeatureEncoder(feature_columns)
+normalizer = SymptomNormalizer(feature_columns)
 
 # Disease-Specialist mapping based on common medical knowledge
 DISEASE_SPECIALIST_MAPPING = {
@@ -182,8 +194,8 @@ SYMPTOM_DISEASE_MAPPING = {
 class SymptomRequest(BaseModel):
     symptoms: dict
 
-@app.post("/predict")
-async def predict_specialist(request: SymptomRequest):
+def run_prediction(request):
+    """Synchronous prediction pipeline, executed on the inference pool"""
     try:
         symptoms = request.symptoms
         print(f"FastAPI received symptoms: {symptoms}")
@@ -193,19 +205,15 @@ async def predict_specialist(request: SymptomRequest):
         print(f"Active symptoms: {active_symptoms}")
         
         # Step 1: Predict specialist using ML model
-        input_data = pd.DataFrame([[0] * len(feature_columns)], columns=feature_columns)
-        
-        for symptom in active_symptoms:
-            if symptom in feature_columns:
-                input_data[symptom] = 1
+        estimator, input_data = encoder.model_input(model, encoder.encode(normalizer.normalize(active_symptoms)))
         
-        predicted_specialist = model.predict(input_data)[0]
+        predicted_specialist = estimator.predict(input_data)[0]
         print(f"ML Model prediction: {predicted_specialist}")
         
         # Step 2: Get disease probabilities (if available from model)
         try:
             # Try to get probabilities for disease prediction
-            proba = model.predict_proba(input_data)[0] if hasattr(model, 'predict_proba') else None
+            proba = estimator.predict_proba(input_data)[0] if hasattr(estimator, 'predict_proba') else None
             classes = model.classes_ if hasattr(model, 'classes_') else None
 
             diagnoses = []
@@ -263,6 +271,23 @@ async def predict_specialist(request: SymptomRequest):
         print(f"Error in prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict")
+async def predict_specialist(request: SymptomRequest):
+    # Model inference runs on the inference pool, not the event loop
+    return await inference_pool.run(run_prediction, request)
+
+@app.on_event("startup")
+async def startup_event():
+    """Warm the model and mapper before reporting ready"""
+    readiness.start(lambda active_symptoms: run_prediction(
+        SymptomRequest(symptoms={symptom: True for symptom in active_symptoms})),
+        fallback_mode=model is None)
+
+@app.get("/ready")
+async def get_ready(response: Response):
+    """503 until warmup has finished; warmup time and fallback mode"""
+    return readiness.respond(response)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8001) 
\ No newline at end of file
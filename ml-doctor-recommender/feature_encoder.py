@@ -0,0 +1,102 @@
+"""
+Shared symptom -> feature-vector encoder for the /predict services
+
+Replaces building a one-row pandas DataFrame and setting columns one by one.
+The symptom -> column-index dict is computed once from the feature_columns_*.pkl
+list, and rows are written straight into a numpy buffer that each thread reuses.
+"""
+
+import copy
+import threading
+
+import numpy as np
+
+# Bump when encode()/model_input() change what a model is given for a symptom set
+ENCODING_FORMAT = 1
+
+
+class FeatureEncoder:
+    """Encode active symptom names into the binary feature layout of a model"""
+
+    def __init__(self, feature_columns, dtype=np.float32):
+        self.columns = list(feature_columns)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.dtype = dtype
+        self._local = threading.local()
+        self._adapted = {}
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __contains__(self, symptom):
+        return symptom in self.index
+
+    def encode(self, symptoms):
+        """Return a reusable (1, n_features) row with the given symptoms set to 1"""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.zeros((1, len(self.columns)), dtype=self.dtype)
+            self._local.row = row
+        else:
+            row.fill(0)
+
+        for symptom in symptoms:
+            i = self.index.get(symptom)
+            if i is not None:
+                row[0, i] = 1
+        return row
+
+    def encode_many(self, symptom_lists):
+        """Return a fresh (n_rows, n_features) block, one row per symptom list"""
+        block = np.zeros((len(symptom_lists), len(self.columns)), dtype=self.dtype)
+        for r, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                i = self.index.get(symptom)
+                if i is not None:
+                    block[r, i] = 1
+        return block
+
+    def model_input(self, model, X):
+        """
+        Return (estimator, X) such that estimator.predict_proba(X) is
+        model.predict_proba on these columns.
+
+        Every form is worked out once per model. Models without feature names,
+        or that do not check names themselves (tree_compiler models), get X as
+        it is, with its columns gathered into feature_names_in_ order if that
+        differs. sklearn estimators fitted with names are swapped for a
+        shallow copy without feature_names_in_, so a plain array is valid
+        input and no per-call DataFrame is needed.
+        """
+        cached = self._adapted.get(id(model))
+        if cached is None or cached[0] is not model:
+            cached = (model,) + self._adapt(model)
+            self._adapted[id(model)] = cached
+        _, estimator, gather = cached
+        if gather is not None:
+            X = self._gather(X, *gather)
+        return estimator, X
+
+    def _adapt(self, model):
+        """(estimator, gather) for model_input; gather is None when no reordering is needed"""
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            return model, None
+        names = list(names)
+        estimator = model
+        # sklearn estimators validate names; names that are not a plain attribute (a Pipeline's) stay
+        if hasattr(model, "get_params") and "feature_names_in_" in vars(model):
+            estimator = copy.copy(model)
+            del estimator.feature_names_in_
+        if names == self.columns:
+            return estimator, None
+        present = [(position, self.index[name]) for position, name in enumerate(names) if name in self.index]
+        targets = np.array([position for position, _ in present], dtype=np.intp)
+        sources = np.array([column for _, column in present], dtype=np.intp)
+        return estimator, (targets, sources, len(names))
+
+    def _gather(self, X, targets, sources, width):
+        """X with its columns moved to feature_names_in_ positions (names it lacks are 0)"""
+        out = np.zeros((len(X), width), dtype=X.dtype)
+        out[:, targets] = X[:, sources]
+        return out
@@ -1,7 +1,10 @@
-import pandas as pd
 import numpy as np
 import json
 from typing import List, Dict, Optional
+from symptom_aliases import SYNONYMS, SymptomNormalizer, TrigramIndex, standardize_symptom
+from binary_similarity import BinaryCases
+from dataset_cache import load_dataset
+from minhash_lsh import RETRIEVAL_K, MinHashLSH
 
 class DoctorRecommender:
     """
@@ -11,25 +14,24 @@ class DoctorRecommender:
     - Improved output formatting
     """
     
-    def __init__(self, data_path: str = 'Specialist.xlsx'):
+    def __init__(self, data_path: str = 'Specialist.xlsx', retrieval_k: int = RETRIEVAL_K):
         self.data_path = data_path
+        self.retrieval_k = retrieval_k  # > 0: score only the top-k Jaccard cases found by MinHash-LSH
+        self.retrieval = None
         self.main_data = None
         self.symptom_columns = None
         self.specialists = None
         self.symptom_to_column_map = {}
+        self.symptom_normalizer = None
+        self.fuzzy_index = None
+        self.fuzzy_columns = {}
+        self.cases = None  # bit-packed case x symptom store
+        self.case_labels = None  # index into self.specialists per case
+        self.specialist_totals = None  # cases per specialist
+        self.column_index = {}
         self.BASE_CONFIDENCE = 30  # Base minimum confidence percentage
         self.MIN_FALLBACK_CONFIDENCE = 20  # Minimum for cases with few matches
-        
-        # Enhanced symptom standardization
-        self.symptom_mapping = {
-            "fever": "high_fever",
-            "stomachache": "stomach_pain",
-            "throw up": "vomiting",
-            "throwup": "vomiting",
-            "belly pain": "stomach_pain",
-            "bp": "blood_pressure",
-            "heartburn": "acid_reflux"
-        }
+        self.FUZZY_MIN_SCORE = 0.4  # Trigram similarity needed for a fuzzy symptom match
         
         self._load_data()
         self._prepare_data()
@@ -37,7 +39,7 @@ class DoctorRecommender:
     def _load_data(self):
         """Load and clean the dataset"""
         print("Loading data...")
-        self.main_data = pd.read_excel(self.data_path)
+        self.main_data = load_dataset(self.data_path)
         
         if 'Unnamed: 0' in self.main_data.columns:
             self.main_data = self.main_data.drop('Unnamed: 0', axis=1)
@@ -74,65 +76,67 @@ class DoctorRecommender:
         )
         
         self.specialists = self.main_data[self.target_column].unique()
+
+        # Cases bit-packed plus specialist codes, so recommend() scores every case at once
+        case_matrix = self.main_data[self.symptom_columns].to_numpy(dtype=np.uint8)
+        self.cases = BinaryCases(case_matrix)
+        if self.retrieval_k > 0:
+            self.retrieval = MinHashLSH(case_matrix)
+        codes = {specialist: i for i, specialist in enumerate(self.specialists)}
+        self.case_labels = self.main_data[self.target_column].map(codes).to_numpy(dtype=np.intp)
+        self.specialist_totals = np.bincount(self.case_labels, minlength=len(self.specialists))
+        self.column_index = {col: i for i, col in enumerate(self.symptom_columns)}
         
         for col in self.symptom_columns:
             clean_name = col.strip().lower().replace(' ', '_')
             self.symptom_to_column_map[clean_name] = col
             no_underscore = clean_name.replace('_', '')
             self.symptom_to_column_map[no_underscore] = col
+
+        # Every spelling, severity suffix and synonym of a column compiled into one lookup
+        self.symptom_normalizer = SymptomNormalizer(self.symptom_to_column_map)
+
+        # Trigram index over column names and synonyms for misspelled symptoms
+        self.fuzzy_columns = dict(self.symptom_to_column_map)
+        for term, target in SYNONYMS.items():
+            if target in self.symptom_to_column_map:
+                self.fuzzy_columns.setdefault(term, self.symptom_to_column_map[target])
+        self.fuzzy_index = TrigramIndex(self.fuzzy_columns)
         
         print(f"✓ Prepared data with {len(self.specialists)} specialist types")
     
     def _standardize_symptom(self, symptom: str) -> str:
-        """Standardize symptom input with enhanced mappings"""
-        symptom = symptom.strip().lower()
-        return self.symptom_mapping.get(symptom, symptom)
+        """Standardize symptom input with enhanced mappings (see symptom_aliases)"""
+        return standardize_symptom(symptom)
     
     def _match_symptoms(self, user_symptoms: List[str]) -> List[str]:
         """Robust symptom matching with improved partial matching"""
         matched_symptoms = []
         
         for symptom in user_symptoms:
-            clean_symptom = self._standardize_symptom(symptom)
-            clean_symptom = clean_symptom.replace(' ', '_')
-            
-            # Exact match check
-            if clean_symptom in self.symptom_to_column_map:
-                matched_symptoms.append(self.symptom_to_column_map[clean_symptom])
+            # Exact match check (aliases and spellings included)
+            known = self.symptom_normalizer.get(symptom)
+            if known is not None:
+                matched_symptoms.append(self.symptom_to_column_map[known])
                 continue
-            
-            # Enhanced partial matching
-            best_match = None
-            best_score = 0
-            
-            for db_symptom, db_column in self.symptom_to_column_map.items():
-                if clean_symptom in db_symptom or db_symptom in clean_symptom:
-                    score = len(set(clean_symptom) & set(db_symptom)) / len(set(clean_symptom) | set(db_symptom))
-                    if score > best_score:
-                        best_score = score
-                        best_match = db_column
-            
-            if best_match and best_score > 0.4:  # Slightly more lenient threshold
-                matched_symptoms.append(best_match)
+
+            # Fuzzy match through the trigram index (memoized per spelling)
+            candidates = self.fuzzy_match(symptom, limit=1)
+            if candidates:
+                matched_symptoms.append(candidates[0][0])
         
         return list(set(matched_symptoms))
     
-    def _calculate_similarity(self, user_vector: np.ndarray, case_vector: np.ndarray) -> float:
-        """Enhanced similarity calculation"""
-        intersection = np.sum(user_vector * case_vector)
-        union = np.sum((user_vector + case_vector) > 0)
-        jaccard = intersection / union if union > 0 else 0
-        
-        dot_product = np.dot(user_vector, case_vector)
-        norm_user = np.linalg.norm(user_vector)
-        norm_case = np.linalg.norm(case_vector)
-        cosine = dot_product / (norm_user * norm_case) if (norm_user * norm_case) > 0 else 0
-        
-        simple_match = intersection / np.sum(user_vector) if np.sum(user_vector) > 0 else 0
-        
-        # Weighted combination favoring simple match
-        return jaccard * 0.2 + cosine * 0.2 + simple_match * 0.6
-    
+    def fuzzy_match(self, symptom: str, limit: int = 5) -> List[tuple]:
+        """Top (column, score) candidates for a misspelled or partial symptom"""
+        clean_symptom = self._standardize_symptom(symptom)
+        candidates = []
+        for name, score in self.fuzzy_index.search(clean_symptom, limit=limit * 3, min_score=self.FUZZY_MIN_SCORE):
+            column = self.fuzzy_columns[name]
+            if column not in [c for c, _ in candidates]:
+                candidates.append((column, score))
+        return candidates[:limit]
+
     def recommend(self, symptoms: List[str], top_n: int = 5) -> Dict:
         """Enhanced recommendation with dynamic confidence"""
         if not symptoms:
@@ -147,31 +151,31 @@ class DoctorRecommender:
             }
         
         # Create symptom vector
+        user_columns = np.array(sorted(self.column_index[symptom] for symptom in matched_symptoms), dtype=np.intp)
         user_vector = np.zeros(len(self.symptom_columns))
-        for i, symptom in enumerate(self.symptom_columns):
-            if symptom in matched_symptoms:
-                user_vector[i] = 1
+        user_vector[user_columns] = 1
+        
+        # Calculate scores: similarity to every case (or the retrieved ones), then
+        # mean/max/count of the matching ones per specialist
+        rows = None if self.retrieval is None else self.retrieval.query(user_columns, self.retrieval_k)
+        similarities = self.cases.similarities(user_columns, 0.2, 0.2, 0.6, rows)
+        matching = similarities > 0
+        labels = (self.case_labels if rows is None else self.case_labels[rows])[matching]
+        scores = similarities[matching]
+        n_specialists = len(self.specialists)
+        matching_cases = np.bincount(labels, minlength=n_specialists)
+        score_sums = np.bincount(labels, weights=scores, minlength=n_specialists)
+        max_scores = np.zeros(n_specialists)
+        np.maximum.at(max_scores, labels, scores)
         
-        # Calculate scores
         specialist_scores = {}
-        for specialist in self.specialists:
-            specialist_data = self.main_data[self.main_data[self.target_column] == specialist]
-            
-            similarities = []
-            for _, row in specialist_data.iterrows():
-                case_vector = np.array(row[self.symptom_columns])
-                similarity = self._calculate_similarity(user_vector, case_vector)
-                if similarity > 0:
-                    similarities.append(similarity)
-            
-            if similarities:
-                confidence = np.mean(similarities) * 100
-                specialist_scores[specialist] = {
-                    'confidence': confidence,
-                    'matching_cases': len(similarities),
-                    'total_cases': len(specialist_data),
-                    'max_score': np.max(similarities)
-                }
+        for code in np.flatnonzero(matching_cases):
+            specialist_scores[self.specialists[code]] = {
+                'confidence': score_sums[code] / matching_cases[code] * 100,
+                'matching_cases': int(matching_cases[code]),
+                'total_cases': int(self.specialist_totals[code]),
+                'max_score': max_scores[code]
+            }
         
         # Dynamic confidence threshold
         if len(specialist_scores) < 3:
@@ -207,7 +211,7 @@ class DoctorRecommender:
                 if len(recommendations) >= top_n:
                     break
         
-        return {
+        result = {
             'input_symptoms': symptoms,
             'matched_symptoms': [s.strip() for s in matched_symptoms],
             'total_active_symptoms': int(np.sum(user_vector)),
@@ -218,6 +222,9 @@ class DoctorRecommender:
                 'total_specialists_considered': len(specialist_scores)
             }
         }
+        if rows is not None:
+            result['system_metrics']['retrieved_cases'] = len(rows)
+        return result
     
     def get_available_symptoms(self) -> List[str]:
         """Get list of available symptoms"""
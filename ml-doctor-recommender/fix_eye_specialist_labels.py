@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_dataset
 
 # Load cleaned data
-df = pd.read_excel("Specialist_cleaned.xlsx")
+df = load_dataset("Specialist_cleaned.xlsx")
 
 # Find all columns related to eyes
 eye_symptom_cols = [col for col in df.columns if 'eye' in col.lower()]
@@ -4,6 +4,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
+from dataset_cache import load_dataset
 
 # Create a much better training dataset
 def create_better_training_data():
@@ -23,7 +24,7 @@ def create_better_training_data():
     }
     
     # Load original data to get all possible symptoms
-    df_original = pd.read_excel("Specialist_cleaned.xlsx")
+    df_original = load_dataset("Specialist_cleaned.xlsx")
     all_symptoms = [col for col in df_original.columns if col != 'Specialist']
     
     training_rows = []
@@ -0,0 +1,106 @@
+"""
+Fused disease + specialist model inference
+
+The /predict pipeline used to encode the request once per model and call
+each predict_proba separately, then rank each model's probabilities in its
+own pass. FusedPredictor encodes a batch of symptom lists once, evaluates the
+specialist model on every row and the disease model only on the rows that
+need it, and ranks both probability blocks in one argsort pass per model.
+When both models run over a large enough batch, the disease model is
+evaluated on a helper thread while the specialist model runs on the caller's
+(tree prediction releases the GIL). There is one helper thread per inference
+worker, so concurrent batches do not queue behind each other's disease model.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Below this many rows a second thread costs more than it saves
+PARALLEL_MIN_ROWS = int(os.environ.get("FUSED_PARALLEL_MIN_ROWS", "64"))
+
+
+class ModelPredictions:
+    """Ranked model output for one symptom set"""
+
+    __slots__ = ("specialists", "diseases")
+
+    def __init__(self, specialists, diseases):
+        # [{'specialist', 'probability'}] best first, at most 3 above 5%
+        self.specialists = specialists
+        # [{'disease', 'probability'}] best first, at most 5 above 1%; [] if the disease model did not run
+        self.diseases = diseases
+
+
+def rank_rows(probabilities, classes, top, min_probability, label):
+    """Top classes of every row of a probability block, as [{label, 'probability'}] lists"""
+    if len(probabilities) == 0:
+        return []
+    top_indices = probabilities.argsort(axis=1)[:, -top:][:, ::-1]
+    top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1)
+    ranked = []
+    for indices, values in zip(top_indices.tolist(), top_probabilities.tolist()):
+        ranked.append([{label: classes[idx], 'probability': value}
+                       for idx, value in zip(indices, values) if value > min_probability])
+    return ranked
+
+
+class FusedPredictor:
+    """Encode once, run both models, rank both outputs"""
+
+    def __init__(self, encoder, disease_model, specialist_model, parallel_min_rows=PARALLEL_MIN_ROWS,
+                 helper_workers=None):
+        self.encoder = encoder
+        self.disease_model = disease_model
+        self.specialist_model = specialist_model
+        self.parallel_min_rows = parallel_min_rows
+        self.disease_classes = list(disease_model.classes_)
+        self.specialist_classes = list(specialist_model.classes_)
+        # Sized like the InferencePool whose workers call predict()
+        helper_workers = helper_workers or int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 4))
+        self._helper = ThreadPoolExecutor(max_workers=helper_workers, thread_name_prefix="fused-disease")
+
+    def _disease_probabilities(self, block):
+        estimator, block = self.encoder.model_input(self.disease_model, block)
+        return estimator.predict_proba(block)
+
+    def _specialist_probabilities(self, block):
+        estimator, block = self.encoder.model_input(self.specialist_model, block)
+        return estimator.predict_proba(block)
+
+    def predict(self, symptom_lists, need_disease=None):
+        """
+        ModelPredictions for each list of clean symptom names.
+
+        need_disease is an optional list of flags; the disease model only runs
+        on flagged rows (all rows when it is None) and the others get diseases=[].
+        """
+        if need_disease is None:
+            need_disease = [True] * len(symptom_lists)
+        if len(symptom_lists) == 1:
+            block = self.encoder.encode(symptom_lists[0])
+        else:
+            block = self.encoder.encode_many(symptom_lists)
+        disease_rows = [row for row, needed in enumerate(need_disease) if needed]
+        disease_block = block if len(disease_rows) == len(symptom_lists) else block[disease_rows]
+
+        if disease_rows and len(symptom_lists) >= self.parallel_min_rows:
+            pending = self._helper.submit(self._disease_probabilities, disease_block)
+            specialist_probabilities = self._specialist_probabilities(block)
+            disease_probabilities = pending.result()
+        else:
+            specialist_probabilities = self._specialist_probabilities(block)
+            disease_probabilities = (self._disease_probabilities(disease_block) if disease_rows
+                                     else np.empty((0, len(self.disease_classes))))
+
+        specialists = rank_rows(specialist_probabilities, self.specialist_classes, 3, 0.05, 'specialist')
+        diseases = [[] for _ in symptom_lists]
+        for row, ranked in zip(disease_rows,
+                               rank_rows(disease_probabilities, self.disease_classes, 5, 0.01, 'disease')):
+            diseases[row] = ranked
+        return [ModelPredictions(specialists[row], diseases[row]) for row in range(len(symptom_lists))]
+
+    def predict_one(self, symptoms, need_disease=True):
+        """ModelPredictions for a single list of clean symptom names"""
+        return self.predict([symptoms], [need_disease])[0]
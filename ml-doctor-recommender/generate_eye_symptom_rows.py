@@ -1,8 +1,9 @@
 import pandas as pd
 import itertools
+from dataset_cache import load_dataset
 
 # Load the fixed data
-df = pd.read_excel("Specialist_eye_fixed.xlsx")
+df = load_dataset("Specialist_eye_fixed.xlsx")
 
 # Find all columns related to eyes
 eye_symptom_cols = [col for col in df.columns if 'eye' in col.lower()]
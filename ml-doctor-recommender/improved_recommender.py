@@ -1,12 +1,14 @@
-import pandas as pd
 import numpy as np
 from collections import Counter
+from binary_similarity import BinaryCases
+from dataset_cache import load_dataset
+from minhash_lsh import RETRIEVAL_K, MinHashLSH
 
 print("=== IMPROVED DOCTOR RECOMMENDER SYSTEM ===\n")
 
 # Load and clean data
 print("Loading and cleaning data...")
-main_data = pd.read_excel('Specialist.xlsx')
+main_data = load_dataset('Specialist.xlsx')
 main_data = main_data.drop('Unnamed: 0', axis=1)
 
 target_column = main_data.columns[-1]
@@ -44,6 +46,14 @@ for specialist in sorted(specialists):
     count = (main_data[target_column] == specialist).sum()
     print(f"  • {specialist}: {count} cases")
 
+# Bit-packed cases and per-case specialist codes for scoring every case at once
+case_matrix = main_data[symptom_columns].to_numpy(dtype=np.uint8)
+cases = BinaryCases(case_matrix)
+# RECOMMENDER_RETRIEVAL_K > 0: score only the top-k Jaccard cases found by MinHash-LSH
+retrieval = MinHashLSH(case_matrix) if RETRIEVAL_K > 0 else None
+case_labels = main_data[target_column].map({s: i for i, s in enumerate(specialists)}).to_numpy(dtype=np.intp)
+specialist_totals = np.bincount(case_labels, minlength=len(specialists))
+
 def recommend_doctor_improved(user_symptoms, top_n=5):
     """
     Improved recommendation function with better scoring
@@ -83,48 +93,27 @@ def recommend_doctor_improved(user_symptoms, top_n=5):
     
     print(f"✓ Active symptoms: {int(sum(user_vector))}/{len(symptom_columns)}")
     
-    # Calculate recommendations using multiple scoring methods
+    # Calculate recommendations using multiple scoring methods:
+    # Jaccard (intersection/union), cosine and simple matching (share of user symptoms matched)
+    user_columns = np.flatnonzero(user_vector)
+    rows = None if retrieval is None else retrieval.query(user_columns, RETRIEVAL_K)
+    combined_scores = cases.similarities(user_columns, 0.3, 0.3, 0.4, rows)
+    matching = combined_scores > 0
+    labels = (case_labels if rows is None else case_labels[rows])[matching]
+    scores = combined_scores[matching]
+    matching_counts = np.bincount(labels, minlength=len(specialists))
+    score_sums = np.bincount(labels, weights=scores, minlength=len(specialists))
+    max_scores = np.zeros(len(specialists))
+    np.maximum.at(max_scores, labels, scores)
+
     specialist_scores = {}
-    
-    for specialist in specialists:
-        specialist_data = main_data[main_data[target_column] == specialist]
-        
-        scores = []
-        matching_cases = 0
-        
-        for index, row in specialist_data.iterrows():
-            case_vector = np.array(row[symptom_columns])
-            
-            # Method 1: Jaccard similarity (intersection/union)
-            intersection = np.sum(user_vector * case_vector)
-            union = np.sum((user_vector + case_vector) > 0)
-            jaccard = intersection / union if union > 0 else 0
-            
-            # Method 2: Cosine similarity
-            dot_product = np.dot(user_vector, case_vector)
-            norm_user = np.linalg.norm(user_vector)
-            norm_case = np.linalg.norm(case_vector)
-            cosine = dot_product / (norm_user * norm_case) if (norm_user * norm_case) > 0 else 0
-            
-            # Method 3: Simple matching (percentage of user symptoms matched)
-            simple_match = intersection / sum(user_vector) if sum(user_vector) > 0 else 0
-            
-            # Combined score (weighted average)
-            combined_score = (jaccard * 0.3 + cosine * 0.3 + simple_match * 0.4)
-            
-            if combined_score > 0:
-                scores.append(combined_score)
-                matching_cases += 1
-        
-        if scores:
-            avg_score = np.mean(scores)
-            max_score = np.max(scores)
-            specialist_scores[specialist] = {
-                'avg_score': avg_score,
-                'max_score': max_score,
-                'matching_cases': matching_cases,
-                'total_cases': len(specialist_data)
-            }
+    for code in np.flatnonzero(matching_counts):
+        specialist_scores[specialists[code]] = {
+            'avg_score': score_sums[code] / matching_counts[code],
+            'max_score': max_scores[code],
+            'matching_cases': int(matching_counts[code]),
+            'total_cases': int(specialist_totals[code])
+        }
     
     # Sort by average score
     sorted_specialists = sorted(specialist_scores.items(), 
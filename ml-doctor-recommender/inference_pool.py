@@ -0,0 +1,71 @@
+"""
+Bounded executor for CPU-bound inference in the FastAPI services
+
+The /predict handlers are async, but predict_proba and rule matching are
+synchronous CPU work. Running them on the event loop stalls every other
+connection on the worker, so they are handed to a fixed thread pool instead.
+At most INFERENCE_WORKERS jobs run and INFERENCE_QUEUE_DEPTH more may wait;
+anything beyond that is rejected immediately with a 503. A batch request
+holds one slot for all of its items, so batches over INFERENCE_MAX_BATCH
+items are refused with a 413 before they reach the pool.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+
+class InferencePool:
+    """Thread pool with a hard cap on running + queued jobs"""
+
+    def __init__(self, max_workers=None, max_queue=None, max_batch=None):
+        self.max_workers = max_workers or int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 4))
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get("INFERENCE_QUEUE_DEPTH", "64"))
+        self.max_batch = max_batch or int(os.environ.get("INFERENCE_MAX_BATCH", "1000"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def check_batch(self, items):
+        """Raise HTTP 413 if a batch request has more items than one job may take"""
+        if len(items) > self.max_batch:
+            raise HTTPException(status_code=413,
+                                detail=f"Batch of {len(items)} items exceeds the limit of {self.max_batch}")
+
+    async def run(self, func, *args):
+        """Run func(*args) on the pool, or raise HTTP 503 if the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(status_code=503, detail="Inference queue is full, retry shortly",
+                                headers={"Retry-After": "1"})
+
+        with self._lock:
+            self.in_flight += 1
+        # Release the slot when the work finishes, even if the client went away.
+        # The request's context (e.g. its debug-trace flag) follows it to the worker.
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, func, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.max_queue,
+                "max_batch": self.max_batch,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected
+            }
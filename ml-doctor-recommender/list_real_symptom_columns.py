@@ -1,7 +1,7 @@
-import pandas as pd
 import re
+from dataset_cache import load_dataset
 
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 
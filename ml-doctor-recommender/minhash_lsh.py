@@ -0,0 +1,179 @@
+"""
+MinHash-LSH retrieval of the most Jaccard-similar cases
+
+The similarity recommenders score a query against every case they hold,
+which grows linearly with the case base. MinHashLSH is an optional first
+stage: it returns the top-K cases by exact Jaccard similarity among the
+candidates an LSH index proposes, and the recommenders score only those.
+
+Cases are deduplicated first (the Specialist*.xlsx datasets repeat each
+symptom set many times; augmented case bases even more so), and only the
+distinct symptom sets are indexed. Each set gets a MinHash signature of
+num_perm values, the minimum rank of its symptoms under num_perm random
+permutations of the feature columns. Two sets agree on one signature value
+with probability equal to their Jaccard similarity. The signature is cut into
+bands of num_perm / bands values, and a set becomes a candidate when it
+agrees with the query on every value of at least one band, so a set of
+similarity J is missed with probability (1 - J^r)^bands for r values per band.
+Queries of a few symptoms have low Jaccard similarity to most cases, so the
+defaults use short bands (r = 2).
+
+Every (band, band values) bucket gets a 64-bit key, the band number in the
+top byte; the index is the sorted array of distinct bucket keys plus the
+member set IDs grouped by bucket, so one vectorized binary search finds the
+query's bucket in every band. Candidates are re-scored by exact Jaccard with
+binary_similarity, and their cases are returned in order of similarity.
+"""
+
+import os
+
+import numpy as np
+
+from binary_similarity import BinaryCases, pack_rows
+
+# Cases the recommenders score per query when retrieval is on; 0 keeps exact scoring over every case
+RETRIEVAL_K = int(os.environ.get("RECOMMENDER_RETRIEVAL_K", "0"))
+
+NUM_PERM = int(os.environ.get("MINHASH_NUM_PERM", "128"))
+BANDS = int(os.environ.get("MINHASH_BANDS", "64"))
+
+# Band values hash into the low 56 bits of a bucket key, the band number goes above them
+_KEY_BITS = 56
+_KEY_MASK = np.uint64((1 << _KEY_BITS) - 1)
+
+# Bounds the sets handled per block when computing signatures (sets x permutations x features bytes)
+_SIGNATURE_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+class MinHashLSH:
+    """LSH index over the distinct symptom sets of a 0/1 case matrix"""
+
+    def __init__(self, matrix, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        if bands > 1 << (64 - _KEY_BITS):
+            raise ValueError(f"at most {1 << (64 - _KEY_BITS)} bands are supported")
+        matrix = np.asarray(matrix)
+        self.n_cases, self.n_features = matrix.shape
+        self.num_perm = num_perm
+        self.bands = bands
+        self.band_rows = num_perm // bands
+
+        # Distinct symptom sets, and the cases holding each one (grouped by set, in case order)
+        words, set_ids = np.unique(pack_rows(matrix), axis=0, return_inverse=True)
+        set_ids = set_ids.reshape(-1)
+        self.sets = BinaryCases.from_words(words, self.n_features)
+        self.set_cases = np.argsort(set_ids, kind="stable").astype(np.intp)
+        self.set_offsets = np.zeros(len(words) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(set_ids, minlength=len(words)), out=self.set_offsets[1:])
+
+        # ranks[p, f]: position of feature f in permutation p; absent features rank n_features
+        rng = np.random.default_rng(seed)
+        self.ranks = np.array([rng.permutation(self.n_features) for _ in range(num_perm)], dtype=np.uint16)
+        signatures = self._signatures(np.unpackbits(words.view(np.uint8), axis=1, count=self.n_features))
+
+        # Buckets of all bands in one sorted key array; bucket_sets[bucket_offsets[i]:bucket_offsets[i + 1]]
+        # are the sets in bucket_keys[i]
+        keys = self._band_keys(signatures).reshape(-1)
+        order = np.argsort(keys, kind="stable")
+        self.bucket_keys, starts = np.unique(keys[order], return_index=True)
+        self.bucket_offsets = np.append(starts, len(order)).astype(np.intp)
+        self.bucket_sets = (order % max(1, len(words))).astype(np.int32)
+
+    def __len__(self):
+        return self.n_cases
+
+    @property
+    def n_sets(self):
+        return len(self.sets)
+
+    @property
+    def nbytes(self):
+        return (self.sets.nbytes + self.set_cases.nbytes + self.set_offsets.nbytes
+                + self.bucket_keys.nbytes + self.bucket_offsets.nbytes + self.bucket_sets.nbytes)
+
+    def _signatures(self, present):
+        """(sets x num_perm) MinHash signatures of a boolean (sets x features) matrix"""
+        signatures = np.full((len(present), self.num_perm), self.n_features, dtype=np.uint16)
+        step = max(1, _SIGNATURE_BLOCK_BYTES // (self.num_perm * self.n_features * 2))
+        for start in range(0, len(present), step):
+            # Minimum rank over each set's own features: gather their ranks, reduce per set
+            rows, features = np.nonzero(present[start:start + step])
+            if len(rows) == 0:
+                continue
+            nonempty, first = np.unique(rows, return_index=True)
+            minima = np.minimum.reduceat(self.ranks[:, features], first, axis=1)
+            signatures[start + nonempty] = minima.T
+        return signatures
+
+    def _band_keys(self, signatures):
+        """(bands x sets) uint64 bucket key of each band of each signature"""
+        keys = np.zeros((self.bands, len(signatures)), dtype=np.uint64)
+        base = np.uint64(self.n_features + 1)
+        bands = signatures.reshape(len(signatures), self.bands, self.band_rows)
+        for row in range(self.band_rows):
+            # Exact while band_rows * log2(n_features + 1) <= 56 bits, a wrapping hash beyond that;
+            # a collision only adds candidates, which exact re-scoring sorts out
+            keys = keys * base + bands[:, :, row].T.astype(np.uint64)
+        band_ids = np.arange(self.bands, dtype=np.uint64)[:, np.newaxis] << np.uint64(_KEY_BITS)
+        return (keys & _KEY_MASK) | band_ids
+
+    def candidates(self, columns):
+        """IDs of the distinct symptom sets sharing a band with the given feature indices"""
+        columns = np.unique(np.asarray(columns, dtype=np.intp))
+        if len(columns):
+            signature = self.ranks[:, columns].min(axis=1)
+        else:
+            signature = np.full(self.num_perm, self.n_features, dtype=np.uint16)
+        keys = self._band_keys(signature[np.newaxis, :])[:, 0]
+        buckets = np.searchsorted(self.bucket_keys, keys)
+        found = buckets < len(self.bucket_keys)
+        buckets = buckets[found][self.bucket_keys[buckets[found]] == keys[found]]
+        if len(buckets) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Members of every matched bucket, deduplicated through a mark per set
+        starts = self.bucket_offsets[buckets]
+        lengths = self.bucket_offsets[buckets + 1] - starts
+        cumulative = np.cumsum(lengths)
+        positions = np.repeat(starts - (cumulative - lengths), lengths) + np.arange(cumulative[-1])
+        marked = np.zeros(self.n_sets, dtype=bool)
+        marked[self.bucket_sets[positions]] = True
+        return np.flatnonzero(marked)
+
+    def query(self, columns, k):
+        """
+        Indices of up to k cases with the highest Jaccard similarity to the
+        given feature indices among the LSH candidates, most similar first.
+        Cases sharing no feature are never returned.
+        """
+        columns = list(set(columns))
+        if not columns or k <= 0:
+            return np.empty(0, dtype=np.intp)
+        sets = self.candidates(columns)
+        if len(sets) == 0:
+            return np.empty(0, dtype=np.intp)
+        intersection = self.sets.intersections(columns, sets)
+        jaccard = intersection / (self.sets.sizes[sets] + len(columns) - intersection)
+        keep = intersection > 0
+        sets, jaccard = sets[keep], jaccard[keep]
+        if len(sets) == 0:
+            return np.empty(0, dtype=np.intp)
+        if len(sets) > k:
+            # Every set holds at least one case, so the top k cases come from sets at or above the
+            # k-th best similarity: sort only the ones above it and keep the ties at it in set order
+            threshold = np.partition(jaccard, len(jaccard) - k)[len(jaccard) - k]
+            above = jaccard > threshold
+            best, best_jaccard = sets[above], jaccard[above]
+            sets = np.concatenate([best[np.lexsort((best, -best_jaccard))], sets[jaccard == threshold]])
+        else:
+            sets = sets[np.lexsort((sets, -jaccard))]
+
+        # Expand the best sets into their cases until k are collected
+        starts = self.set_offsets[sets]
+        lengths = self.set_offsets[sets + 1] - starts
+        cumulative = np.cumsum(lengths)
+        used = int(np.searchsorted(cumulative, k)) + 1
+        starts, lengths, cumulative = starts[:used], lengths[:used], cumulative[:used]
+        positions = np.repeat(starts - (cumulative - lengths), lengths) + np.arange(cumulative[-1])
+        return self.set_cases[positions[:k]]
@@ -10,219 +10,318 @@ This API demonstrates the STRENGTH of ML by:
 5. Handling uncertainty and partial matches intelligently
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from pydantic import BaseModel
-import joblib
 import pickle
-import pandas as pd
 import numpy as np
 import uvicorn
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional
 from collections import defaultdict
 from itertools import combinations
-from multi_symptom_mapper import MULTI_SYMPTOM_DISEASE_MAPPING
+from rule_store import rule_store, check_admin_token
+from feature_encoder import FeatureEncoder
+from fused_inference import FusedPredictor
+from symptom_aliases import SymptomNormalizer
+from response_cache import ResponseCache, canonical_symptoms, file_version
+from inference_pool import InferencePool
+from model_store import load_compiled_model, memory_usage
+from request_logging import get_logger, start_request
+from warmup import Readiness
 
 app = FastAPI()
+log = get_logger("ml_multi_symptom_api")
 
 # Global variables for models and features
 disease_model = None
 specialist_model = None
 feature_columns = None
+encoder = None
+normalizer = None
+predictor = None
+model_version = None
+
+# Whole-pipeline response cache (PREDICT_CACHE_SIZE / PREDICT_CACHE_TTL)
+response_cache = ResponseCache.from_env()
+
+# CPU-bound inference runs here (INFERENCE_WORKERS / INFERENCE_QUEUE_DEPTH)
+inference_pool = InferencePool()
+
+# /ready answers 503 until startup warmup has run (WARMUP_PASSES)
+readiness = Readiness("ml_multi_symptom_api")
 
 # Using the existing high-quality rule-based mapping from multi_symptom_mapper.py
 # This replaces the poor ML training data with medically accurate rules
 
 def load_models():
     """Load the trained ML models and feature columns"""
-    global disease_model, specialist_model, feature_columns
+    global disease_model, specialist_model, feature_columns, encoder, normalizer, predictor, model_version
     
     try:
         print("🔄 Loading ML models...")
-        disease_model = joblib.load('multi_symptom_disease_model.pkl')
-        specialist_model = joblib.load('multi_symptom_specialist_model.pkl')
+        disease_model = load_compiled_model('multi_symptom_disease_model.pkl')
+        specialist_model = load_compiled_model('multi_symptom_specialist_model.pkl')
         
         with open('multi_symptom_features.pkl', 'rb') as f:
             feature_columns = pickle.load(f)
+        encoder = FeatureEncoder(feature_columns)
+        normalizer = SymptomNormalizer(feature_columns)
+        predictor = FusedPredictor(encoder, disease_model, specialist_model,
+                                   helper_workers=inference_pool.max_workers)
+        model_version = tuple(file_version(path) for path in (
+            'multi_symptom_disease_model.pkl', 'multi_symptom_specialist_model.pkl', 'multi_symptom_features.pkl'))
             
         print(f"✅ Loaded disease model with {len(disease_model.classes_)} diseases")
         print(f"✅ Loaded specialist model with {len(specialist_model.classes_)} specialists")
         print(f"✅ Loaded {len(feature_columns)} feature columns")
+        print(f"✅ Worker RSS after model load: {memory_usage().get('rss', 0):.1f} MB")
         
         return True
     except Exception as e:
         print(f"❌ Error loading models: {e}")
         return False
 
+def cache_version(rules):
+    """Model + rule-set version the cached responses are valid for"""
+    return (model_version, rules.version)
+
 class SymptomRequest(BaseModel):
     symptoms: dict
 
+class BatchSymptomRequest(BaseModel):
+    items: List[dict]
+
 @app.on_event("startup")
 async def startup_event():
     """Load models when the API starts"""
     success = load_models()
     if not success:
         print("⚠️ Failed to load models. API will use fallback mode.")
+    readiness.start(warmup_prediction, fallback_mode=not success)
+
+def warmup_prediction(active_symptoms):
+    """One warmup request through whichever path /predict will serve"""
+    if disease_model is None or specialist_model is None or feature_columns is None:
+        get_rule_based_diagnoses(active_symptoms, rule_store.current)
+        return fallback_prediction(active_symptoms)
+    return predict_active_symptoms(active_symptoms, rule_store.current)
 
 @app.get("/")
 async def root():
     return {"message": "ML-Powered Multi-Symptom API Running", "ml_enabled": disease_model is not None}
 
+@app.get("/ready")
+async def get_ready(response: Response):
+    """503 until warmup has finished; warmup time and whether fallback_prediction is serving"""
+    return readiness.respond(response)
+
+def get_active_symptoms(symptoms):
+    """Get active symptoms from a request payload"""
+    return [symptom for symptom, value in symptoms.items() 
+            if value == True and symptom != 'followupanswers']
+
+def no_symptoms_response():
+    """Response for a request without any active symptoms"""
+    return {
+        "diagnoses": [],
+        "predicted_specialist": "General Practitioner",
+        "confidence": 0.6,
+        "suggested_diseases": [],
+        "active_symptoms": [],
+        "ml_prediction": "General Practitioner",
+        "disease_based_specialists": ["General Practitioner"],
+        "message": "No active symptoms provided",
+        "ml_powered": False
+    }
+
+def build_ml_response(active_symptoms, rule_based_matches, predictions, rules):
+    """Create the final response from rule matches and fused ML predictions"""
+    # Create diagnoses combining both
+    if rule_based_matches:
+        log.debug("✅ Using %d rule-based disease matches", len(rule_based_matches))
+        diagnoses = create_hybrid_diagnoses(rule_based_matches, predictions, active_symptoms, rules)
+    else:
+        log.debug("⚠️ No rule-based matches, falling back to ML diseases")
+        diagnoses = create_ml_diagnoses(predictions, active_symptoms, rules)
+    
+    # Extract specialists and primary recommendation
+    specialists = list(set([diag['specialist'] for diag in diagnoses]))
+    primary_specialist = diagnoses[0]['specialist'] if diagnoses else "General Practitioner"
+    
+    response = {
+        "diagnoses": diagnoses,
+        "predicted_specialist": primary_specialist,
+        "confidence": diagnoses[0]['confidence'] if diagnoses else 0.6,
+        "suggested_diseases": [diag['disease'] for diag in diagnoses],
+        "active_symptoms": active_symptoms,
+        "ml_prediction": primary_specialist,
+        "disease_based_specialists": specialists,
+        "ml_powered": True,
+        "model_info": {
+            "disease_model": "RandomForest",
+            "specialist_model": "GradientBoosting",
+            "total_features": len(feature_columns),
+            "active_features": len(active_symptoms)
+        }
+    }
+    
+    log.debug("🎉 ML prediction complete: %s (confidence: %.3f)", primary_specialist, response['confidence'])
+    return response
+
+def predict_active_symptoms(active_symptoms, rules):
+    """Run the hybrid rule + ML pipeline for one symptom set (CPU-bound)"""
+    # HYBRID APPROACH: Use rule-based for diseases, ML for specialists
+    log.debug("🔄 Using HYBRID approach: Rule-based diseases + ML specialists")
+
+    # Rule ranking, matching_symptoms and the first-two-symptom lookups follow symptom order,
+    # so every ordering of a set is diagnosed as the sorted one
+    ordered = canonical_symptoms(active_symptoms)
+
+    # 1. Get rule-based disease predictions (high quality)
+    rule_based_matches = get_rule_based_diagnoses(ordered, rules)
+
+    # 2. One encoding for both models: ML specialists always, ML diseases only if no rule matches
+    predictions = predictor.predict_one(clean_ml_symptoms(ordered), need_disease=not rule_based_matches)
+
+    response = build_ml_response(ordered, rule_based_matches, predictions, rules)
+    response_cache.put(ordered, cache_version(rules), response)
+    return {**response, "active_symptoms": active_symptoms}
+
+def predict_many(active_lists, rules):
+    """Predict many symptom sets with one predict_proba call per model"""
+    version = cache_version(rules)
+    results = [None] * len(active_lists)
+
+    # Rows that actually need the models
+    rows = []
+    for row, active_symptoms in enumerate(active_lists):
+        if not active_symptoms:
+            results[row] = no_symptoms_response()
+        elif disease_model is None or specialist_model is None or feature_columns is None:
+            results[row] = fallback_prediction(active_symptoms)
+        else:
+            cached = response_cache.get(active_symptoms, version)
+            if cached is not None:
+                results[row] = {**cached, "active_symptoms": active_symptoms}
+            else:
+                rows.append(row)
+
+    if rows:
+        # Diagnosed in sorted order, like predict_active_symptoms
+        ordered_lists = [canonical_symptoms(active_lists[row]) for row in rows]
+        rule_matches = [get_rule_based_diagnoses(ordered, rules) for ordered in ordered_lists]
+
+        # Disease model only runs (once) on the rows without a rule match
+        predictions = predictor.predict([clean_ml_symptoms(ordered) for ordered in ordered_lists],
+                                        need_disease=[not matches for matches in rule_matches])
+
+        for i, row in enumerate(rows):
+            response = build_ml_response(ordered_lists[i], rule_matches[i], predictions[i], rules)
+            response_cache.put(ordered_lists[i], version, response)
+            results[row] = {**response, "active_symptoms": active_lists[row]}
+
+    return results
+
 @app.post("/predict")
-async def predict_with_ml(request: SymptomRequest):
+async def predict_with_ml(request: SymptomRequest, x_debug_trace: Optional[str] = Header(None)):
     """Predict diseases and specialists using ML models"""
+    start_request(x_debug_trace)
     try:
         symptoms = request.symptoms
-        print(f"🔍 ML API received symptoms: {symptoms}")
+        log.debug("🔍 ML API received symptoms: %s", symptoms)
         
-        # Get active symptoms
-        active_symptoms = [symptom for symptom, value in symptoms.items() 
-                          if value == True and symptom != 'followupanswers']
-        print(f"🎯 Active symptoms: {active_symptoms}")
+        active_symptoms = get_active_symptoms(symptoms)
+        log.debug("🎯 Active symptoms: %s", active_symptoms)
         
         if not active_symptoms:
-            return {
-                "diagnoses": [],
-                "predicted_specialist": "General Practitioner",
-                "confidence": 0.6,
-                "suggested_diseases": [],
-                "active_symptoms": [],
-                "ml_prediction": "General Practitioner",
-                "disease_based_specialists": ["General Practitioner"],
-                "message": "No active symptoms provided",
-                "ml_powered": False
-            }
+            return no_symptoms_response()
         
         if disease_model is None or specialist_model is None or feature_columns is None:
             return fallback_prediction(active_symptoms)
         
-        # Prepare input for ML models
-        input_data = prepare_ml_input(active_symptoms)
+        # One rule snapshot for the whole request, even if a reload lands meanwhile
+        rules = rule_store.current
+        cached = response_cache.get(active_symptoms, cache_version(rules))
+        if cached is not None:
+            return {**cached, "active_symptoms": active_symptoms}
         
-        # HYBRID APPROACH: Use rule-based for diseases, ML for specialists
-        print("🔄 Using HYBRID approach: Rule-based diseases + ML specialists")
-
-        # 1. Get rule-based disease predictions (high quality)
-        rule_based_matches = get_rule_based_diagnoses(active_symptoms)
+        # Model and rule matching run on the inference pool, not the event loop
+        return await inference_pool.run(predict_active_symptoms, active_symptoms, rules)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("❌ Error in ML prediction: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 2. Get ML specialist predictions (works well)
-        specialist_predictions = get_specialist_predictions(input_data)
+@app.post("/predict/batch")
+async def predict_with_ml_batch(request: BatchSymptomRequest, x_debug_trace: Optional[str] = Header(None)):
+    """Predict many symptom sets with one predict_proba call per model"""
+    start_request(x_debug_trace)
+    try:
+        inference_pool.check_batch(request.items)
+        active_lists = [get_active_symptoms(symptoms) for symptoms in request.items]
+        results = await inference_pool.run(predict_many, active_lists, rule_store.current)
+        return {"results": results, "total_count": len(results)}
 
-        # 3. Create diagnoses combining both
-        if rule_based_matches:
-            print(f"✅ Using {len(rule_based_matches)} rule-based disease matches")
-            diagnoses = create_hybrid_diagnoses(rule_based_matches, specialist_predictions, active_symptoms)
-        else:
-            print("⚠️ No rule-based matches, falling back to ML diseases")
-            # Fallback to ML if no rule matches
-            disease_predictions = get_disease_predictions(input_data)
-            diagnoses = create_ml_diagnoses(disease_predictions, specialist_predictions, active_symptoms)
-        
-        # Extract specialists and primary recommendation
-        specialists = list(set([diag['specialist'] for diag in diagnoses]))
-        primary_specialist = diagnoses[0]['specialist'] if diagnoses else "General Practitioner"
-        
-        response = {
-            "diagnoses": diagnoses,
-            "predicted_specialist": primary_specialist,
-            "confidence": diagnoses[0]['confidence'] if diagnoses else 0.6,
-            "suggested_diseases": [diag['disease'] for diag in diagnoses],
-            "active_symptoms": active_symptoms,
-            "ml_prediction": primary_specialist,
-            "disease_based_specialists": specialists,
-            "ml_powered": True,
-            "model_info": {
-                "disease_model": "RandomForest",
-                "specialist_model": "GradientBoosting",
-                "total_features": len(feature_columns),
-                "active_features": len(active_symptoms)
-            }
-        }
-        
-        print(f"🎉 ML prediction complete: {primary_specialist} (confidence: {response['confidence']:.3f})")
-        return response
-        
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in ML prediction: {e}")
+        log.error("❌ Error in ML batch prediction: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-def prepare_ml_input(active_symptoms):
-    """Prepare input data for ML models"""
-    # Create input vector with all features set to 0
-    input_data = pd.DataFrame([[0] * len(feature_columns)], columns=feature_columns)
-    
-    # Set active symptoms to 1
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the /predict response cache"""
+    return response_cache.stats()
+
+@app.get("/pool-stats")
+async def get_pool_stats():
+    """Inference pool size, in-flight jobs and 503 rejections"""
+    return inference_pool.stats()
+
+@app.get("/rules-stats")
+async def get_rules_stats():
+    """Active rule version and reload metrics"""
+    return rule_store.stats()
+
+@app.post("/admin/reload-rules")
+async def reload_rules(x_admin_token: Optional[str] = Header(None)):
+    """Recompile the rule file in the background and swap it in"""
+    check_admin_token(x_admin_token)
+    loaded = await asyncio.get_running_loop().run_in_executor(None, rule_store.reload)
+    return {"reloaded": loaded, **rule_store.stats()}
+
+def clean_ml_symptoms(active_symptoms):
+    """Clean symptom names to match training data format"""
+    clean_symptoms = []
     for symptom in active_symptoms:
-        # Clean symptom name to match training data format
-        clean_symptom = symptom.lower().replace(' ', '_').replace(',', '').strip()
-        
-        if clean_symptom in feature_columns:
-            input_data[clean_symptom] = 1
-            print(f"✅ Mapped symptom: {symptom} -> {clean_symptom}")
-        else:
-            print(f"⚠️ Symptom not in training data: {symptom}")
-    
-    return input_data
+        clean_symptom = normalizer.get(symptom)
 
-def get_disease_predictions(input_data):
-    """Get disease predictions with probabilities"""
-    # Get prediction probabilities
-    probabilities = disease_model.predict_proba(input_data)[0]
-    classes = disease_model.classes_
-    
-    # Get top 5 predictions
-    top_indices = probabilities.argsort()[-5:][::-1]
-    
-    predictions = []
-    for idx in top_indices:
-        if probabilities[idx] > 0.01:  # Only include predictions with >1% probability
-            predictions.append({
-                'disease': classes[idx],
-                'probability': float(probabilities[idx])
-            })
-    
-    return predictions
-
-def get_specialist_predictions(input_data):
-    """Get specialist predictions with probabilities"""
-    # Get prediction probabilities
-    probabilities = specialist_model.predict_proba(input_data)[0]
-    classes = specialist_model.classes_
-    
-    # Get top 3 predictions
-    top_indices = probabilities.argsort()[-3:][::-1]
-    
-    predictions = []
-    for idx in top_indices:
-        if probabilities[idx] > 0.05:  # Only include predictions with >5% probability
-            predictions.append({
-                'specialist': classes[idx],
-                'probability': float(probabilities[idx])
-            })
-    
-    return predictions
+        if clean_symptom is not None:
+            clean_symptoms.append(clean_symptom)
+            log.debug("✅ Mapped symptom: %s -> %s", symptom, clean_symptom)
+        else:
+            log.debug("⚠️ Symptom not in training data: %s", symptom)
+    return clean_symptoms
 
-def get_rule_based_diagnoses(active_symptoms):
+def get_rule_based_diagnoses(active_symptoms, rules):
     """Get disease predictions using high-quality rule-based system"""
-    print(f"🔍 Rule-based analysis for symptoms: {active_symptoms}")
+    log.debug("🔍 Rule-based analysis for symptoms: %s", active_symptoms)
 
-    # Find all matching patterns
+    # Every rule whose symptom set is contained in the active symptoms, found
+    # through the subset index (cost follows the rules, not the 2^n subsets)
     matches = []
-
-    # Check all possible combinations of symptoms (2, 3, 4+ symptoms)
-    for pattern_length in range(2, len(active_symptoms) + 1):
-        for symptom_combo in combinations(active_symptoms, pattern_length):
-            # Try different orderings of the same symptoms
-            sorted_combo = tuple(sorted(symptom_combo))
-
-            if sorted_combo in MULTI_SYMPTOM_DISEASE_MAPPING:
-                rule = MULTI_SYMPTOM_DISEASE_MAPPING[sorted_combo]
-                matches.append({
-                    'disease': rule['disease'],
-                    'confidence': rule['confidence'],
-                    'matching_symptoms': list(symptom_combo),
-                    'pattern_length': pattern_length
-                })
-                print(f"✅ Rule match: {symptom_combo} -> {rule['disease']} ({rule['confidence']:.1%})")
+    for key, rule in rules.matcher.match(active_symptoms, min_size=2):
+        rule_symptoms = set(key)
+        matching_symptoms = [s for s in dict.fromkeys(active_symptoms) if s in rule_symptoms]
+        matches.append({
+            'disease': rule['disease'],
+            'confidence': rule['confidence'],
+            'matching_symptoms': matching_symptoms,
+            'pattern_length': len(matching_symptoms)
+        })
+        log.debug("✅ Rule match: %s -> %s (%.1f%%)", key, rule['disease'], rule['confidence'] * 100)
 
     # Sort by pattern length (more symptoms = better match) then by confidence
     matches.sort(key=lambda x: (x['pattern_length'], x['confidence']), reverse=True)
@@ -235,45 +334,20 @@ def get_rule_based_diagnoses(active_symptoms):
             unique_matches.append(match)
             seen_diseases.add(match['disease'])
 
-    print(f"🎯 Found {len(unique_matches)} unique rule-based matches")
+    log.debug("🎯 Found %d unique rule-based matches", len(unique_matches))
     return unique_matches[:3]  # Return top 3
 
-def create_hybrid_diagnoses(rule_based_matches, specialist_predictions, active_symptoms):
+def create_hybrid_diagnoses(rule_based_matches, predictions, active_symptoms, rules):
     """Create diagnoses using rule-based diseases + ML specialists"""
     diagnoses = []
-
-    # Disease-to-specialist mapping for better specialist selection
-    disease_specialist_map = {
-        'Common Cold': 'General Practitioner',
-        'Pneumonia': 'Pulmonologist',
-        'Bronchitis': 'Pulmonologist',
-        'Bronchial Asthma': 'Pulmonologist',
-        'Heart attack': 'Cardiologist',
-        'Arrhythmia': 'Cardiologist',
-        'Gastroenteritis': 'Gastroenterologist',
-        'GERD': 'Gastroenterologist',
-        'Food Poisoning': 'Gastroenterologist',
-        'Migraine': 'Neurologist',
-        'Concussion': 'Neurologist',
-        'Meningitis': 'Neurologist',
-        'Malaria': 'Internal Medicine',
-        'Dengue': 'Internal Medicine',
-        'Tuberculosis': 'Pulmonologist',
-        'Fungal infection': 'Dermatologist',
-        'Chicken pox': 'Dermatologist',
-        'Scarlet Fever': 'Dermatologist',
-        'Arthritis': 'Rheumatologist',
-        'Diabetes': 'Endocrinologist',
-        'Hypothyroidism': 'Endocrinologist',
-        'Hyperthyroidism': 'Endocrinologist'
-    }
+    specialist_predictions = predictions.specialists
 
     for match in rule_based_matches:
         disease = match['disease']
         rule_confidence = match['confidence']
 
         # Get best specialist from ML or mapping
-        best_specialist = disease_specialist_map.get(disease, "General Practitioner")
+        best_specialist = rules.hybrid_specialists.get(disease, "General Practitioner")
         specialist_confidence = 0.8  # Default high confidence for mapped specialists
 
         # Try to use ML specialist prediction if available and confident
@@ -300,42 +374,47 @@ def create_hybrid_diagnoses(rule_based_matches, specialist_predictions, active_s
         }
 
         diagnoses.append(diagnosis)
-        print(f"🎯 Hybrid diagnosis: {disease} ({rule_confidence:.1%}) -> {best_specialist}")
+        log.debug("🎯 Hybrid diagnosis: %s (%.1f%%) -> %s", disease, rule_confidence * 100, best_specialist)
 
     return diagnoses
 
-def create_ml_diagnoses(disease_predictions, specialist_predictions, active_symptoms):
+def symptom_pair_in(active_symptoms, table):
+    """
+    The first pair of active symptoms that is a key of table, or None.
+
+    Every pair is tried, each as a sorted tuple and in sorted order, so the
+    result depends only on the symptom set, not on the order it was given in.
+    """
+    for pair in combinations(sorted(set(active_symptoms)), 2):
+        if pair in table:
+            return pair
+    return None
+
+def create_ml_diagnoses(predictions, active_symptoms, rules):
     """Create diagnoses by combining disease and specialist predictions"""
     diagnoses = []
+    disease_predictions = predictions.diseases
+    specialist_predictions = predictions.specialists
 
     # Check if we need confidence boosting (ML predictions too low)
     max_disease_prob = max([pred['probability'] for pred in disease_predictions]) if disease_predictions else 0
     needs_boost = max_disease_prob < 0.10  # Boost if highest prediction < 10%
 
     if needs_boost:
-        print(f"⚠️ Applying confidence boost - ML max confidence: {max_disease_prob:.1%}")
-
-        # Confidence boost patterns for common symptom combinations
-        boost_patterns = {
-            ('skin_rash', 'itching'): {'Fungal infection': 0.75, 'Allergy': 0.65, 'Psoriasis': 0.55},
-            ('cough', 'fever'): {'Common Cold': 0.80, 'Pneumonia': 0.60, 'Tuberculosis': 0.40},
-            ('headache', 'dizziness'): {'Migraine': 0.70, 'Hypertension': 0.60, 'Hypoglycemia': 0.50},
-            ('stomach_pain', 'nausea'): {'Gastroenteritis': 0.75, 'Peptic ulcer diseae': 0.60, 'GERD': 0.55},
-            ('headache', 'high_fever'): {'Malaria': 0.70, 'Dengue': 0.60, 'Typhoid': 0.55},
-            ('stomach_pain', 'high_fever'): {'Gastroenteritis': 0.80, 'Typhoid': 0.65, 'Malaria': 0.50}
-        }
+        log.debug("⚠️ Applying confidence boost - ML max confidence: %.1f%%", max_disease_prob * 100)
+
 
-        # Find matching pattern
-        symptom_key = tuple(sorted(active_symptoms[:2]))  # Use first 2 symptoms
-        if symptom_key in boost_patterns:
-            print(f"✅ Found boost pattern for: {symptom_key}")
-            boost_diseases = boost_patterns[symptom_key]
+        # Find matching pattern (boost patterns come from the rule file)
+        symptom_key = symptom_pair_in(active_symptoms, rules.boost_patterns)
+        if symptom_key is not None:
+            log.debug("✅ Found boost pattern for: %s", symptom_key)
+            boost_diseases = rules.boost_patterns[symptom_key]
 
             # Apply boosts to matching diseases
             for disease_pred in disease_predictions[:3]:
                 if disease_pred['disease'] in boost_diseases:
                     disease_pred['probability'] = boost_diseases[disease_pred['disease']]
-                    print(f"🚀 Boosted {disease_pred['disease']} to {disease_pred['probability']:.1%}")
+                    log.debug("🚀 Boosted %s to %.1f%%", disease_pred['disease'], disease_pred['probability'] * 100)
 
     # Primary approach: Use disease predictions and map to specialists
     for disease_pred in disease_predictions[:3]:  # Top 3 diseases
@@ -375,38 +454,23 @@ def create_ml_diagnoses(disease_predictions, specialist_predictions, active_symp
     
     # If no good disease predictions, use specialist predictions directly
     if not diagnoses:
-        # FIXED: Use real diseases instead of "Condition requiring..."
-        disease_map = {
-            ('itching', 'skin_rash'): 'Eczema',
-            ('skin_rash', 'itching'): 'Eczema',
-            ('cough', 'fever'): 'Common Cold',
-            ('fever', 'cough'): 'Common Cold',
-            ('headache', 'fever'): 'Viral Infection',
-            ('fever', 'headache'): 'Viral Infection',
-            ('headache', 'dizziness'): 'Migraine',
-            ('dizziness', 'headache'): 'Migraine',
-            ('headache', 'visual_disturbances'): 'Migraine',
-            ('visual_disturbances', 'headache'): 'Migraine',
-            ('stomach_pain', 'nausea'): 'Gastroenteritis',
-            ('nausea', 'stomach_pain'): 'Gastroenteritis'
-        }
-
+        # FIXED: Use real diseases instead of "Condition requiring..." (pairs from rules.fallback_diseases)
         for i, spec_pred in enumerate(specialist_predictions[:2]):
             specialist = spec_pred['specialist']
             spec_prob = spec_pred['probability']
 
             # Try to find real disease for primary diagnosis
             real_disease = None
-            if i == 0 and len(active_symptoms) >= 2:
-                symptom_pair = (active_symptoms[0], active_symptoms[1])
-                real_disease = disease_map.get(symptom_pair)
-                print(f"🔍 Checking symptoms {symptom_pair} -> {real_disease}")
+            if i == 0:
+                symptom_pair = symptom_pair_in(active_symptoms, rules.fallback_diseases)
+                real_disease = rules.fallback_diseases.get(symptom_pair)
+                log.debug("🔍 Checking symptoms %s -> %s", symptom_pair, real_disease)
 
             if real_disease:
                 disease_name = real_disease
                 confidence = 0.75
                 explanation = f"Based on your symptoms, {real_disease} is likely. Recommended specialist: {specialist}"
-                print(f"✅ Using real disease: {real_disease}")
+                log.debug("✅ Using real disease: %s", real_disease)
             else:
                 disease_name = f"Condition requiring {specialist} consultation"
                 confidence = spec_prob
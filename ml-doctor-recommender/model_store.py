@@ -0,0 +1,156 @@
+"""
+Memory-mapped model loading shared across uvicorn workers
+
+A plain joblib.load gives every worker process its own private copy of every
+model array. load_model instead keeps an uncompressed joblib copy of each model
+(MODEL_MMAP_DIR, one file per source name + mtime + size) and opens it with
+mmap_mode='r': the numpy arrays inside the estimators become read-only views
+of the same file, so the OS page cache backs them once for all workers. Only
+the small Python object shells are per-worker.
+
+scikit-learn's tree estimators are the exception: Tree.__setstate__ copies
+the node and value arrays into its own buffer, so a memory-mapped
+DecisionTree/RandomForest still ends up with private node storage.
+load_compiled_model avoids that by caching the tree_compiler version of the
+model instead, whose flat node arrays are used straight from the mapping.
+benchmark_model_memory.py shows the difference per worker.
+
+The copy is written on first use, atomically, so workers starting together
+either see a complete file or write their own and rename over it. Copies of
+earlier versions of the same model are deleted when a new one is written.
+Loading a copy unpickles it, so it is only used when this user owns both the
+directory and the file and neither is group/world-writable. If anything goes
+wrong the model is loaded the old way.
+"""
+
+import os
+import re
+import stat
+import tempfile
+
+import joblib
+
+from request_logging import get_logger
+from tree_compiler import COMPILED_FORMAT, COMPILED_TREES_ENABLED, compile_if_supported
+
+MMAP_DIR = os.environ.get(
+    "MODEL_MMAP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache"))
+
+# MODEL_MMAP=0 restores plain private joblib.load
+MMAP_ENABLED = os.environ.get("MODEL_MMAP", "1") != "0"
+
+log = get_logger("models")
+
+
+def mmap_path(path):
+    """Location of the uncompressed copy for the current version of a model file"""
+    stat_result = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(MMAP_DIR, f"{name}-{stat_result.st_mtime_ns}-{stat_result.st_size}.joblib")
+
+
+def compiled_path(path):
+    """Location of the compiled copy for the current version of a model file"""
+    return mmap_path(path)[:-len(".joblib")] + f".compiled{COMPILED_FORMAT}.joblib"
+
+
+def check_private(path, directory=False):
+    """Raise PermissionError unless path is ours and only we can write it (it is about to be unpickled)"""
+    info = os.stat(path) if directory else os.lstat(path)
+    if not (stat.S_ISDIR(info.st_mode) if directory else stat.S_ISREG(info.st_mode)):
+        raise PermissionError(f"{path} is not a {'directory' if directory else 'regular file'}")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by uid {info.st_uid}, not {os.getuid()}")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by other users (mode {stat.S_IMODE(info.st_mode):o})")
+
+
+def _dump_atomic(obj, target):
+    """Uncompressed joblib.dump to a temp file renamed over target"""
+    fd, tmp = tempfile.mkstemp(dir=MMAP_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp, compress=0)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _remove_stale(path):
+    """Delete copies of earlier versions (or compiled formats) of the same model file"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    pattern = re.compile(re.escape(name) + r"-\d+-\d+(\.compiled\d+)?\.joblib")
+    current = {os.path.basename(mmap_path(path)), os.path.basename(compiled_path(path))}
+    for entry in os.listdir(MMAP_DIR):
+        if pattern.fullmatch(entry) and entry not in current:
+            try:
+                os.remove(os.path.join(MMAP_DIR, entry))
+            except OSError:
+                pass
+
+
+def _export(path, target, convert):
+    """Write convert(model) to target unless a private copy is already there; returns target"""
+    os.makedirs(MMAP_DIR, mode=0o700, exist_ok=True)
+    check_private(MMAP_DIR, directory=True)
+    if not os.path.lexists(target):
+        _dump_atomic(convert(joblib.load(path)), target)
+        _remove_stale(path)
+        log.info("Wrote mmap copy of %s to %s", path, target)
+    check_private(target)
+    return target
+
+
+def export_mmap_copy(path):
+    """Write the uncompressed, mmap-friendly copy of a model if it is missing; returns its path"""
+    return _export(path, mmap_path(path), lambda model: model)
+
+
+def export_compiled_copy(path):
+    """Like export_mmap_copy, but of the flat-array compiled model (or the model if it cannot compile)"""
+    return _export(path, compiled_path(path), compile_if_supported)
+
+
+def load_model(path, mmap=None):
+    """joblib.load with the estimator arrays memory-mapped read-only when possible"""
+    if mmap is None:
+        mmap = MMAP_ENABLED
+    if mmap:
+        try:
+            return joblib.load(export_mmap_copy(path), mmap_mode="r")
+        except Exception as e:
+            log.warning("mmap load of %s failed, loading privately: %s", path, e)
+    return joblib.load(path)
+
+
+def load_compiled_model(path, mmap=None):
+    """load_model for the services: tree classifiers come back as tree_compiler.CompiledEnsemble"""
+    if not COMPILED_TREES_ENABLED:
+        return load_model(path, mmap)
+    if mmap is None:
+        mmap = MMAP_ENABLED
+    if mmap:
+        try:
+            return joblib.load(export_compiled_copy(path), mmap_mode="r")
+        except Exception as e:
+            log.warning("mmap load of compiled %s failed, compiling privately: %s", path, e)
+    return compile_if_supported(joblib.load(path))
+
+
+def memory_usage():
+    """Resident and proportional set size of this process in MB (Linux /proc; RSS only elsewhere)"""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty"):
+                    usage[field.lower()] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss"] = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return usage
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
-import joblib
-import pandas as pd
+from inference_pool import InferencePool
+from warmup import Readiness
+from model_store import load_compiled_model
 import pickle
 from typing import List, Dict, Any
 
@@ -9,13 +10,22 @@ from typing import List, Dict, Any
 from multi_symptom_mapper import get_multi_symptom_recommendations
 
 # Import the disease-to-specialist mapping from content_api
-from content_api import disease_to_specialist_mapping, get_specialist_recommendation
+from content_api import get_specialist_recommendation
+from rule_store import rule_store
+from feature_encoder import FeatureEncoder
+from symptom_aliases import SymptomNormalizer
 
 app = FastAPI()
 
+# CPU-bound inference runs here (INFERENCE_WORKERS / INFERENCE_QUEUE_DEPTH)
+inference_pool = InferencePool()
+
+# /ready answers 503 until startup warmup has run (WARMUP_PASSES)
+readiness = Readiness("multi_symptom_api")
+
 # Load the trained ML model
 try:
-    model = joblib.load("content_model_SIMPLE_HIGH_CONFIDENCE.pkl")
+    model = load_compiled_model("content_model_SIMPLE_HIGH_CONFIDENCE.pkl")
     # Load the feature columns
     with open('feature_columns_SIMPLE_HIGH_CONFIDENCE.pkl', 'rb') as f:
         feature_columns = pickle.load(f)
@@ -23,7 +33,7 @@ try:
 except Exception as e:
     print(f"Error loading SIMPLE_HIGH_CONFIDENCE model: {e}")
     try:
-        model = joblib.load("content_model_specialist_fixed.pkl")
+        model = load_compiled_model("content_model_specialist_fixed.pkl")
         # Load the feature columns
         with open('feature_columns.pkl', 'rb') as f:
             feature_columns = pickle.load(f)
@@ -33,6 +43,9 @@ except Exception as e:
         model = None
         feature_columns = []
 
+encoder = FeatureEncoder(feature_columns)
+normalizer = SymptomNormalizer(feature_columns)
+
 class SymptomRequest(BaseModel):
     symptoms: dict
 
@@ -40,8 +53,8 @@ class SymptomRequest(BaseModel):
 async def root():
     return {"message": "Multi-Symptom Recommendation API Running"}
 
-@app.post("/predict")
-async def predict_specialist(request: SymptomRequest):
+def run_prediction(request):
+    """Synchronous prediction pipeline, executed on the inference pool"""
     try:
         symptoms = request.symptoms
         print(f"FastAPI received symptoms: {symptoms}")
@@ -58,22 +71,19 @@ async def predict_specialist(request: SymptomRequest):
             }
         
         # Step 1: Get multi-symptom based recommendations
-        multi_symptom_diagnoses = get_multi_symptom_recommendations(active_symptoms, disease_to_specialist_mapping)
+        multi_symptom_diagnoses = get_multi_symptom_recommendations(
+            active_symptoms, rule_store.current.specialist_recommendations)
         
         # Step 2: If we have a model, also get ML-based recommendations
         ml_diagnoses = []
         if model is not None and feature_columns:
             # Prepare input for the ML model
-            input_data = pd.DataFrame([[0] * len(feature_columns)], columns=feature_columns)
-            
-            for symptom in active_symptoms:
-                if symptom in feature_columns:
-                    input_data[symptom] = 1
+            estimator, input_data = encoder.model_input(model, encoder.encode(normalizer.normalize(active_symptoms)))
             
             # Get ML predictions
             try:
                 # Predict probabilities for all diseases
-                proba = model.predict_proba(input_data)[0]
+                proba = estimator.predict_proba(input_data)[0]
                 classes = model.classes_
                 # Get top 3 specialists with highest probability
                 top_indices = proba.argsort()[-3:][::-1]
@@ -172,6 +182,23 @@ async def predict_specialist(request: SymptomRequest):
         print(f"Error in prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict")
+async def predict_specialist(request: SymptomRequest):
+    # Model inference runs on the inference pool, not the event loop
+    return await inference_pool.run(run_prediction, request)
+
+@app.on_event("startup")
+async def startup_event():
+    """Warm the model and mapper before reporting ready"""
+    readiness.start(lambda active_symptoms: run_prediction(
+        SymptomRequest(symptoms={symptom: True for symptom in active_symptoms})),
+        fallback_mode=model is None)
+
+@app.get("/ready")
+async def get_ready(response: Response):
+    """503 until warmup has finished; warmup time and fallback mode"""
+    return readiness.respond(response)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8002)
\ No newline at end of file
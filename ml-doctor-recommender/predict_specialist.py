@@ -1,13 +1,12 @@
 import pandas as pd
 import joblib
+from dataset_cache import dataset_columns
 
 # Load model
 model = joblib.load("content_model.pkl")
 
-# Load column structure
-df = pd.read_excel("Specialist.xlsx")
-df = df.drop(columns=["Unnamed: 0"], errors="ignore")
-columns = df.columns[:-1]  # All symptom columns
+# Load column structure (names only, from the dataset cache)
+columns = [col for col in dataset_columns("Specialist.xlsx") if col != "Unnamed: 0"][:-1]  # All symptom columns
 
 # User symptoms (EXAMPLE)
 input_symptoms = ["itching", "skin rash", "red spots"]
@@ -1,11 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 import uvicorn
 from multi_symptom_mapper import get_multi_symptom_recommendations
-from content_api import disease_to_specialist_mapping
+from rule_store import rule_store
+from warmup import Readiness
 
 app = FastAPI()
 
+# /ready answers 503 until startup warmup has run (WARMUP_PASSES)
+readiness = Readiness("pure_multi_symptom_api")
+
 class SymptomRequest(BaseModel):
     symptoms: dict
 
@@ -13,6 +17,17 @@ class SymptomRequest(BaseModel):
 async def root():
     return {"message": "Pure Multi-Symptom Recommendation API Running"}
 
+@app.on_event("startup")
+async def startup_event():
+    """Warm the rule mapper before reporting ready"""
+    readiness.start(lambda active_symptoms: get_multi_symptom_recommendations(
+        active_symptoms, rule_store.current.specialist_recommendations))
+
+@app.get("/ready")
+async def get_ready(response: Response):
+    """503 until warmup has finished; warmup time"""
+    return readiness.respond(response)
+
 @app.post("/predict")
 async def predict_specialist(request: SymptomRequest):
     try:
@@ -37,7 +52,8 @@ async def predict_specialist(request: SymptomRequest):
             }
         
         # Use multi-symptom mapper to get disease and specialist recommendations
-        multi_symptom_diagnoses = get_multi_symptom_recommendations(active_symptoms, disease_to_specialist_mapping)
+        multi_symptom_diagnoses = get_multi_symptom_recommendations(
+            active_symptoms, rule_store.current.specialist_recommendations)
         
         print(f"Multi-symptom diagnoses: {multi_symptom_diagnoses}")
         
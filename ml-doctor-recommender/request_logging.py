@@ -0,0 +1,71 @@
+"""
+Leveled, sampled logging for the /predict hot path
+
+Replaces per-request print() tracing. Messages use %-style arguments, so
+nothing is formatted unless a record is actually emitted. The default level
+(PREDICT_LOG_LEVEL, WARNING) keeps the hot path silent. A request is traced
+in full at DEBUG when it carries an "X-Debug-Trace: 1" header or is picked by
+PREDICT_LOG_SAMPLE_RATE (fraction of requests, default 0).
+"""
+
+import logging
+import os
+import random
+from contextvars import ContextVar
+
+_traced = ContextVar("predict_trace", default=False)
+
+LOG_LEVEL = os.environ.get("PREDICT_LOG_LEVEL", "WARNING").upper()
+SAMPLE_RATE = float(os.environ.get("PREDICT_LOG_SAMPLE_RATE", "0"))
+TRACE_HEADER = "X-Debug-Trace"
+
+
+def start_request(debug_header=None):
+    """Decide once per request whether it gets a full DEBUG trace"""
+    traced = (debug_header or "").strip().lower() in ("1", "true", "yes") or (
+        SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE)
+    _traced.set(traced)
+    return traced
+
+
+def is_traced():
+    return _traced.get()
+
+
+class PredictLogger:
+    """Thin wrapper over logging.Logger that also emits for traced requests"""
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(name)
+
+    def _log(self, level, msg, args, exc_info=None):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args, exc_info=exc_info)
+        elif _traced.get():
+            # Bypass the logger level for this request only
+            self.logger.handle(self.logger.makeRecord(
+                self.logger.name, level, "(trace)", 0, msg, args, exc_info))
+
+    def debug(self, msg, *args):
+        self._log(logging.DEBUG, msg, args)
+
+    def info(self, msg, *args):
+        self._log(logging.INFO, msg, args)
+
+    def warning(self, msg, *args):
+        self._log(logging.WARNING, msg, args)
+
+    def error(self, msg, *args, exc_info=None):
+        self._log(logging.ERROR, msg, args, exc_info)
+
+
+def get_logger(name):
+    """Logger under the shared "predict" hierarchy, configured on first use"""
+    root = logging.getLogger("predict")
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+    return PredictLogger(f"predict.{name}")
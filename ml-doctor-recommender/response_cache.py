@@ -0,0 +1,119 @@
+"""
+In-process LRU cache for /predict responses
+
+The services diagnose canonical_symptoms(active symptoms), the set in sorted
+order, so a response depends only on the symptom set; entries are keyed on
+that sorted tuple and every ordering of a set shares one entry. Callers put
+the request's own active_symptoms back into what they return.
+
+The cache also tracks the (model version, rule-set version) it was filled
+under: the first lookup made with a different version drops every entry, so
+reloading models or MULTI_SYMPTOM_DISEASE_MAPPING invalidates it automatically.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_symptoms(symptoms):
+    """The order a symptom set is diagnosed in: sorted, without repeats"""
+    return sorted(set(symptoms))
+
+
+def file_version(path):
+    """Version token for a model artifact: file name plus modification time"""
+    try:
+        return f"{os.path.basename(path)}@{os.path.getmtime(path):.0f}"
+    except OSError:
+        return f"{os.path.basename(path)}@missing"
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with optional TTL and hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, prefix="PREDICT_CACHE"):
+        """Build a cache sized by <prefix>_SIZE and <prefix>_TTL (seconds, 0 = no TTL)"""
+        maxsize = int(os.environ.get(f"{prefix}_SIZE", "1024"))
+        ttl = float(os.environ.get(f"{prefix}_TTL", "0"))
+        return cls(maxsize=maxsize, ttl=ttl)
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, symptoms, version):
+        """Return the cached response for this symptom set, or None"""
+        key = tuple(canonical_symptoms(symptoms))
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, symptoms, version, value):
+        """Store a response, evicting the least recently used entries if full"""
+        if self.maxsize <= 0:
+            return
+        key = tuple(canonical_symptoms(symptoms))
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for the /cache-stats endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "version": list(self.version) if isinstance(self.version, tuple) else self.version
+            }
@@ -6,9 +6,10 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 import joblib
+from dataset_cache import load_dataset
 
 # === STEP 1: Load and Prepare Data ===
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 df = df.drop(columns=["Unnamed: 0"], errors="ignore")
 df.columns = df.columns.str.strip()  # Clean column names
 
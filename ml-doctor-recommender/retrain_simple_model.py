@@ -1,12 +1,12 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 import numpy as np
+from dataset_cache import load_dataset
 
 # Load the training data
-df = pd.read_excel("Specialist_clean_clinical.xlsx")
+df = load_dataset("Specialist_clean_clinical.xlsx")
 
 # Features and label
 X = df.drop(columns=["Specialist"])
@@ -4,9 +4,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 from sklearn.utils import resample
 import joblib
+from dataset_cache import load_dataset
 
 # Load the corrected data
-df = pd.read_excel("Specialist_fixed.xlsx")
+df = load_dataset("Specialist_fixed.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 
@@ -0,0 +1,152 @@
+"""
+Subset-index matcher for symptom-combination -> disease rule tables
+
+Instead of walking every combinations(symptoms, k) and probing the mapping,
+each rule is compiled into a bitmask over a shared symptom vocabulary and
+filed under a single "anchor" symptom (its rarest one). A lookup only visits
+the rules anchored on an active symptom and keeps the ones whose mask is a
+subset of the active mask, so the cost follows the number of candidate rules
+rather than the number of symptom subsets.
+"""
+
+from collections import defaultdict
+from types import MappingProxyType
+
+
+def canonicalize_rules(mapping):
+    """
+    Drop permutation keys that repeat an earlier rule for the same symptom
+    set, disease and confidence, and freeze each rule's info dict.
+    """
+    seen = set()
+    rules = {}
+    for key, info in mapping.items():
+        signature = (frozenset(key), info["disease"], info["confidence"])
+        if signature in seen:
+            continue
+        seen.add(signature)
+        rules[key] = MappingProxyType(dict(info))
+    return rules
+
+
+class CompiledRules:
+    """
+    Rule table keyed by canonical symptom sets, one probe per lookup.
+
+    Permutations of the same symptoms collapse into one entry. When they name
+    different diseases the entry keeps all of them, ranked by confidence, and
+    the collision is recorded in conflicts instead of one key silently winning.
+    """
+
+    def __init__(self, mapping):
+        merged = {}
+        self.keys = {}            # symptom set -> the tuple it first appeared as
+        for key, info in mapping.items():
+            self.keys.setdefault(frozenset(key), tuple(key))
+            diseases = merged.setdefault(frozenset(key), {})
+            current = diseases.get(info["disease"])
+            if current is None or info["confidence"] > current["confidence"]:
+                diseases[info["disease"]] = info
+
+        self.entries = {}
+        self.conflicts = []       # (symptom set, [diseases best first])
+        for symptoms, diseases in merged.items():
+            ranked = sorted(diseases.values(), key=lambda info: -info["confidence"])
+            self.entries[symptoms] = tuple(MappingProxyType(dict(info)) for info in ranked)
+            if len(ranked) > 1:
+                self.conflicts.append((symptoms, [info["disease"] for info in ranked]))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, symptoms):
+        return frozenset(symptoms) in self.entries
+
+    def lookup(self, symptoms):
+        """Ranked disease infos for exactly this symptom set, or ()"""
+        return self.entries.get(frozenset(symptoms), ())
+
+    def items(self):
+        """
+        (key, info) for every disease of every entry: entries in order of first
+        appearance, each entry's diseases best first. RuleMatcher indexes this.
+        """
+        for symptoms, ranked in self.entries.items():
+            for info in ranked:
+                yield self.keys[symptoms], info
+
+
+class RuleMatcher:
+    """
+    Compiled subset index over a {symptom_tuple: disease_info} mapping, or over
+    a CompiledRules table (one rule per disease of each merged entry, best first)
+    """
+
+    def __init__(self, mapping):
+        self.symptom_ids = {}
+        self.rules = []           # (key, info, mask, size) in mapping order
+        self.anchored = defaultdict(list)
+        self.postings = defaultdict(list)  # symptom -> ids of every rule containing it
+
+        items = list(mapping.items())
+        frequency = defaultdict(int)
+        for key, _ in items:
+            for symptom in set(key):
+                frequency[symptom] += 1
+
+        for key, info in items:
+            mask = 0
+            for symptom in key:
+                mask |= 1 << self.symptom_ids.setdefault(symptom, len(self.symptom_ids))
+            symptoms = set(key)
+            anchor = min(symptoms, key=lambda s: (frequency[s], self.symptom_ids[s]))
+            self.anchored[anchor].append(len(self.rules))
+            for symptom in symptoms:
+                self.postings[symptom].append(len(self.rules))
+            self.rules.append((key, info, mask, len(symptoms)))
+
+    def match(self, active_symptoms, min_size=1, max_size=None):
+        """
+        Return every rule whose symptom set is contained in active_symptoms.
+
+        Results are (key, info) pairs ordered like the old combinations()
+        walk: largest pattern first, then by the position of the matched
+        symptoms in active_symptoms, then by mapping order (for a CompiledRules
+        table: the diseases of one symptom set best first).
+        """
+        positions = {}
+        active_mask = 0
+        for symptom in active_symptoms:
+            if symptom in positions:
+                continue
+            positions[symptom] = len(positions)
+            symptom_id = self.symptom_ids.get(symptom)
+            if symptom_id is not None:
+                active_mask |= 1 << symptom_id
+
+        found = []
+        for symptom in positions:
+            for rule_id in self.anchored.get(symptom, ()):
+                key, info, mask, size = self.rules[rule_id]
+                if size < min_size or (max_size is not None and size > max_size):
+                    continue
+                if mask & ~active_mask:
+                    continue
+                order = tuple(sorted(positions[s] for s in set(key)))
+                found.append((-size, order, rule_id))
+
+        found.sort()
+        return [self.rules[rule_id][:2] for _, _, rule_id in found]
+
+    def overlap_counts(self, active_symptoms):
+        """
+        Return {rule_id: number of distinct active symptoms in that rule}.
+
+        Only the posting lists of the active symptoms are walked, so rules
+        sharing no symptom with the input are never touched.
+        """
+        counts = defaultdict(int)
+        for symptom in set(active_symptoms):
+            for rule_id in self.postings.get(symptom, ()):
+                counts[rule_id] += 1
+        return counts
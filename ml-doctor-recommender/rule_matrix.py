@@ -0,0 +1,72 @@
+"""
+Dense rules x symptoms matrix for overlap scoring
+
+Each rule of a {symptom_tuple: disease_info} table becomes a 0/1 row over a
+shared symptom vocabulary, with its distinct-symptom count and base confidence
+kept in parallel vectors. The overlap of every rule with a request is then a
+single matrix-vector product instead of two Python sets per rule.
+"""
+
+import numpy as np
+
+
+class RuleMatrix:
+    """Compiled overlap matrix over a {symptom_tuple: disease_info} mapping"""
+
+    def __init__(self, mapping):
+        self.keys = list(mapping)
+        self.diseases = [info["disease"] for info in mapping.values()]
+        self.symptom_ids = {}
+        for key in self.keys:
+            for symptom in key:
+                self.symptom_ids.setdefault(symptom, len(self.symptom_ids))
+
+        self.matrix = np.zeros((len(self.keys), len(self.symptom_ids)), dtype=np.float32)
+        for row, key in enumerate(self.keys):
+            for symptom in key:
+                self.matrix[row, self.symptom_ids[symptom]] = 1
+        self.sizes = self.matrix.sum(axis=1).astype(np.int32)
+        self.confidence = np.array([info["confidence"] for info in mapping.values()], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def active_vector(self, active_symptoms):
+        """0/1 vector of the active symptoms that appear in any rule"""
+        x = np.zeros(len(self.symptom_ids), dtype=np.float32)
+        for symptom in active_symptoms:
+            symptom_id = self.symptom_ids.get(symptom)
+            if symptom_id is not None:
+                x[symptom_id] = 1
+        return x
+
+    def overlap(self, active_symptoms):
+        """Number of distinct active symptoms in each rule"""
+        return (self.matrix @ self.active_vector(active_symptoms)).astype(np.int32)
+
+    def matching_symptoms(self, rule_id, active_symptoms):
+        """Symptoms of one rule that are active, in rule order"""
+        active = set(active_symptoms)
+        return list(dict.fromkeys(s for s in self.keys[rule_id] if s in active))
+
+
+def top_k(scores, k, *tiebreaks):
+    """
+    Indices of the k best rows, best first.
+
+    Ordered by scores descending, then each tiebreak array descending, then
+    by row index, i.e. the order a stable sort of the whole table would give.
+    argpartition narrows the candidates to rows scoring at least the k-th
+    best value before the exact sort.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+    # np.lexsort sorts by the last key first
+    sort_keys = [candidates] + [-t[candidates] for t in reversed(tiebreaks)] + [-scores[candidates]]
+    return candidates[np.lexsort(sort_keys)][:k]
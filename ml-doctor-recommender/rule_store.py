@@ -0,0 +1,206 @@
+"""
+Hot-reloadable disease rule store
+
+Disease rules, specialist maps and routing, boost patterns and fallback
+diseases live in a versioned JSON file (rules/disease_rules.json, or
+RULES_PATH). The file is compiled into a RuleSet holding every index the
+services need. Reloads compile a new RuleSet off to the side and then swap
+one reference, so requests already running keep the snapshot they started
+with and nothing is dropped.
+
+A reload is triggered by POST /admin/reload-rules (which needs an
+X-Admin-Token header matching RULES_ADMIN_TOKEN, and is refused while that
+variable is unset) or, when RULES_WATCH_INTERVAL is set (seconds), by a
+background thread polling the file's mtime and size. A file that fails to parse or compile is rejected and
+the previous rules stay active.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import numpy as np
+
+from request_logging import get_logger
+from rule_matcher import CompiledRules, RuleMatcher, canonicalize_rules
+from rule_matrix import RuleMatrix
+
+RULES_PATH = os.environ.get(
+    "RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules", "disease_rules.json"))
+
+ADMIN_TOKEN = os.environ.get("RULES_ADMIN_TOKEN")
+
+log = get_logger("rules")
+
+
+def _rule_table(entries):
+    """[{"symptoms", "disease", "confidence"}] -> {symptom_tuple: info}, later entries win"""
+    return {tuple(rule["symptoms"]): {"disease": rule["disease"], "confidence": rule["confidence"]}
+            for rule in entries}
+
+
+class RuleSet:
+    """One immutable, fully indexed version of the rule file"""
+
+    def __init__(self, data, content_hash):
+        self.label = data.get("version", "unversioned")
+        self.content_hash = content_hash
+        self.version = f"{self.label}@{content_hash}"
+
+        # Base table used by multi_symptom_mapper and ml_multi_symptom_api
+        self.mapping = MappingProxyType({key: MappingProxyType(info)
+                                         for key, info in _rule_table(data["multi_symptom_rules"]).items()})
+        self.tropical_specialists = MappingProxyType(dict(data.get("tropical_specialists", {})))
+        # Permutation keys merged, colliding diseases ranked; the matchers serve these entries
+        self.compiled = CompiledRules(self.mapping)
+        self.matcher = RuleMatcher(self.compiled)
+        self.matrix = RuleMatrix(self.mapping)
+        self.tropical_bonus = np.array([1.05 if disease in self.tropical_specialists else 1.0
+                                        for disease in self.matrix.diseases])
+
+        # content_api's table: base rules plus its extra combinations
+        extended = dict(self.mapping)
+        extended.update(_rule_table(data.get("extended_rules", [])))
+        self.extended_mapping = MappingProxyType(canonicalize_rules(extended))
+        self.extended_compiled = CompiledRules(self.extended_mapping)
+        self.extended_matcher = RuleMatcher(self.extended_compiled)
+
+        self.disease_specialists = MappingProxyType(dict(data.get("disease_specialists", {})))
+        self.specialist_normalization = MappingProxyType(dict(data.get("specialist_normalization", {})))
+        self.hybrid_specialists = MappingProxyType(dict(data.get("hybrid_specialists", {})))
+        # Every rule disease resolved to its specialist up front, so handlers only do lookups
+        self.disease_specialist_table = MappingProxyType({
+            info["disease"]: self.disease_specialists.get(info["disease"], "Internal Medicine")
+            for info in self.extended_mapping.values()
+        })
+        # Keyed by the symptoms as written in the file; create_ml_diagnoses looks up sorted symptom pairs
+        self.boost_patterns = MappingProxyType({
+            tuple(pattern["symptoms"]): MappingProxyType(dict(pattern["diseases"]))
+            for pattern in data.get("boost_patterns", [])
+        })
+        # Symptom pair (sorted) -> disease named when ml_multi_symptom_api only has specialist predictions
+        self.fallback_diseases = MappingProxyType({
+            tuple(sorted(entry["symptoms"])): entry["disease"] for entry in data.get("fallback_diseases", [])
+        })
+        # Disease or specialist title -> {"primary", "secondary", "confidence"} for get_specialist_recommendation
+        self.specialist_recommendations = MappingProxyType({
+            disease: MappingProxyType(dict(info, secondary=tuple(info["secondary"])))
+            for disease, info in data.get("specialist_recommendations", {}).items()
+        })
+
+    @property
+    def conflicts(self):
+        """(symptom set, [diseases best first]) for every set naming several diseases, in either table"""
+        seen = {symptoms for symptoms, _ in self.compiled.conflicts}
+        return self.compiled.conflicts + [conflict for conflict in self.extended_compiled.conflicts
+                                          if conflict[0] not in seen]
+
+
+class RuleStore:
+    """Holds the active RuleSet and swaps in recompiled ones"""
+
+    def __init__(self, path, watch_interval=0):
+        self.path = path
+        self._current = None
+        self._stamp = None
+        self._rejected_stamp = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.failures = 0
+        self.last_error = None
+        self.loaded_at = None
+        self.last_reload_seconds = None
+
+        self.reload()
+        if watch_interval > 0:
+            threading.Thread(target=self._watch, args=(watch_interval,),
+                             name="rule-watcher", daemon=True).start()
+
+    @property
+    def current(self):
+        """The active RuleSet; take it once per request and use that snapshot throughout"""
+        return self._current
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        """Recompile the rule file and swap it in; returns False if it was rejected"""
+        with self._lock:
+            started = time.perf_counter()
+            stamp = None
+            try:
+                stamp = self._file_stamp()
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                rules = RuleSet(json.loads(raw), hashlib.sha1(raw).hexdigest()[:12])
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._rejected_stamp = stamp
+                if self._current is None:
+                    raise
+                log.error("Rejected rule file %s, keeping %s: %s", self.path, self._current.version, self.last_error)
+                return False
+
+            # Single reference assignment: readers see either the old or the new RuleSet
+            self._current = rules
+            self._stamp = stamp
+            self.loads += 1
+            self.last_error = None
+            self.loaded_at = time.time()
+            self.last_reload_seconds = time.perf_counter() - started
+
+        for symptoms, diseases in rules.conflicts:
+            log.warning("Rule conflict for %s: %s", sorted(symptoms), " > ".join(diseases))
+        log.info("Loaded rules %s in %.1f ms", rules.version, self.last_reload_seconds * 1000)
+        return True
+
+    def reload_if_changed(self):
+        """Reload when the file's mtime or size differs from the active (or last rejected) version"""
+        try:
+            if self._file_stamp() in (self._stamp, self._rejected_stamp):
+                return False
+        except OSError as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        return self.reload()
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            self.reload_if_changed()
+
+    def stats(self):
+        """Active version and reload metrics for the /rules-stats endpoint"""
+        rules = self._current
+        return {
+            "version": rules.version,
+            "label": rules.label,
+            "path": self.path,
+            "rules": len(rules.mapping),
+            "extended_rules": len(rules.extended_mapping),
+            "conflicts": len(rules.conflicts),
+            "loads": self.loads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "loaded_at": self.loaded_at,
+            "last_reload_ms": self.last_reload_seconds * 1000
+        }
+
+
+def check_admin_token(token):
+    """Guard for admin endpoints; refuses every request when RULES_ADMIN_TOKEN is unset"""
+    from fastapi import HTTPException
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (RULES_ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+rule_store = RuleStore(RULES_PATH, watch_interval=float(os.environ.get("RULES_WATCH_INTERVAL", "0")))
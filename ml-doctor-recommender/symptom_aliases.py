@@ -0,0 +1,176 @@
+"""
+Shared symptom normalization and alias table
+
+Every service and training script used to clean symptom names its own way
+(lowercasing, stripping commas, severity suffixes, diarrhoea/diarrhea, lay
+terms like "belly pain"). SymptomNormalizer compiles all of those spellings
+for one vocabulary (a model's feature columns, a dataset's symptom columns)
+into a single dict from raw string to interned symptom ID, so a request does
+one lookup per symptom. Strings outside the table are cleaned once and the
+result is memoized.
+
+TrigramIndex is the fuzzy fallback for misspellings: a character-trigram
+inverted index that scores only the names sharing a trigram with the query.
+"""
+
+import heapq
+import re
+import sys
+from collections import defaultdict
+
+SEVERITY_SUFFIXES = ("_severe", "_moderate", "_mild")
+
+# Spellings of the same symptom; the first one wins when a vocabulary has several
+SPELLING_VARIANTS = (
+    ("diarrhea", "diarrhoea"),
+)
+
+# Lay term -> clinical symptom, applied only when the lay term itself is unknown
+SYNONYMS = {
+    "fever": "high_fever",
+    "stomachache": "stomach_pain",
+    "belly_pain": "stomach_pain",
+    "throw_up": "vomiting",
+    "throwup": "vomiting",
+    "bp": "blood_pressure",
+    "heartburn": "acid_reflux",
+}
+
+_PREFERRED_SPELLING = {variant: group[0] for group in SPELLING_VARIANTS for variant in group}
+_UNDERSCORES = re.compile(r"_+")
+
+
+def canonical_form(raw):
+    """The training-data cleaner: trimmed, lowercase, spaces as underscores, no commas"""
+    return str(raw).strip().lower().replace(' ', '_').replace(',', '')
+
+
+def compact_form(raw):
+    """canonical_form with hyphens as underscores and runs of underscores collapsed"""
+    return _UNDERSCORES.sub("_", canonical_form(raw).replace('-', '_')).strip("_")
+
+
+def strip_severity(symptom):
+    """Drop a trailing _severe/_moderate/_mild"""
+    for suffix in SEVERITY_SUFFIXES:
+        if symptom.endswith(suffix):
+            return symptom[:-len(suffix)]
+    return symptom
+
+
+def standardize_symptom(raw):
+    """Vocabulary-free standard name: compact form, preferred spelling, synonyms applied"""
+    symptom = strip_severity(compact_form(raw))
+    symptom = _PREFERRED_SPELLING.get(symptom, symptom)
+    return SYNONYMS.get(symptom, symptom)
+
+
+class SymptomNormalizer:
+    """Compiled raw-string -> symptom-ID table for one vocabulary"""
+
+    def __init__(self, vocabulary, cache_size=4096):
+        self.vocabulary = tuple(sys.intern(str(symptom)) for symptom in vocabulary)
+        self.cache_size = cache_size
+        self._misses = {}
+
+        table = {}
+        # Each vocabulary entry under its own and its cleaned spellings
+        for symptom in self.vocabulary:
+            table[symptom] = symptom
+        for symptom in self.vocabulary:
+            compact = compact_form(symptom)
+            for key in (canonical_form(symptom), compact, compact.replace('_', '')):
+                table.setdefault(key, symptom)
+
+        # All spellings of a symptom resolve to the preferred one present
+        for group in SPELLING_VARIANTS:
+            present = [table[variant] for variant in group if variant in table]
+            if present:
+                for variant in group:
+                    table[variant] = present[0]
+
+        for term, target in SYNONYMS.items():
+            if term not in table and target in table:
+                table[term] = table[target]
+
+        for key, symptom in list(table.items()):
+            for suffix in SEVERITY_SUFFIXES:
+                table.setdefault(key + suffix, symptom)
+
+        self.table = table
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def __contains__(self, raw):
+        return self.get(raw) is not None
+
+    def get(self, raw, default=None):
+        """Symptom ID for a raw string, or default if it is not in the vocabulary"""
+        symptom = self.table.get(raw)
+        if symptom is not None:
+            return symptom
+        if raw in self._misses:
+            symptom = self._misses[raw]
+        else:
+            key = compact_form(raw)
+            symptom = self.table.get(key) or self.table.get(strip_severity(key))
+            if len(self._misses) < self.cache_size:
+                self._misses[raw] = symptom
+        return default if symptom is None else symptom
+
+    def normalize(self, raw_symptoms):
+        """Known symptom IDs for a list of raw strings, in order, without repeats"""
+        seen = []
+        for raw in raw_symptoms:
+            symptom = self.get(raw)
+            if symptom is not None and symptom not in seen:
+                seen.append(symptom)
+        return seen
+
+
+def trigrams(text):
+    """Character trigrams of a compact symptom name, padded so short names still have some"""
+    padded = f"$${compact_form(text)}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Fuzzy name lookup ranked by trigram Jaccard similarity"""
+
+    def __init__(self, names, cache_size=4096):
+        self.names = list(dict.fromkeys(names))
+        self.grams = [trigrams(name) for name in self.names]
+        self.postings = defaultdict(list)
+        for name_id, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(name_id)
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=5, min_score=0.0):
+        """Up to limit (name, score) pairs with score >= min_score, best first"""
+        key = (query, limit, min_score)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for name_id in self.postings.get(gram, ()):
+                shared[name_id] += 1
+
+        scored = []
+        for name_id, common in shared.items():
+            score = common / (len(query_grams) + len(self.grams[name_id]) - common)
+            if score >= min_score:
+                scored.append((score, -name_id))
+        best = tuple((self.names[-neg_id], score) for score, neg_id in heapq.nlargest(limit, scored))
+
+        if len(self._cache) < self.cache_size:
+            self._cache[key] = best
+        return list(best)
@@ -0,0 +1,69 @@
+"""
+Precomputed symptom -> body-system category table
+
+The API's display category and the inference step's symptom groups used to be
+worked out with keyword substring scans on every call. Both are now computed
+once per known symptom when the table is built; symptoms outside the table
+fall back to the same keyword rules, memoized.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+
+# Display category for /available-symptoms: first matching entry wins
+CATEGORY_KEYWORDS = (
+    ("Dermatological", ('skin', 'rash', 'itch', 'red_spots')),
+    ("Respiratory", ('cough', 'breath', 'wheez', 'chest')),
+    ("Gastrointestinal", ('stomach', 'nausea', 'vomit', 'diarr', 'abdom', 'bloat', 'heartburn')),
+    ("Neurological", ('head', 'dizz', 'confus', 'stiff_neck')),
+    ("Dental", ('tooth', 'jaw', 'mouth')),
+    ("Ophthalmological", ('eye', 'vision', 'blurred')),
+    ("ENT", ('ear', 'hearing', 'sore_throat')),
+    ("Musculoskeletal", ('joint', 'back', 'muscle', 'weakness', 'numbness')),
+    ("General", ('fever', 'fatigue', 'chills', 'sweating')),
+)
+
+# Groups used by smart inference: a symptom can belong to several
+INFERENCE_KEYWORDS = (
+    ("skin", ('skin', 'rash', 'itch', 'peel', 'burn', 'blister', 'acne', 'dry')),
+    ("dental", ('tooth', 'dental', 'gum', 'jaw', 'mouth', 'bite')),
+    ("respiratory", ('cough', 'breath', 'wheez', 'chest', 'lung')),
+    ("digestive", ('stomach', 'nausea', 'vomit', 'diarr', 'constip', 'abdom')),
+    ("neurological", ('head', 'dizz', 'migr', 'confus', 'memory')),
+)
+
+
+@lru_cache(maxsize=4096)
+def classify_symptom(symptom):
+    """Keyword rules: return (display category, frozenset of inference groups)"""
+    name = symptom.lower()
+    category = next((category for category, words in CATEGORY_KEYWORDS
+                     if any(word in name for word in words)), "Other")
+    groups = frozenset(group for group, words in INFERENCE_KEYWORDS
+                       if any(word in name for word in words))
+    return category, groups
+
+
+class SymptomCategories:
+    """Frozen category table over a known symptom vocabulary"""
+
+    def __init__(self, symptoms):
+        self.table = MappingProxyType({symptom: classify_symptom(symptom) for symptom in symptoms})
+
+    def lookup(self, symptom):
+        entry = self.table.get(symptom)
+        return entry if entry is not None else classify_symptom(symptom)
+
+    def category(self, symptom):
+        return self.lookup(symptom)[0]
+
+    def groups(self, symptom):
+        return self.lookup(symptom)[1]
+
+    def group_symptoms(self, symptoms):
+        """Split symptoms into {group: [symptoms in input order]}"""
+        grouped = {group: [] for group, _ in INFERENCE_KEYWORDS}
+        for symptom in symptoms:
+            for group in self.groups(symptom):
+                grouped[group].append(symptom)
+        return grouped
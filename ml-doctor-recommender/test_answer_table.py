@@ -0,0 +1,84 @@
+"""
+pytest: answer table keys, versions, counters, and order-independent answers
+"""
+
+import threading
+from itertools import combinations, permutations
+
+import answer_table
+import content_api
+from answer_table import AnswerTable, columns_version, pack_key, table_version, unpack_key, write_table
+from build_answer_table import check_orders
+from rule_store import rule_store
+
+
+def small_table(tmp_path, version="v1"):
+    columns = ["a", "b", "c", "d"]
+    entries = [([0], {"diagnoses": ["A"]}),
+               ([0, 1], {"diagnoses": ["AB"], "active_symptoms": ["a", "b"]}),
+               ([3, 1, 2], {"diagnoses": ["BCD"]})]
+    write_table(str(tmp_path), columns, version, 3, columns, entries)
+    return AnswerTable(str(tmp_path))
+
+
+def test_pack_key_ignores_order():
+    assert pack_key([5, 0, 254]) == pack_key([254, 5, 0])
+    assert unpack_key(pack_key([7, 3, 200])) == [3, 7, 200]
+
+
+def test_lookup_any_order_and_counts(tmp_path):
+    table = small_table(tmp_path)
+    for order in permutations(["b", "c", "d"]):
+        assert table.lookup(list(order), "v1") == {"diagnoses": ["BCD"]}
+    assert table.lookup(["b", "a"], "v1") == {"diagnoses": ["AB"]}
+    assert table.lookup(["a", "e"], "v1") is None
+    assert table.lookup(["a", "b", "c", "d"], "v1") is None
+    assert table.lookup(["a"], "v0") is None
+    stats = table.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (7, 2, 1)
+
+
+def test_counters_are_exact_under_threads(tmp_path):
+    table = small_table(tmp_path)
+
+    def look():
+        for _ in range(2000):
+            table.lookup(["a"], "v1")
+            table.lookup(["z"], "v1")
+
+    threads = [threading.Thread(target=look) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (table.hits, table.misses) == (16000, 16000)
+
+
+def test_version_covers_columns_and_code(monkeypatch):
+    base = table_version("model", "rules", columns_version(["a", "b"]))
+    assert table_version("model", "rules", columns_version(["b", "a"])) != base
+    assert table_version("model", "rules", columns_version(["a", "b", "c"])) != base
+    monkeypatch.setattr(answer_table, "ANSWER_FORMAT", answer_table.ANSWER_FORMAT + 1)
+    assert table_version("model", "rules", columns_version(["a", "b"])) != base
+
+
+def test_stored_answers_match_the_pipeline_in_every_order(tmp_path, monkeypatch):
+    rules = rule_store.current
+    columns = list(content_api.feature_columns)
+    vocabulary = [symptom for symptom in sorted(rules.matcher.symptom_ids) if symptom in content_api.encoder][:8]
+    symptom_sets = [list(symptom_set) for size in (2, 3) for symptom_set in combinations(vocabulary, size)]
+    column_ids = {name: i for i, name in enumerate(columns)}
+    version = table_version(content_api.MODEL_VERSION, rules.version, content_api.FEATURE_COLUMNS_VERSION)
+    entries = [([column_ids[symptom] for symptom in symptom_set], response)
+               for symptom_set, response in zip(symptom_sets, content_api.diagnose_many(symptom_sets, rules))]
+    write_table(str(tmp_path), columns, version, 3, vocabulary, entries)
+    table = AnswerTable(str(tmp_path))
+
+    mismatches, checked = check_orders(table, version, symptom_sets, rules)
+    assert (mismatches, checked) == (0, 28 * 2 + 56 * 6)
+
+    # The service answers from the table for any order of a stored set
+    monkeypatch.setattr(content_api, "answer_table", table)
+    for order in permutations(symptom_sets[-1]):
+        answer = content_api.precomputed_answer(list(order), rules)
+        assert answer == {**table.lookup(symptom_sets[-1], version), "active_symptoms": list(order)}
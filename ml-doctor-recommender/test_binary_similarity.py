@@ -0,0 +1,77 @@
+"""
+pytest: BinaryCases gives the same scores as the per-row float computation
+"""
+
+import numpy as np
+import pytest
+
+import binary_similarity
+from binary_similarity import BinaryCases, pack_rows, popcount
+
+WEIGHTS = (0.2, 0.2, 0.6)
+
+
+@pytest.fixture
+def matrix():
+    # 132 columns: not a multiple of 64, so the last word is padded; row 0 has no symptoms
+    rng = np.random.default_rng(1)
+    matrix = (rng.random((300, 132)) < 0.05).astype(np.uint8)
+    matrix[0] = 0
+    return matrix
+
+
+def float_scores(matrix, columns, weights=WEIGHTS):
+    """The recommenders' original per-row float64 blend"""
+    jaccard_weight, cosine_weight, match_weight = weights
+    user_vector = np.zeros(matrix.shape[1])
+    user_vector[columns] = 1
+    scores = []
+    for row in matrix.astype(np.float64):
+        overlap = row @ user_vector
+        union = row.sum() + user_vector.sum() - overlap
+        cosine = overlap / (np.sqrt(user_vector.sum()) * np.sqrt(max(row.sum(), 1)))
+        scores.append(overlap / union * jaccard_weight + cosine * cosine_weight
+                      + overlap / user_vector.sum() * match_weight)
+    return np.array(scores)
+
+
+def test_popcount_table_matches_bit_count():
+    words = np.array([0, 1, 0xFF, 2 ** 63, 2 ** 64 - 1, 0x0123456789ABCDEF], dtype=np.uint64)
+    expected = [bin(int(word)).count("1") for word in words]
+    assert popcount(words).tolist() == expected
+    table_counts = binary_similarity._POPCOUNT_TABLE[words.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+    assert table_counts.tolist() == expected
+
+
+def test_intersections_and_sizes(matrix):
+    cases = BinaryCases(matrix)
+    assert pack_rows(matrix).shape == (300, 3)
+    assert cases.sizes.tolist() == matrix.sum(axis=1).tolist()
+    columns = [0, 63, 64, 131]
+    assert cases.intersections(columns).tolist() == matrix[:, columns].sum(axis=1).tolist()
+    rows = np.array([5, 0, 299])
+    assert cases.intersections(columns, rows).tolist() == matrix[rows][:, columns].sum(axis=1).tolist()
+
+
+def test_similarities_equal_float_computation(matrix):
+    cases = BinaryCases(matrix)
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        columns = list(rng.choice(132, rng.integers(1, 7), replace=False))
+        expected = float_scores(matrix, columns)
+        assert np.array_equal(cases.similarities(columns, *WEIGHTS), expected)
+        rows = rng.choice(300, 20, replace=False)
+        assert np.array_equal(cases.similarities(columns, *WEIGHTS, rows=rows), expected[rows])
+    # Repeated columns count once
+    assert np.array_equal(cases.similarities([3, 3, 7], *WEIGHTS), cases.similarities([3, 7], *WEIGHTS))
+
+
+def test_batch_equals_one_at_a_time(matrix, monkeypatch):
+    # Force several blocks
+    monkeypatch.setattr(binary_similarity, "BATCH_BLOCK_BYTES", 300 * 8 * 3)
+    cases = BinaryCases(matrix)
+    rng = np.random.default_rng(3)
+    queries = [list(rng.choice(132, rng.integers(1, 7), replace=False)) for _ in range(10)]
+    batch = cases.similarities_many(queries, *WEIGHTS)
+    for query, scores in zip(queries, batch):
+        assert np.array_equal(scores, cases.similarities(query, *WEIGHTS))
@@ -0,0 +1,61 @@
+"""
+pytest: content_api /available-symptoms content negotiation and specialist routing
+"""
+
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+import content_api
+from rule_store import RULES_PATH, RuleSet
+
+client = TestClient(content_api.app)
+
+
+def test_accepts_gzip_honours_q_values():
+    assert content_api.accepts_gzip("gzip, deflate, br")
+    assert content_api.accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert content_api.accepts_gzip("*")
+    assert not content_api.accepts_gzip("gzip;q=0")
+    assert not content_api.accepts_gzip("gzip; q=0.000, deflate")
+    assert not content_api.accepts_gzip("x-gzip")
+    assert not content_api.accepts_gzip("*, gzip;q=0")
+    assert not content_api.accepts_gzip("identity")
+    assert not content_api.accepts_gzip("")
+    assert not content_api.accepts_gzip(None)
+
+
+def test_available_symptoms_is_gzipped_only_when_accepted():
+    plain = client.get("/available-symptoms", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    # httpx decodes gzip transparently; read the raw bytes to see what was sent
+    with client.stream("GET", "/available-symptoms", headers={"Accept-Encoding": "gzip"}) as compressed:
+        raw = b"".join(compressed.iter_raw())
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["vary"] == "Accept-Encoding"
+        assert compressed.headers["etag"] != plain.headers["etag"]
+    assert json.loads(gzip.decompress(raw)) == plain.json()
+
+
+def test_not_modified_keeps_vary():
+    first = client.get("/available-symptoms", headers={"Accept-Encoding": "identity"})
+    again = client.get("/available-symptoms",
+                       headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["vary"] == "Accept-Encoding"
+
+
+def test_specialist_routing_follows_the_rule_file():
+    with open(RULES_PATH) as f:
+        data = json.load(f)
+    data["specialist_recommendations"]["Migraine"] = {
+        "primary": "Headache Clinic", "secondary": ["Neurology"], "confidence": 0.9}
+    edited = RuleSet(data, "test")
+
+    assert content_api.get_specialist_recommendation("Migraine", rules=edited)["primary"] == "Headache Clinic"
+    assert content_api.get_specialist_recommendation("Migraine", 0.5, rules=edited)["confidence"] == 0.45
+    assert content_api.get_specialist_recommendation("Migraine")["primary"] == "Neurology"
+    assert content_api.get_specialist_recommendation("Not A Disease")["primary"] == "General Practitioner"
@@ -1,5 +1,6 @@
 import joblib
 import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the fixed model
 model = joblib.load("content_model_specialist_fixed.pkl")
@@ -19,7 +20,7 @@ informative_symptoms = [
 ]
 
 # Load the corrected data
-df = pd.read_excel("Specialist_fixed.xlsx")
+df = load_dataset("Specialist_fixed.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 feature_columns = [col for col in informative_symptoms if col in df.columns]
@@ -0,0 +1,64 @@
+"""
+pytest: InferencePool caps running + queued jobs and batch sizes
+"""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import content_api
+from inference_pool import InferencePool
+
+request_tag = contextvars.ContextVar("request_tag", default=None)
+
+
+def test_full_pool_returns_503_and_recovers():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(lambda: "too many")
+        assert pool.stats()["in_flight"] == 2
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        return rejected.value, await pool.run(lambda: "after")
+
+    rejected, after = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    assert after == "after"
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_job_sees_the_request_context():
+    pool = InferencePool(max_workers=2, max_queue=0)
+
+    async def scenario():
+        request_tag.set("request-1")
+        return await pool.run(request_tag.get)
+
+    assert asyncio.run(scenario()) == "request-1"
+
+
+def test_oversized_batch_is_413():
+    pool = InferencePool(max_workers=1, max_queue=0, max_batch=3)
+    pool.check_batch([{}] * 3)
+    with pytest.raises(HTTPException) as refused:
+        pool.check_batch([{}] * 4)
+    assert refused.value.status_code == 413
+
+
+def test_batch_endpoint_refuses_oversized_batch(monkeypatch):
+    monkeypatch.setattr(content_api.inference_pool, "max_batch", 2)
+    client = TestClient(content_api.app)
+    response = client.post("/predict/batch", json={"items": [{"headache": True}] * 3})
+    assert response.status_code == 413
+    assert client.post("/predict/batch", json={"items": [{"headache": True}] * 2}).status_code == 200
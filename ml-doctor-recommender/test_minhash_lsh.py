@@ -0,0 +1,78 @@
+"""
+pytest: MinHashLSH returns cases in exact Jaccard order and finds the close ones
+"""
+
+import numpy as np
+import pytest
+
+from minhash_lsh import MinHashLSH
+
+
+@pytest.fixture(scope="module")
+def matrix():
+    # 120 distinct symptom sets of 2-6 symptoms, each repeated 1-4 times, shuffled
+    rng = np.random.default_rng(4)
+    distinct = np.zeros((120, 132), dtype=np.uint8)
+    for row in distinct:
+        row[rng.choice(132, rng.integers(2, 7), replace=False)] = 1
+    matrix = np.repeat(distinct, rng.integers(1, 5, size=120), axis=0)
+    return matrix[rng.permutation(len(matrix))]
+
+
+@pytest.fixture(scope="module")
+def index(matrix):
+    return MinHashLSH(matrix)
+
+
+def exact_jaccard(matrix, columns):
+    query = np.zeros(matrix.shape[1], dtype=bool)
+    query[columns] = True
+    cases = matrix.astype(bool)
+    return (cases & query).sum(axis=1) / (cases | query).sum(axis=1)
+
+
+def test_duplicate_sets_indexed_once(matrix, index):
+    assert len(index) == len(matrix)
+    assert index.n_sets == len(np.unique(matrix, axis=0))
+
+
+def test_results_are_in_exact_jaccard_order(matrix, index):
+    rng = np.random.default_rng(5)
+    for _ in range(100):
+        columns = list(rng.choice(132, rng.integers(1, 5), replace=False))
+        found = index.query(columns, 10)
+        scores = exact_jaccard(matrix, columns)[found]
+        assert len(found) <= 10 and len(set(found.tolist())) == len(found)
+        assert (scores > 0).all()
+        assert (np.diff(scores) <= 0).all()
+
+
+def test_recall_of_the_closest_cases(matrix, index):
+    # Queries taken from a case (all but one of its symptoms): the best exact match should be found
+    rng = np.random.default_rng(6)
+    found_best = 0
+    for case in rng.choice(len(matrix), 100, replace=False):
+        symptoms = np.flatnonzero(matrix[case])
+        columns = list(rng.choice(symptoms, len(symptoms) - 1, replace=False))
+        scores = exact_jaccard(matrix, columns)
+        found = index.query(columns, 5)
+        found_best += len(found) > 0 and scores[found[0]] == scores.max()
+    assert found_best >= 95
+
+
+def test_exact_set_returns_all_its_cases_first(matrix, index):
+    columns = list(np.flatnonzero(matrix[0]))
+    duplicates = np.flatnonzero((matrix == matrix[0]).all(axis=1))
+    found = index.query(columns, len(duplicates))
+    assert sorted(found.tolist()) == duplicates.tolist()
+
+
+def test_empty_query_and_zero_k(index):
+    assert len(index.query([], 5)) == 0
+    assert len(index.query([1, 2], 0)) == 0
+    assert index.query([], 5).dtype == np.intp
+
+
+def test_bands_must_divide_num_perm(matrix):
+    with pytest.raises(ValueError):
+        MinHashLSH(matrix, num_perm=128, bands=48)
@@ -0,0 +1,52 @@
+"""
+pytest: the ML multi-symptom pipeline answers the same for any symptom order
+"""
+
+from itertools import permutations
+
+import ml_multi_symptom_api as api
+from fused_inference import ModelPredictions
+from rule_store import rule_store
+
+
+def low_confidence_predictions():
+    """Model output weak enough for create_ml_diagnoses to look for a boost pattern"""
+    return ModelPredictions(
+        specialists=[{"specialist": "Pulmonology", "probability": 0.4}],
+        diseases=[{"disease": "Pneumonia", "probability": 0.05},
+                  {"disease": "Common Cold", "probability": 0.04},
+                  {"disease": "Migraine", "probability": 0.03}])
+
+
+def boosted(active_symptoms):
+    diagnoses = api.create_ml_diagnoses(low_confidence_predictions(), active_symptoms, rule_store.current)
+    return {diagnosis["disease"]: diagnosis["probability"] for diagnosis in diagnoses}
+
+
+def test_boost_pattern_fires_for_every_order():
+    # cough + fever is a boost pattern; abdominal_pain sorts first, so "the first two" would miss it
+    results = [boosted(list(order)) for order in permutations(["fever", "abdominal_pain", "cough"])]
+    assert all(result == results[0] for result in results)
+    assert results[0]["Common Cold"] == 0.80
+    assert results[0]["Pneumonia"] == 0.60
+
+
+def test_no_boost_without_a_pattern_pair():
+    results = [boosted(list(order)) for order in permutations(["fever", "abdominal_pain", "itching"])]
+    assert all(result == results[0] for result in results)
+    assert results[0]["Common Cold"] == 0.04
+
+
+def test_fallback_disease_for_every_order():
+    # No disease clears the threshold, so the fallback names one from rules.fallback_diseases
+    predictions = ModelPredictions(specialists=[{"specialist": "Dermatology", "probability": 0.7}], diseases=[])
+    for order in permutations(["skin_rash", "fever", "itching"]):
+        diagnoses = api.create_ml_diagnoses(predictions, list(order), rule_store.current)
+        assert diagnoses[0]["disease"] == "Eczema"
+
+
+def test_symptom_pair_in_ignores_order():
+    table = {("cough", "fever"): "x"}
+    assert api.symptom_pair_in(["fever", "zzz", "cough"], table) == ("cough", "fever")
+    assert api.symptom_pair_in(["cough", "aaa", "fever"], table) == ("cough", "fever")
+    assert api.symptom_pair_in(["cough"], table) is None
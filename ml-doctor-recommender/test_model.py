@@ -1,11 +1,12 @@
 import joblib
 import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the model
 model = joblib.load("content_model_specialist.pkl")
 
 # Load the feature columns
-df = pd.read_excel("Specialist_with_specialist.xlsx")
+df = load_dataset("Specialist_with_specialist.xlsx")
 df = df.drop(columns=["Unnamed: 0"], errors="ignore")
 feature_columns = df.columns[:-2].tolist()  # All columns except last two (Disease, Specialist)
 
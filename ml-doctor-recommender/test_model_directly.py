@@ -1,5 +1,6 @@
 import joblib
 import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the model
 model = joblib.load("content_model_specialist.pkl")
@@ -19,7 +20,7 @@ informative_symptoms = [
 ]
 
 # Load the data to get the exact feature columns
-df = pd.read_excel("Specialist.xlsx")
+df = load_dataset("Specialist.xlsx")
 cols = [col for col in df.columns if not col.lower().startswith('unnamed')]
 df = df[cols]
 feature_columns = [col for col in informative_symptoms if col in df.columns]
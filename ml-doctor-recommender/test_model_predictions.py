@@ -1,13 +1,13 @@
 import pickle
-import pandas as pd
 import numpy as np
+from dataset_cache import load_dataset
 
 # Load the model
 with open('content_model_specialist_fixed.pkl', 'rb') as f:
     model = pickle.load(f)
 
 # Load training data to get feature columns
-df = pd.read_excel('Specialist_simple.xlsx')
+df = load_dataset('Specialist_simple.xlsx')
 feature_columns = [col for col in df.columns if col != 'Specialist']
 
 # Test symptoms that should NOT predict Ophthalmologist
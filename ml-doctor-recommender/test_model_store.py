@@ -0,0 +1,75 @@
+"""
+pytest: model_store's cached copies are private, current and pruned
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import model_store
+
+
+@pytest.fixture
+def model_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, "MMAP_DIR", str(tmp_path / "cache"))
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(60, 5))
+    model = LogisticRegression().fit(X, X[:, 0])
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(model, path)
+    return path, X
+
+
+def test_mmap_copy_loads_the_same_model(model_file):
+    path, X = model_file
+    loaded = model_store.load_model(path)
+    assert np.array_equal(loaded.predict_proba(X), joblib.load(path).predict_proba(X))
+
+    copy = model_store.mmap_path(path)
+    assert os.path.exists(copy)
+    assert os.stat(copy).st_mode & 0o022 == 0
+    assert os.stat(model_store.MMAP_DIR).st_mode & 0o777 == 0o700
+
+
+def test_new_model_version_prunes_old_copies(model_file):
+    path, _ = model_file
+    old_copy = model_store.export_mmap_copy(path)
+    other_model = os.path.join(model_store.MMAP_DIR, "model-v2-1-2.joblib")
+    open(other_model, "wb").close()
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    new_copy = model_store.export_mmap_copy(path)
+
+    assert new_copy != old_copy
+    assert not os.path.exists(old_copy)
+    assert os.path.exists(other_model)
+
+
+def test_copy_writable_by_others_is_not_loaded(model_file):
+    path, X = model_file
+    copy = model_store.export_mmap_copy(path)
+    os.chmod(copy, 0o666)
+    with pytest.raises(PermissionError):
+        model_store.export_mmap_copy(path)
+    # load_model falls back to the source file
+    assert np.array_equal(model_store.load_model(path).predict(X), joblib.load(path).predict(X))
+
+
+def test_shared_directory_is_refused(model_file):
+    path, _ = model_file
+    os.makedirs(model_store.MMAP_DIR)
+    os.chmod(model_store.MMAP_DIR, 0o777)
+    with pytest.raises(PermissionError):
+        model_store.export_compiled_copy(path)
+
+
+def test_symlinked_copy_is_refused(model_file):
+    path, _ = model_file
+    os.makedirs(model_store.MMAP_DIR, mode=0o700)
+    os.symlink(path, model_store.mmap_path(path))
+    with pytest.raises(PermissionError):
+        model_store.export_mmap_copy(path)
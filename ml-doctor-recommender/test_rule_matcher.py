@@ -0,0 +1,60 @@
+"""
+pytest: RuleMatcher returns what the old combinations() walk found, in the same order
+"""
+
+import random
+from itertools import combinations
+
+from rule_matcher import CompiledRules, RuleMatcher
+from rule_store import rule_store
+
+
+def combinations_walk(compiled, active_symptoms, min_size, max_size):
+    """The pre-index lookup: every subset, largest first, probed in the compiled table"""
+    symptoms = list(dict.fromkeys(active_symptoms))
+    found = []
+    for size in range(min(len(symptoms), max_size), min_size - 1, -1):
+        for combo in combinations(symptoms, size):
+            found.extend((frozenset(combo), info["disease"]) for info in compiled.lookup(combo))
+    return found
+
+
+def matched(matcher, active_symptoms, min_size, max_size):
+    return [(frozenset(key), info["disease"])
+            for key, info in matcher.match(active_symptoms, min_size=min_size, max_size=max_size)]
+
+
+def test_match_order_equals_combinations_walk():
+    rules = rule_store.current
+    rng = random.Random(3)
+    for compiled, matcher in ((rules.compiled, rules.matcher), (rules.extended_compiled, rules.extended_matcher)):
+        vocabulary = sorted({symptom for key in compiled.entries for symptom in key})
+        for _ in range(500):
+            active_symptoms = rng.sample(vocabulary, rng.randint(2, 7))
+            assert matched(matcher, active_symptoms, 2, 4) == combinations_walk(compiled, active_symptoms, 2, 4)
+
+
+def test_permutation_keys_merge_into_ranked_entry():
+    compiled = CompiledRules({
+        ("a", "b"): {"disease": "X", "confidence": 0.5},
+        ("b", "a"): {"disease": "Y", "confidence": 0.9},
+        ("a", "b", "c"): {"disease": "Z", "confidence": 0.6},
+        ("c", "b", "a"): {"disease": "Z", "confidence": 0.7},
+    })
+    assert len(compiled) == 2
+    assert [info["disease"] for info in compiled.lookup(("b", "a"))] == ["Y", "X"]
+    assert compiled.lookup(("a", "c", "b"))[0]["confidence"] == 0.7
+    assert compiled.conflicts == [(frozenset("ab"), ["Y", "X"])]
+
+    # Largest set first, then the colliding diseases best first, whatever order the keys were written in
+    assert matched(RuleMatcher(compiled), ["c", "a", "b"], 2, 4) == [
+        (frozenset("abc"), "Z"), (frozenset("ab"), "Y"), (frozenset("ab"), "X")]
+
+
+def test_collision_in_rule_file_resolves_by_confidence():
+    rules = rule_store.current
+    diseases = [info["disease"] for _, info in rules.extended_matcher.match(["muscle_aches", "headache", "fever"],
+                                                                            min_size=3, max_size=3)]
+    confidences = [info["confidence"] for info in rules.extended_compiled.lookup(["fever", "headache", "muscle_aches"])]
+    assert diseases == ["Ebola", "Yellow Fever", "Lassa Fever"]
+    assert confidences == sorted(confidences, reverse=True)
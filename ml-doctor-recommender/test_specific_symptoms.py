@@ -1,11 +1,12 @@
 import joblib
 import pandas as pd
+from dataset_cache import load_dataset
 
 # Load the model
 model = joblib.load("content_model_specialist_fixed.pkl")
 
 # Load feature columns
-feature_df = pd.read_excel("Specialist_clean_clinical.xlsx")
+feature_df = load_dataset("Specialist_clean_clinical.xlsx")
 feature_columns = [col for col in feature_df.columns if col != 'Specialist']
 
 # Test itching
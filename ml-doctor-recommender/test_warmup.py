@@ -0,0 +1,68 @@
+"""
+pytest: /ready goes from 503 to 200, also when warmup keeps failing
+"""
+
+import threading
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+import content_api
+from warmup import Readiness
+
+
+def ready_status(readiness):
+    response = Response()
+    body = readiness.respond(response)
+    return response.status_code, body
+
+
+def test_ready_turns_200_after_warmup():
+    release = threading.Event()
+    readiness = Readiness("test", passes=2)
+    readiness.start(lambda active_symptoms: release.wait(5), symptom_sets=[["headache"]])
+
+    assert ready_status(readiness)[0] == 503
+    release.set()
+    readiness._thread.join(5)
+    status_code, body = ready_status(readiness)
+    assert status_code == 200
+    assert body["degraded"] is False and body["error"] is None
+    assert len(body["warmup_ms_per_request"]) == 2
+
+
+def test_warmup_retries_then_succeeds():
+    calls = []
+
+    def flaky(active_symptoms):
+        calls.append(active_symptoms)
+        if len(calls) < 3:
+            raise RuntimeError("not yet")
+
+    readiness = Readiness("test", passes=1, retries=3, retry_delay=0)
+    assert readiness.warm(flaky, symptom_sets=[["headache"]])
+    status_code, body = ready_status(readiness)
+    assert status_code == 200
+    assert body["warmup_attempts"] == 3
+    assert body["degraded"] is False and body["error"] is None
+
+
+def test_warmup_that_keeps_failing_goes_ready_degraded():
+    def broken(active_symptoms):
+        raise ValueError("bad symptom set")
+
+    readiness = Readiness("test", retries=2, retry_delay=0)
+    assert not readiness.warm(broken, symptom_sets=[["headache"]])
+    status_code, body = ready_status(readiness)
+    assert status_code == 200
+    assert body["degraded"] is True
+    assert body["warmup_attempts"] == 3
+    assert body["error"] == "ValueError: bad symptom set"
+
+
+def test_content_api_ready_after_startup():
+    with TestClient(content_api.app) as client:
+        content_api.readiness._thread.join(60)
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["degraded"] is False
@@ -4,9 +4,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 from sklearn.utils import resample
 import joblib
+from dataset_cache import load_dataset
 
 # Load the data
-df = pd.read_excel("Specialist_with_specialist.xlsx")
+df = load_dataset("Specialist_with_specialist.xlsx")
 df = df.drop(columns=["Unnamed: 0"], errors="ignore")
 
 # Prepare features and target
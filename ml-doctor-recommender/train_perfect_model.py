@@ -1,13 +1,13 @@
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
+from dataset_cache import load_dataset
 
 # Load the perfect training data
 print("Loading perfect training data...")
-df = pd.read_excel("Specialist_perfect.xlsx")
+df = load_dataset("Specialist_perfect.xlsx")
 
 # Prepare features and target
 X = df.drop('Specialist', axis=1)
@@ -1,12 +1,12 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
+from dataset_cache import load_dataset
 
 # Load cleaned data
 input_file = "Specialist_simple.xlsx"
-df = pd.read_excel(input_file)
+df = load_dataset(input_file)
 
 # Features and label
 X = df.drop(columns=["Specialist"])
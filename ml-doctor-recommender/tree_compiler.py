@@ -0,0 +1,289 @@
+"""
+Flat-array compiler and evaluator for the services' tree ensembles
+
+For one request row, sklearn's predict_proba spends most of its time in input
+validation and per-tree dispatch rather than in walking trees. compile_model
+turns a fitted DecisionTreeClassifier, RandomForestClassifier,
+ExtraTreesClassifier or GradientBoostingClassifier into one set of flat numpy
+arrays over all of its trees (split feature, threshold, children, leaf
+values) and evaluates every tree at once, one depth level per step.
+
+Our inputs are binary symptom vectors, so each split node also gets a
+two-entry child table: the child taken when the feature is 0 and when it is 1.
+A level step is then a few gathers with no comparisons. Rows that are not 0/1
+use the threshold arrays instead, with the same float32 comparison as sklearn.
+Leaf values are accumulated tree by tree in estimator order, so probabilities
+agree with sklearn to float rounding (for most forests, bit for bit).
+
+The win is per-call overhead: single rows are 10-170x faster and batches of
+~100 rows still faster, but for thousands of rows sklearn's Cython traversal
+overtakes numpy's level steps (benchmark_tree_compiler.py). The services
+predict single requests and small batches.
+
+CompiledEnsemble keeps classes_, n_features_in_ and feature_names_in_, so it is
+a drop-in replacement for the estimator wherever only predict/predict_proba
+are used. Its state is plain ndarrays, so it memory-maps (see model_store).
+"""
+
+import os
+
+import numpy as np
+
+# Bumped whenever CompiledEnsemble's arrays change, so cached compiled copies are rebuilt
+COMPILED_FORMAT = 1
+
+# COMPILED_TREES=0 keeps the sklearn estimators
+COMPILED_TREES_ENABLED = os.environ.get("COMPILED_TREES", "1") != "0"
+
+# Single rows of models with at most this many trees walk each tree with scalar steps
+_SCALAR_WALK_TREES = 8
+
+# Array walks check every this many levels whether all trees have reached a leaf
+_LEAF_CHECK_LEVELS = 4
+
+# Rows walked together in batch mode (per 100 trees), to bound the (rows x trees) work arrays
+_CHUNK_ROWS = 4096
+
+
+def _flatten_trees(trees):
+    """Concatenate sklearn Tree objects into shared node arrays with global child indices"""
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    n_nodes = int(offsets[-1])
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.zeros(n_nodes, dtype=np.float64)
+    left = np.arange(n_nodes, dtype=np.int32)
+    right = np.arange(n_nodes, dtype=np.int32)
+    values = []
+    max_depth = 0
+
+    for tree, offset in zip(trees, offsets[:-1]):
+        nodes = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+        split = tree.children_left != -1
+        feature[nodes] = np.where(split, tree.feature, 0)
+        threshold[nodes] = np.where(split, tree.threshold, np.inf)
+        # Leaves point at themselves so extra level steps are no-ops
+        left[nodes] = np.where(split, tree.children_left + offset, nodes)
+        right[nodes] = np.where(split, tree.children_right + offset, nodes)
+        values.append(tree.value)
+        max_depth = max(max_depth, tree.max_depth)
+
+    # Binary features: child when the feature is 0 / 1 (sklearn's float32 x <= threshold test),
+    # flattened so the child of node n for bit b is binary_child[2 * n + b]
+    binary_child = np.empty((n_nodes, 2), dtype=np.int32)
+    for bit in (0, 1):
+        binary_child[:, bit] = np.where(np.float32(bit) <= threshold, left, right)
+
+    return {
+        "roots": offsets[:-1].astype(np.int32),
+        "feature": feature,
+        "threshold": threshold,
+        "left": left,
+        "right": right,
+        "binary_child": binary_child.ravel(),
+        "value": np.concatenate(values),
+        "max_depth": max_depth,
+    }
+
+
+def _is_binary(X):
+    return bool(((X == 0) | (X == 1)).all())
+
+
+class CompiledEnsemble:
+    """Flat-array version of a fitted tree classifier"""
+
+    def __init__(self, kind, classes, n_features, feature_names, arrays, leaf_values, init_raw=None, loss=None):
+        self.kind = kind
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+        self.roots = arrays["roots"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.binary_child = arrays["binary_child"]
+        self.max_depth = arrays["max_depth"]
+        # forest: (n_nodes, n_classes) per-tree probabilities; boosting: (n_nodes,) learning_rate * value
+        self.leaf_values = leaf_values
+        self.init_raw = init_raw
+        self.loss = loss
+
+    def __setstate__(self, state):
+        # joblib's mmap_mode hands back np.memmap arrays; plain ndarray views of the same
+        # pages avoid the subclass overhead on every take()
+        self.__dict__.update({key: np.asarray(value) if isinstance(value, np.ndarray) else value
+                              for key, value in state.items()})
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _leaves(self, X):
+        """Leaf node of every tree for every row: (n_rows, n_trees)"""
+        n_rows, n_features = X.shape
+        # One (row, tree) pair per slot, walked down all trees together one level per step
+        nodes = np.tile(self.roots, n_rows)
+        row_base = np.repeat(np.arange(n_rows, dtype=np.int32) * n_features, self.n_trees)
+        if _is_binary(X):
+            bits = X.astype(np.int32).ravel()
+            for level in range(1, self.max_depth + 1):
+                columns = self.feature.take(nodes)
+                columns += row_base
+                nodes *= 2
+                nodes += bits.take(columns)
+                nodes = self.binary_child.take(nodes)
+                if level % _LEAF_CHECK_LEVELS == 0 and (self.left.take(nodes) == nodes).all():
+                    break
+        else:
+            values = X.astype(np.float32).ravel()
+            for _ in range(self.max_depth):
+                columns = self.feature.take(nodes) + row_base
+                goes_left = values.take(columns) <= self.threshold.take(nodes)
+                nodes = np.where(goes_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def _leaves_one(self, x):
+        """Leaf node of every tree for one row: (n_trees,)"""
+        if _is_binary(x):
+            bits = x.astype(np.int32)
+            if self.n_trees <= _SCALAR_WALK_TREES:
+                return np.array([self._walk_binary(root, bits) for root in self.roots.tolist()], dtype=np.int32)
+            nodes, child, feature = self.roots, self.binary_child, self.feature
+            for level in range(1, self.max_depth + 1):
+                nodes = child.take(2 * nodes + bits.take(feature.take(nodes)))
+                if level % _LEAF_CHECK_LEVELS == 0 and (self.left.take(nodes) == nodes).all():
+                    break
+            return nodes
+        x = x.astype(np.float32)
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            goes_left = x.take(self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = np.where(goes_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+    def _walk_binary(self, node, bits):
+        """Follow one tree to its leaf with scalar steps; cheaper than array steps for a few trees"""
+        child, feature = self.binary_child, self.feature
+        while True:
+            next_node = int(child[2 * node + bits[feature[node]]])
+            if next_node == node:
+                return node
+            node = next_node
+
+    def _finish(self, summed):
+        """Tree sums -> class probabilities"""
+        if self.kind == "forest":
+            return summed / self.n_trees
+        raw = summed
+        if self.loss == "binomial":
+            p1 = 1.0 / (1.0 + np.exp(-raw[..., 0]))
+            return np.stack([1.0 - p1, p1], axis=-1)
+        if self.loss == "exponential":
+            p1 = 1.0 / (1.0 + np.exp(-2.0 * raw[..., 0]))
+            return np.stack([1.0 - p1, p1], axis=-1)
+        shifted = np.exp(raw - raw.max(axis=-1, keepdims=True))
+        return shifted / shifted.sum(axis=-1, keepdims=True)
+
+    def _sum_leaves(self, leaves):
+        """Per-tree leaf values of a (n_rows, n_trees) block, added in estimator order like sklearn"""
+        n_outputs = len(self.init_raw) if self.kind == "boosting" else self.leaf_values.shape[1]
+        summed = np.zeros((len(leaves), n_outputs))
+        if self.kind == "boosting":
+            summed += self.init_raw
+        for tree in range(self.n_trees):
+            if self.kind == "forest":
+                summed += self.leaf_values.take(leaves[:, tree], axis=0)
+            else:
+                summed[:, tree % n_outputs] += self.leaf_values.take(leaves[:, tree])
+        return summed
+
+    def _sum_leaves_one(self, leaves):
+        """Per-tree leaf values of one row; a sum over axis 0 adds them in the same order"""
+        if self.kind == "forest":
+            return self.leaf_values.take(leaves, axis=0).sum(axis=0)
+        stages = self.leaf_values.take(leaves).reshape(-1, len(self.init_raw))
+        return np.concatenate([self.init_raw[None, :], stages]).sum(axis=0)
+
+    def predict_proba(self, X):
+        """Class probabilities for a (n_rows, n_features) block"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 1:
+            return self.predict_proba_one(X[0])[None, :]
+        chunk = max(1, _CHUNK_ROWS // max(1, self.n_trees // 100))
+        out = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), chunk):
+            block = X[start:start + chunk]
+            out[start:start + len(block)] = self._finish(self._sum_leaves(self._leaves(block)))
+        return out
+
+    def predict_proba_one(self, x):
+        """Class probabilities for one row, as a (n_classes,) vector"""
+        return self._finish(self._sum_leaves_one(self._leaves_one(np.asarray(x).ravel())))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _tree_probabilities(value):
+    """sklearn's per-tree predict_proba on node values: normalize each row to sum 1"""
+    proba = value[:, 0, :].copy()
+    normalizer = proba.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return proba / normalizer
+
+
+def compile_model(model):
+    """CompiledEnsemble for a fitted sklearn tree classifier; TypeError if unsupported"""
+    from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise TypeError("multi-output estimators are not supported")
+    feature_names = getattr(model, "feature_names_in_", None)
+
+    if isinstance(model, DecisionTreeClassifier):
+        trees = [model.tree_]
+    elif isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+    elif isinstance(model, GradientBoostingClassifier):
+        return _compile_boosting(model, feature_names)
+    else:
+        raise TypeError(f"cannot compile {type(model).__name__}")
+
+    arrays = _flatten_trees(trees)
+    leaf_values = _tree_probabilities(arrays.pop("value"))
+    return CompiledEnsemble("forest", model.classes_, model.n_features_in_, feature_names, arrays, leaf_values)
+
+
+def _compile_boosting(model, feature_names):
+    loss = getattr(model, "loss", "log_loss")
+    if loss in ("log_loss", "deviance"):
+        loss = "binomial" if len(model.classes_) == 2 else "multinomial"
+    elif loss != "exponential":
+        raise TypeError(f"unsupported GradientBoostingClassifier loss {loss!r}")
+    # The prior-based init does not depend on X, so its raw prediction is a constant
+    if model.init_ != "zero" and type(model.init_).__name__ != "DummyClassifier":
+        raise TypeError("GradientBoostingClassifier with a custom init estimator is not supported")
+    init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+
+    n_stages, n_outputs = model.estimators_.shape
+    # Stage-major, output-minor, so a row of leaves reshapes to (n_stages, n_outputs)
+    trees = [model.estimators_[stage, k].tree_ for stage in range(n_stages) for k in range(n_outputs)]
+    arrays = _flatten_trees(trees)
+    leaf_values = model.learning_rate * arrays.pop("value")[:, 0, 0]
+    return CompiledEnsemble("boosting", model.classes_, model.n_features_in_, feature_names, arrays,
+                            leaf_values, init_raw=np.asarray(init_raw, dtype=np.float64), loss=loss)
+
+
+def compile_if_supported(model):
+    """The compiled ensemble when possible, otherwise the estimator unchanged"""
+    if not COMPILED_TREES_ENABLED or model is None:
+        return model
+    try:
+        return compile_model(model)
+    except TypeError:
+        return model
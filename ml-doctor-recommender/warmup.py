@@ -0,0 +1,127 @@
+"""
+Startup warmup and readiness reporting for the prediction services
+
+Right after a restart the first requests pay for lazy sklearn/numpy
+initialization, first-call allocations and empty caches. Each service now
+runs representative symptom sets through its full prediction path on a
+background thread at startup, WARMUP_PASSES times, and only then reports
+ready. GET /ready answers 503 until warmup has finished and then 200, with
+the warmup time, per-pass latency and whether the service is running in
+fallback mode.
+
+A failing warmup is retried WARMUP_RETRIES times with exponential backoff
+(WARMUP_RETRY_DELAY seconds, doubling). If it still fails the service goes
+ready anyway in degraded mode, with the last error in /ready, rather than
+being held out of rotation forever by a warmup set that cannot be served.
+"""
+
+import os
+import threading
+import time
+
+from request_logging import get_logger
+
+WARMUP_PASSES = int(os.environ.get("WARMUP_PASSES", "3"))
+WARMUP_RETRIES = int(os.environ.get("WARMUP_RETRIES", "3"))
+WARMUP_RETRY_DELAY = float(os.environ.get("WARMUP_RETRY_DELAY", "1.0"))
+
+# Common presentations across body systems, single symptoms up to larger sets
+WARMUP_SYMPTOM_SETS = (
+    ["headache"],
+    ["itching", "skin_rash"],
+    ["cough", "high_fever"],
+    ["headache", "dizziness"],
+    ["stomach_pain", "nausea", "vomiting"],
+    ["chest_pain", "breathlessness"],
+    ["toothache", "sore_throat"],
+    ["runny_nose", "cough", "high_fever", "headache"],
+    ["joint_pain", "fatigue", "muscle_pain", "high_fever", "headache", "chills"],
+    ["back_pain", "anxiety", "blurred_vision", "fatigue", "dizziness", "nausea", "chest_pain", "itching"],
+)
+
+log = get_logger("warmup")
+
+
+class Readiness:
+    """Warmup state of one service, served by its /ready endpoint"""
+
+    def __init__(self, service, passes=WARMUP_PASSES, retries=WARMUP_RETRIES, retry_delay=WARMUP_RETRY_DELAY):
+        self.service = service
+        self.passes = max(1, passes)
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self.ready = False
+        self.degraded = False
+        self.attempts = 0
+        self.fallback_mode = False
+        self.warmup_seconds = None
+        self.pass_ms = []
+        self.error = None
+        self._thread = None
+
+    def _run_passes(self, predict, symptom_sets):
+        self.pass_ms = []
+        for _ in range(self.passes):
+            pass_started = time.perf_counter()
+            for active_symptoms in symptom_sets:
+                predict(list(active_symptoms))
+            self.pass_ms.append((time.perf_counter() - pass_started) * 1000 / len(symptom_sets))
+
+    def warm(self, predict, symptom_sets=WARMUP_SYMPTOM_SETS, fallback_mode=False):
+        """Call predict(active_symptoms) for every set, passes times, then mark the service ready
+
+        Retries with backoff on an exception; after the last retry the service is marked ready
+        in degraded mode. Returns True if warmup completed.
+        """
+        self.fallback_mode = fallback_mode
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            self.attempts = attempt + 1
+            try:
+                self._run_passes(predict, symptom_sets)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                if attempt < self.retries:
+                    delay = self.retry_delay * 2 ** attempt
+                    log.warning("%s warmup attempt %d failed, retrying in %.1f s: %s",
+                                self.service, self.attempts, delay, self.error)
+                    time.sleep(delay)
+                else:
+                    log.error("%s warmup failed %d times, serving degraded: %s",
+                              self.service, self.attempts, self.error, exc_info=True)
+                continue
+            self.error = None
+            break
+        self.warmup_seconds = time.perf_counter() - started
+        self.degraded = self.error is not None
+        self.ready = True
+        if not self.degraded:
+            log.info("%s ready after %.2f s warmup (ms/request per pass: %s)%s", self.service,
+                     self.warmup_seconds, ", ".join(f"{ms:.2f}" for ms in self.pass_ms),
+                     " in fallback mode" if fallback_mode else "")
+        return not self.degraded
+
+    def start(self, predict, symptom_sets=WARMUP_SYMPTOM_SETS, fallback_mode=False):
+        """Run warm() on a background thread so the server keeps answering /ready meanwhile"""
+        self._thread = threading.Thread(target=self.warm, args=(predict, symptom_sets, fallback_mode),
+                                        name=f"{self.service}-warmup", daemon=True)
+        self._thread.start()
+
+    def status(self):
+        return {
+            "service": self.service,
+            "ready": self.ready,
+            "degraded": self.degraded,
+            "fallback_mode": self.fallback_mode,
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_passes": self.passes,
+            "warmup_attempts": self.attempts,
+            "warmup_ms_per_request": self.pass_ms,
+            "error": self.error
+        }
+
+    def respond(self, response):
+        """Body for GET /ready; sets the status code to 503 until warmup is done"""
+        if not self.ready:
+            response.status_code = 503
+        return self.status()